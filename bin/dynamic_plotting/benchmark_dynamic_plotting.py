@@ -0,0 +1,393 @@
+#!/usr/bin/env python3
+"""
+Benchmark suite for the dynamic-plotting stack.
+
+Simulated cohorts (src/simulate_data/simulate_dataset.py --mode cohort) are
+generated once per scale and cached in --data_dir. Each stage is then timed
+on that data, recording wall time, peak RSS and output bytes:
+
+    preprocessing          single_data_preprocessing.DataLoader + CSV writes
+    load_data              SingleSample.load_data
+    load_data_paired       PreSample / PostSample / PairedClass.load_data
+    build_chromosome_grid  chromosome_plots._build_chromosome_grid, per chromosome
+    combined_plots         chromosome_plots.generate_combined_plots, per pair and chromosome
+    tables                 TableGenerator.generate_detailed_cnv_table
+    page_writes            summary + chromosome pages, single and paired
+
+The `tables` command is a micro-benchmark of the detailed CNV table renderer on
+synthetic call sets of increasing size (single and paired layouts).
+
+Usage:
+    python benchmark_dynamic_plotting.py run --scales small medium --output results/current.json
+    python benchmark_dynamic_plotting.py tables --calls 100 1000 10000
+    python benchmark_dynamic_plotting.py compare results/baseline.json results/current.json --threshold 0.15
+"""
+import argparse
+import json
+import logging
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import time
+from argparse import Namespace
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from data_preprocessing.single_data_preprocessing import DataLoader
+from src.plots.chromosome_plots import _build_chromosome_grid, generate_combined_plots
+from src.simulate_data.simulate_dataset import CHROMOSOME_INFO, simulate_cohort
+from src.tables.table_generator import TableGenerator
+from src.utils.output_manager import OutputManager
+from src.utils.sample_class import SingleSample, PreSample, PostSample, PairedClass, Parameters
+from src.utils.stage_metrics import StageMetrics, path_bytes
+from src.pages.sample_summary_page_single import SampleSummaryGeneratorSingle
+from src.pages.sample_chromosome_single import ChromosomePageGeneratorSingle
+from src.pages.sample_summary_page_paired import SampleSummaryGenerator
+from src.pages.sample_chromosome_paired import ChromosomePageGeneratorPaired
+
+
+# markers per sample and number of single samples; pairs are a tenth of that
+SCALES = {
+    "tiny":   {"markers": 30_000,    "samples": 3},
+    "small":  {"markers": 300_000,   "samples": 10},
+    "medium": {"markers": 700_000,   "samples": 100},
+    "large":  {"markers": 2_000_000, "samples": 500},
+}
+COMPARED_METRICS = ("wall_s", "peak_rss_mb", "output_bytes")
+
+
+# ────────────────────────────────────────────────────────────────────────────────
+# data generation
+# ────────────────────────────────────────────────────────────────────────────────
+def ensure_cohort(data_dir: Path, scale: dict, seed: int, workers, metrics: StageMetrics) -> Path:
+    """Simulate the cohort for `scale` unless data_dir already holds it"""
+    if (data_dir / "sample_types_paired.csv").exists():
+        logging.info("Reusing simulated cohort in %s", data_dir)
+        return data_dir
+
+    chromosomes = [str(i) for i in range(1, 23)]
+    genome_mb = sum(CHROMOSOME_INFO[c]["length"] for c in chromosomes + ["X"]) / 1e6
+    params = {
+        "output_dir": str(data_dir),
+        "chromosomes": chromosomes,
+        "genome_sizes": {c: info["length"] for c, info in CHROMOSOME_INFO.items()},
+        "region_counts": {"normal": 3, "deletion": 1, "duplication": 0, "cn_loh": 0},
+        "segment_size_range": (500_000, 5_000_000),
+        "snps_per_mb": scale["markers"] / genome_mb,
+        "event_rate": 0.5,
+    }
+    n_pairs = max(1, scale["samples"] // 10)
+    with metrics.stage("simulate") as rec:
+        simulate_cohort(params, scale["samples"], n_pairs, posts_per_pre=min(3, n_pairs),
+                        seed=seed, workers=workers)
+        rec["output_bytes"] = path_bytes(str(data_dir))
+    return data_dir
+
+
+def write_raw_tables(sample_dir: Path, name: str, raw_dir: Path) -> Namespace:
+    """Turn simulated CSVs back into the tab-separated inputs of the preprocessing step"""
+    raw_dir.mkdir(parents=True, exist_ok=True)
+
+    def read(kind):
+        return pd.read_csv(sample_dir / f"single_{kind}_{name}.csv", dtype={"Chromosome": str})
+
+    summary = read("cn_summary_data").drop(columns=["Sample"])
+    probs = read("cn_probabilities_data")[["Chromosome", "Position", "CN", "P(CN0)", "P(CN1)", "P(CN2)", "P(CN3)"]]
+    cnvs = read("cnv_chromosomes")
+    cnv_table = (cnvs.groupby("Chromosome").size().rename("CNVs").reset_index()
+                 .assign(Sample=name, CN_200kb=0, CN_1Mb=0, CN_Type="CNV"))
+    tables = {
+        "summary_tab": summary,
+        "dat_tab": read("baf_lrr_data"),
+        "cn_tab": probs,
+        "cnv_detection": read("cnv_detection_filtered"),
+        "cnv_table": cnv_table[["Sample", "Chromosome", "CN_200kb", "CN_1Mb", "CN_Type", "CNVs"]],
+    }
+    args = {}
+    for arg, df in tables.items():
+        args[arg] = raw_dir / f"{arg}.tsv"
+        df.to_csv(args[arg], sep="\t", index=False)
+    for arg, kind in (("union_bed", "union_bed"), ("roh_bed", "roh_bed"), ("cn_bed", "cn_bed")):
+        args[arg] = raw_dir / f"{arg}.bed"
+        read(kind).to_csv(args[arg], sep="\t", index=False, header=False)
+    return Namespace(pre=name, post=None, sex=None, **args)
+
+
+# ────────────────────────────────────────────────────────────────────────────────
+# stages
+# ────────────────────────────────────────────────────────────────────────────────
+def bench_preprocessing(cohort: Path, work: Path, names: list, metrics: StageMetrics) -> None:
+    for name in names:
+        args = write_raw_tables(cohort / "samples" / name, name, work / "raw" / name)
+        args.sample_types = cohort / "sample_types.csv"
+        args.output_dir = work / "preprocessed" / name
+        args.output_dir.mkdir(parents=True, exist_ok=True)
+        with metrics.stage("preprocessing", item=name) as rec:
+            for kind, df in DataLoader(args).load_all().items():
+                out = args.output_dir / f"{kind}_{name}.csv"
+                df.to_csv(out, index=False, header=True, float_format="%.6f")
+                rec["output_bytes"] += out.stat().st_size
+
+
+def bench_single(cohort: Path, work: Path, parameters: Parameters, metrics: StageMetrics) -> None:
+    meta = pd.read_csv(cohort / "sample_types.csv")
+    samples = []
+    for _, row in meta.iterrows():
+        sample = SingleSample(row["sample_id"], row["type"], row["pre_sample"], row["pre_sex"],
+                              row["call_rate"], row["call_rate_filt"], row["LRR_stdev"], parameters)
+        with metrics.stage("load_data", item=sample.sample_id):
+            sample.load_data(str(cohort / "samples"))
+        samples.append(sample)
+
+    bench_preprocessing(cohort, work, [s.pre_sample for s in samples], metrics)
+
+    tables = TableGenerator()
+    for sample in samples:
+        for chrom in sample.available_chromosomes:
+            with metrics.stage("build_chromosome_grid", item=f"{sample.sample_id}:{chrom}"):
+                _build_chromosome_grid(
+                    sample.baf_lrr_data, sample.cnv_detection_filtered, chrom, sample.sample_id,
+                    sample.roh_bed, sample.union_bed, sample.cn_bed,
+                    cn_summary_data=sample.cn_summary_data,
+                )
+        with metrics.stage("tables", item=sample.sample_id) as rec:
+            html = tables.generate_detailed_cnv_table(sample.cnv_detection_filtered)
+            rec["output_bytes"] = sum(len(part.encode()) for part in html.values())
+
+    om = OutputManager(str(work / "report_single"))
+    om.create_directory_structure([s.pre_sample for s in samples])
+    for sample in samples:
+        with metrics.stage("page_writes", item=sample.sample_id) as rec:
+            SampleSummaryGeneratorSingle(sample, om).save()
+            ChromosomePageGeneratorSingle(sample, om).save_chromosome_pages()
+            om.flush_pages()
+            rec["output_bytes"] = path_bytes(om.get_sample_dir(sample.pre_sample))
+
+
+def bench_paired(cohort: Path, work: Path, parameters: Parameters, metrics: StageMetrics) -> None:
+    single_meta = {row["sample_id"]: row for _, row in pd.read_csv(cohort / "sample_types_single.csv").iterrows()}
+    paired_meta = pd.read_csv(cohort / "sample_types_paired.csv")
+    samples_dir = str(cohort / "samples")
+
+    def member(cls, sample_id, cache):
+        if sample_id not in cache:
+            row = single_meta[sample_id]
+            obj = cls(sample_id=row["sample_id"], sample_type=row["type"], pre_sample=row["pre_sample"],
+                      pre_sex=row["pre_sex"], call_rate=row["call_rate"], call_rate_filt=row["call_rate_filt"],
+                      LRR_stdev=row["LRR_stdev"], parameters=parameters)
+            with metrics.stage("load_data_paired", item=sample_id):
+                obj.load_data(samples_dir)
+            cache[sample_id] = obj
+        return cache[sample_id]
+
+    pres, posts, pairs = {}, {}, []
+    for _, row in paired_meta.iterrows():
+        pair = PairedClass(member(PreSample, row["pre_sample"], pres), member(PostSample, row["post_sample"], posts),
+                           row["type"], row["PI_HAT"])
+        with metrics.stage("load_data_paired", item=pair.pair_id):
+            pair.load_data(samples_dir)
+        pairs.append(pair)
+
+    tables = TableGenerator()
+    for pair in pairs:
+        for chrom in pair.available_chromosomes:
+            with metrics.stage("combined_plots", item=f"{pair.pair_id}:{chrom}") as rec:
+                plot_json = generate_combined_plots(
+                    pre_baf_lrr=pair.pre.baf_lrr_data, pre_cnv=pair.pre.cn_summary_data,
+                    post_baf_lrr=pair.post.baf_lrr_data, post_cnv=pair.post.cn_summary_data,
+                    diff_baf_lrr=pair.post.baf_lrr_data, diff_cnv=pair.cnv_detection_filtered,
+                    chromosome=chrom, pre_sample_id=pair.pre.sample_id,
+                    post_sample_id=pair.post.sample_id, pair_id=pair.pair_id,
+                    pre_roh_bed=pair.pre.roh_bed, pre_union_bed=pair.pre.union_bed, pre_cn_bed=pair.pre.cn_bed,
+                    post_roh_bed=pair.post.roh_bed, post_union_bed=pair.post.union_bed, post_cn_bed=pair.post.cn_bed,
+                    diff_roh_bed=pair.roh_bed, diff_union_bed=pair.union_bed, diff_cn_bed=pair.cn_bed,
+                    pre_cn_summary_data=pair.pre.cn_summary_data,
+                    post_cn_summary_data=pair.post.cn_summary_data,
+                    diff_cn_summary_data=pair.post.cn_summary_data,
+                )
+                rec["output_bytes"] = len(plot_json.encode())
+        with metrics.stage("tables", item=pair.pair_id) as rec:
+            html = tables.generate_detailed_cnv_table(pair.cnv_detection_filtered)
+            rec["output_bytes"] = sum(len(part.encode()) for part in html.values())
+
+    om = OutputManager(str(work / "report_paired"))
+    om.create_paired_structure([p.pair_id for p in pairs])
+    for pair in pairs:
+        with metrics.stage("page_writes", item=pair.pair_id) as rec:
+            SampleSummaryGenerator(pair, om).save()
+            ChromosomePageGeneratorPaired(pair, om).save_chromosome_pages()
+            om.flush_pages()
+            rec["output_bytes"] = path_bytes(om.dir_structure.pair_dirs[pair.pair_id])
+
+
+def run_scale(name: str, args: argparse.Namespace) -> dict:
+    scale = SCALES[name]
+    metrics = StageMetrics()
+    cohort = ensure_cohort(Path(args.data_dir) / name, scale, args.seed, args.workers, metrics)
+    parameters = Parameters(str(cohort / "parameters.json"))
+
+    if args.work_dir:
+        os.makedirs(args.work_dir, exist_ok=True)
+    work = Path(tempfile.mkdtemp(prefix=f"bench_{name}_", dir=args.work_dir))
+    try:
+        bench_single(cohort, work, parameters, metrics)
+        bench_paired(cohort, work, parameters, metrics)
+    finally:
+        if not args.keep_output:
+            shutil.rmtree(work, ignore_errors=True)
+
+    stages = metrics.summary()
+    for stage, agg in stages.items():
+        logging.warning("%-8s %-22s n=%-5d %9.2f s  %8.1f MB  %12d bytes",
+                        name, stage, agg["count"], agg["wall_s"], agg["peak_rss_mb"], agg["output_bytes"])
+    return {**scale, "stages": stages, "slowest": metrics.slowest(10)}
+
+
+# ────────────────────────────────────────────────────────────────────────────────
+# table micro-benchmark
+# ────────────────────────────────────────────────────────────────────────────────
+def synthetic_calls(n: int, paired: bool, seed: int) -> pd.DataFrame:
+    """`n` CNV calls in the filtered-detection layout of a single sample or a pair"""
+    rng = np.random.default_rng(seed)
+    start = rng.integers(1, 240_000_000, n)
+    length = rng.integers(10_000, 5_000_000, n)
+    df = pd.DataFrame({"Chromosome": rng.choice([str(c) for c in range(1, 23)] + ["X"], n),
+                       "Start": start, "End": start + length, "Length": length})
+    if paired:
+        df["CN_pre"] = rng.integers(1, 4, n)
+        df["CN_post"] = rng.integers(0, 5, n)
+        df["QualityScore"] = rng.uniform(3, 60, n).round(1)
+        for side in ("Pre", "Post"):
+            df[f"{side}Sites"] = rng.integers(5, 500, n)
+            df[f"{side}Hets"] = rng.integers(0, 100, n)
+    else:
+        df["CN"] = rng.integers(0, 5, n)
+        df["QS"] = rng.uniform(3, 60, n).round(1)
+        df["nSites"] = rng.integers(5, 500, n)
+        df["nHets"] = rng.integers(0, 100, n)
+    return df
+
+
+def bench_tables(calls: list, repeat: int, seed: int) -> None:
+    """Print the best-of-`repeat` render time of the detailed CNV tables per call-set size"""
+    tables = TableGenerator()
+    cases = (("single", False, tables.generate_detailed_cnv_table_single),
+             ("paired", True, tables.generate_detailed_cnv_table))
+    print(f"{'layout':<8} {'calls':>8} {'seconds':>10} {'us/call':>9} {'html KB':>9}")
+    for n in calls:
+        for layout, paired, render in cases:
+            df = synthetic_calls(n, paired, seed)
+            best = float("inf")
+            for _ in range(repeat):
+                t0 = time.perf_counter()
+                html = render(df)
+                best = min(best, time.perf_counter() - t0)
+            size = sum(len(part) for part in html.values())
+            print(f"{layout:<8} {n:>8,} {best:>10.4f} {best / n * 1e6:>9.1f} {size / 1024:>9.1f}")
+
+
+# ────────────────────────────────────────────────────────────────────────────────
+# comparison
+# ────────────────────────────────────────────────────────────────────────────────
+def compare(baseline: dict, current: dict, threshold: float, metrics=COMPARED_METRICS, min_wall: float = 0.1) -> list:
+    """Return (scale, stage, metric, base, current, ratio) for every regression beyond `threshold`.
+
+    Stages faster than `min_wall` seconds in both runs are never flagged on wall time (timer noise)."""
+    regressions = []
+    print(f"{'scale':<8} {'stage':<22} {'metric':<13} {'baseline':>14} {'current':>14} {'change':>8}")
+    for scale, cur in current["scales"].items():
+        base = baseline["scales"].get(scale)
+        if base is None:
+            continue
+        for stage, cur_agg in cur["stages"].items():
+            base_agg = base["stages"].get(stage)
+            if base_agg is None or stage == "simulate":
+                continue
+            for metric in metrics:
+                b, c = base_agg.get(metric, 0), cur_agg.get(metric, 0)
+                ratio = c / b if b else (1.0 if not c else float("inf"))
+                flag = ratio > 1 + threshold and not (metric == "wall_s" and max(b, c) < min_wall)
+                print(f"{scale:<8} {stage:<22} {metric:<13} {b:>14,.2f} {c:>14,.2f} {ratio - 1:>+7.1%}"
+                      + ("  REGRESSION" if flag else ""))
+                if flag:
+                    regressions.append((scale, stage, metric, b, c, ratio))
+    return regressions
+
+
+# ────────────────────────────────────────────────────────────────────────────────
+# CLI
+# ────────────────────────────────────────────────────────────────────────────────
+def parse_args() -> argparse.Namespace:
+    p = argparse.ArgumentParser(description="Benchmark the dynamic plotting stack")
+    sub = p.add_subparsers(dest="command", required=True)
+
+    run = sub.add_parser("run", help="Run the benchmark and write a JSON result")
+    run.add_argument("--scales", nargs="+", choices=list(SCALES), default=["small"],
+                     help="Scales to run (markers / samples): " +
+                          ", ".join(f"{k}={v['markers']:,}/{v['samples']}" for k, v in SCALES.items()))
+    run.add_argument("--output", default="benchmark_results.json", help="JSON result / baseline file")
+    run.add_argument("--data_dir", default="benchmark_data", help="Cache for simulated cohorts")
+    run.add_argument("--work_dir", default=None, help="Scratch directory for stage outputs")
+    run.add_argument("--keep_output", action="store_true", help="Keep stage outputs after the run")
+    run.add_argument("--seed", type=int, default=42, help="Simulation seed")
+    run.add_argument("--workers", type=int, default=None, help="Simulation worker processes")
+    run.add_argument("--verbose", action="store_true", help="Show the pipeline's own logging")
+
+    tab = sub.add_parser("tables", help="Micro-benchmark the detailed CNV table renderer")
+    tab.add_argument("--calls", nargs="+", type=int, default=[100, 1_000, 10_000, 50_000],
+                     help="Number of CNV calls per synthetic sample")
+    tab.add_argument("--repeat", type=int, default=3, help="Runs per size; the fastest is reported")
+    tab.add_argument("--seed", type=int, default=42, help="Synthetic data seed")
+
+    cmp_ = sub.add_parser("compare", help="Compare a result against a baseline")
+    cmp_.add_argument("baseline", help="Baseline JSON")
+    cmp_.add_argument("current", help="Current JSON")
+    cmp_.add_argument("--threshold", type=float, default=0.15,
+                      help="Relative increase counted as a regression (default: 0.15)")
+    cmp_.add_argument("--min_wall", type=float, default=0.1,
+                      help="Ignore wall-time changes of stages faster than this many seconds (default: 0.1)")
+    cmp_.add_argument("--metrics", nargs="+", choices=COMPARED_METRICS, default=list(COMPARED_METRICS),
+                      help="Metrics to compare")
+    return p.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    logging.basicConfig(level=logging.INFO if getattr(args, "verbose", False) else logging.WARNING,
+                        format="%(asctime)s - %(levelname)s - %(message)s", force=True)
+
+    if args.command == "compare":
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        with open(args.current) as f:
+            current = json.load(f)
+        regressions = compare(baseline, current, args.threshold, args.metrics, args.min_wall)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) beyond {args.threshold:.0%}")
+            sys.exit(1)
+        print("\nNo regressions")
+        return
+
+    if args.command == "tables":
+        bench_tables(args.calls, args.repeat, args.seed)
+        return
+
+    result = {
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "scales": {name: run_scale(name, args) for name in args.scales},
+    }
+    with open(args.output, "w") as f:
+        json.dump(result, f, indent=2)
+    print(f"Benchmark results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -16,6 +16,18 @@ from src.pages.info_page import InfoPageGenerator
 from src.utils.styling import StylingManager
 from src.pages.sample_summary_page_paired import SampleSummaryGenerator
 from src.pages.sample_chromosome_paired import ChromosomePageGeneratorPaired
+from src.plots.recurrence import DEFAULT_BIN_SIZE, cohort_chromosomes, cohort_recurrence
+from src.plots.cohort_matrix import cohort_matrix
+from src.pages.cohort_heatmap_page import COHORT_HEATMAP_PAGE, CohortHeatmapPageGenerator
+from src.utils.stage_metrics import StageMetrics
+from src.utils.profiling import Profiler, install_profiling_hooks
+from src.utils.region_store import REGION_STORE_DIR
+from src.utils.report_status import QUICK_LOOK_STRIDE, STATUS_JSON
+from src.utils.shards import (
+    SHARD_DIR, kept_page_metrics, matrix_row, merge_cohort_matrix, object_state, read_shards, rendered_shards,
+    restore_state, select_shard, shard_page_metrics, write_shard
+)
+from src.utils.watch import DONE_MARKER, WATCH_INTERVAL, SampleWatcher
 
 from src.utils.simulated_sample_class import (
     SimulatedSingleSample,
@@ -26,6 +38,11 @@ from src.utils.simulated_sample_class import (
     load_simulated_samples
 )
 
+# Attributes the cohort pages need, saved per pair by --shard runs for --merge
+SHARD_ATTRIBUTES = ("total_cnvs", "significant_cnvs", "available_chromosomes")
+PAIR_SHARD_FRAMES = ("cnv_detection_filtered",)
+SAMPLE_SHARD_FRAMES = ("cn_summary_data",)
+
 
 # ────────────────────────────────────────────────────────────────────────────────
 # CLI
@@ -46,7 +63,83 @@ def parse_args() -> argparse.Namespace:
     p.add_argument("--support_helmholtz", default="", help="Helmholtz support email")
     p.add_argument("--email_analyst", default="", help="Analyst email (optional)")
     p.add_argument("--name_analyst", default="", help="Analyst name (optional)")
-    return p.parse_args()
+    p.add_argument("--json_tables", "--json-tables", action="store_true",
+                   help="Embed sample and CNV tables as JSON, drawn by a virtual-scrolling table in the browser")
+    p.add_argument("--baf_thin_stride", "--baf-thin-stride", type=int, default=0,
+                   help="On chromosome pages keep all informative BAF points (0.1-0.9) but only every n-th "
+                        "homozygous one (default: 0, draw all points)")
+    p.add_argument("--single_page", "--single-page", action="store_true",
+                   help="Write one chromosome viewer page per sample that loads small per-chromosome "
+                        "data scripts (chr<N>.js) on demand, instead of one HTML page per chromosome")
+    p.add_argument("--offline_assets", "--offline-assets", action="store_true",
+                   help="Copy BokehJS and the other front-end assets into components/vendor and load them "
+                        "from there, so opening the report needs no network access")
+    p.add_argument("--vendor_dir", "--vendor-dir", default=None,
+                   help="With --offline_assets: directory holding html2canvas/, font-awesome/ and inter/ "
+                        "to copy alongside BokehJS (assets missing here are left out of the pages)")
+    p.add_argument("--compress", action="store_true",
+                   help="Also write a gzip-compressed .gz sibling of every page and data file, plus example "
+                        "nginx / Apache configuration for serving them (gzip_static)")
+    p.add_argument("--compress_brotli", "--compress-brotli", action="store_true",
+                   help="Like --compress, and also write .br siblings (needs the brotli module)")
+    p.add_argument("--shard", nargs="+", default=None, metavar="PAIR_ID",
+                   help="Render only the summary and chromosome pages of these pairs (PRE_<pre>_POST_<post>) "
+                        "and write their metadata to --shard_dir; the home, info and cohort pages are built by --merge")
+    p.add_argument("--merge", action="store_true",
+                   help="Build the home, info and cohort pages and processing_summary_paired.txt from the metadata "
+                        "of earlier --shard runs in --shard_dir, without loading any sample data")
+    p.add_argument("--shard_dir", "--shard-dir", default=None,
+                   help=f"Directory of the per-pair shard metadata (default: <output_dir>/{SHARD_DIR})")
+    p.add_argument("--quick_look", "--quick-look", action="store_true",
+                   help="Write the home and summary pages and low-resolution chromosome pages first, then "
+                        f"replace the chromosome pages in place with full ones (progress in {STATUS_JSON})")
+    p.add_argument("--quick_look_stride", "--quick-look-stride", type=int, default=QUICK_LOOK_STRIDE,
+                   help=f"Quick-look chromosome pages draw every n-th SNP (default: {QUICK_LOOK_STRIDE})")
+    p.add_argument("--region_store", "--region-store", action="store_true",
+                   help="Embed only a min/max overview of the BAF / LRR points in the chromosome pages and write "
+                        f"each PRE / POST sample's points to <output_dir>/{REGION_STORE_DIR}; served with serve_report.py, "
+                        "the plots reload the visible range at screen resolution on pan / zoom")
+    p.add_argument("--samples", nargs="+", default=None, metavar="ID",
+                   help="Re-render only these pairs in an existing report (pair IDs, or PRE / POST sample IDs to "
+                        "select every pair they are part of): load just their data, rewrite their pages and metadata, "
+                        "and update the home and cohort pages from the saved metadata of the other pairs")
+    p.add_argument("--chromosomes", nargs="+", default=None, metavar="CHROM",
+                   help="Only (re-)write the chromosome pages of these chromosomes (e.g. 1 X); with --samples, "
+                        "of those pairs only")
+    p.add_argument("--watch", action="store_true",
+                   help="Keep running and render each pair as soon as its folder in --samples_dir contains "
+                        "--done_marker, refreshing the home and cohort pages after each batch (stop with Ctrl-C)")
+    p.add_argument("--done_marker", "--done-marker", default=DONE_MARKER,
+                   help=f"With --watch: file marking a pair folder as complete (default: {DONE_MARKER})")
+    p.add_argument("--watch_interval", "--watch-interval", type=float, default=WATCH_INTERVAL,
+                   help=f"With --watch: seconds between checks without inotify (default: {WATCH_INTERVAL:g})")
+    p.add_argument("--recurrence_bin_size", "--recurrence-bin-size", type=int, default=DEFAULT_BIN_SIZE,
+                   help=f"Bin size (bp) of the cohort CNV recurrence track and the cohort heatmap (default: {DEFAULT_BIN_SIZE})")
+    p.add_argument("--metrics_json", "--metrics-json", default=None,
+                   help="Write per-stage / per-sample / per-chromosome timing, memory and size metrics to this JSON file")
+    p.add_argument("--profile_dir", "--profile-dir", default=None,
+                   help="Profile load_data, summary and chromosome pages (cProfile, collapsed stacks, tracemalloc) into this directory")
+    p.add_argument("--profile_samples", nargs="+", default=None,
+                   help="Only profile these samples / pair IDs (default: all)")
+    p.add_argument("--profile_chromosomes", nargs="+", default=None,
+                   help="Only profile chromosome pages of these chromosomes (default: all)")
+    p.add_argument("--metrics_top_n", type=int, default=10,
+                   help="Number of slowest pages listed in processing_summary_paired.txt (default: 10)")
+    args = p.parse_args()
+    if args.shard and args.merge:
+        p.error("--shard and --merge are mutually exclusive")
+    if args.quick_look and (args.shard or args.merge):
+        p.error("--quick_look cannot be combined with --shard / --merge")
+    if args.quick_look_stride < 2:
+        p.error("--quick_look_stride must be at least 2")
+    if (args.samples or args.chromosomes) and (args.shard or args.merge or args.quick_look):
+        p.error("--samples / --chromosomes cannot be combined with --shard / --merge / --quick_look")
+    if args.chromosomes:
+        args.chromosomes = [c[3:] if c.lower().startswith("chr") else c for c in args.chromosomes]
+    if args.watch and (args.samples or args.chromosomes or args.shard or args.merge or args.quick_look
+                       or args.compress or args.compress_brotli):
+        p.error("--watch cannot be combined with --samples / --chromosomes / --shard / --merge / --quick_look / --compress")
+    return args
 
 
 # ────────────────────────────────────────────────────────────────────────────────
@@ -66,6 +159,9 @@ def setup_logger(log_file: str) -> None:
 # ────────────────────────────────────────────────────────────────────────────────
 def load_sample_objects(
     args: argparse.Namespace,
+    metrics: StageMetrics,
+    shard: List[str] = None,
+    load: bool = True,
 ) -> Tuple[List[PreSample], List[PostSample], List[PairedClass]]:
     logging.info("Reading metadata CSVs …")
     single_df = pd.read_csv(args.sample_types_single)
@@ -84,6 +180,10 @@ def load_sample_objects(
     logging.info("Constructing objects …")
     for _, row in paired_df.iterrows():
         pre_id, post_id = row["pre_sample"], row["post_sample"]
+        if shard is not None and pre_id in single_lookup and post_id in single_lookup:
+            pair_id = f"PRE_{single_lookup[pre_id]['pre_sample']}_POST_{single_lookup[post_id]['pre_sample']}"
+            if pair_id not in shard:
+                continue
 
         # PreSample ----------------------------------------------------------------
         if pre_id not in pre_cache:
@@ -101,9 +201,11 @@ def load_sample_objects(
                 LRR_stdev=meta.get("LRR_stdev"),
                 parameters=parameters
             )
-            pre_obj.load_data(args.samples_dir)
+            if load:
+                with metrics.stage("load", sample=pre_id):
+                    pre_obj.load_data(args.samples_dir)
+                logging.info("Loaded PreSample %s (CNVs=%d)", pre_id, pre_obj.total_cnvs)
             pre_cache[pre_id] = pre_obj
-            logging.info("Loaded PreSample %s (CNVs=%d)", pre_id, pre_obj.total_cnvs)
 
         # PostSample ---------------------------------------------------------------
         if post_id not in post_cache:
@@ -121,9 +223,11 @@ def load_sample_objects(
                 LRR_stdev=meta.get("LRR_stdev"),
                 parameters=parameters
             )
-            post_obj.load_data(args.samples_dir)
+            if load:
+                with metrics.stage("load", sample=post_id):
+                    post_obj.load_data(args.samples_dir)
+                logging.info("Loaded PostSample %s (CNVs=%d)", post_id, post_obj.total_cnvs)
             post_cache[post_id] = post_obj
-            logging.info("Loaded PostSample %s (CNVs=%d)", post_id, post_obj.total_cnvs)
 
         # PairedClass --------------------------------------------------------------
         pair_obj = PairedClass(
@@ -132,16 +236,58 @@ def load_sample_objects(
             sample_type=row["type"],
             PI_HAT=row["PI_HAT"],
         )
-        pair_obj.load_data(args.samples_dir)
+        if load:
+            with metrics.stage("load", sample=pair_obj.pair_id):
+                pair_obj.load_data(args.samples_dir)
         pair_list.append(pair_obj)
         logging.info("Created pair %-60s PI_HAT=%0.4f", pair_obj.pair_id, pair_obj.PI_HAT)
 
+    unknown = set(shard or ()) - {p.pair_id for p in pair_list}
+    if unknown:
+        raise ValueError(f"Shard IDs not found in the pair sheet: {sorted(unknown)}")
     return list(pre_cache.values()), list(post_cache.values()), pair_list
 
 
+def sheet_pair_ids(args: argparse.Namespace) -> List[str]:
+    """Pair IDs (PRE_<pre>_POST_<post>) of the pair sheet, without constructing any objects;
+    pairs whose samples are not in the single sheet yet are left out"""
+    single_df = pd.read_csv(args.sample_types_single)
+    paired_df = pd.read_csv(args.sample_types_paired)
+    names = dict(zip(single_df["sample_id"], single_df["pre_sample"]))
+    return [f"PRE_{names[pre]}_POST_{names[post]}"
+            for pre, post in zip(paired_df["pre_sample"], paired_df["post_sample"])
+            if pre in names and post in names]
+
+
+def restore_shards(pairs: List[PairedClass], shard_dir: str, metrics: StageMetrics, rendered=()) -> dict:
+    """Set the saved numbers and CNV calls on pairs whose data is not loaded (--merge, --watch,
+    --samples), add their page metrics to `metrics` except those of the `rendered` pairs (already
+    recorded by this run); returns the pairs' processing summary lines"""
+    with metrics.stage("shard_metadata"):
+        shards = read_shards(shard_dir, [p.pair_id for p in pairs])
+        for pair in pairs:
+            shard = shards[pair.pair_id]
+            restore_state(pair, shard["pair"])
+            restore_state(pair.pre, shard["pre"])
+            restore_state(pair.post, shard["post"])
+            if pair.pair_id not in rendered:
+                metrics.records.extend(shard["metrics"])
+    return {pair_id: shard["summary_line"] for pair_id, shard in shards.items()}
+
+
 # ────────────────────────────────────────────────────────────────────────────────
 # summary writer
 # ────────────────────────────────────────────────────────────────────────────────
+def pair_summary_line(p: PairedClass) -> str:
+    return (
+        f"{p.pair_id}  PI_HAT={p.PI_HAT:.4f}  "
+        f"union_bed={'Yes' if p.union_bed is not None else 'No'} (shape={p.union_bed.shape if p.union_bed is not None else 'N/A'})  "
+        f"roh_bed={'Yes' if p.roh_bed is not None else 'No'} (shape={p.roh_bed.shape if p.roh_bed is not None else 'N/A'})  "
+        f"cnv_det={'Yes' if p.cnv_detection_filtered is not None else 'No'} "
+        f"(cols={len(p.cnv_detection_filtered.columns) if p.cnv_detection_filtered is not None else 0})\n"
+    )
+
+
 def write_processing_summary(
     out_path: str,
     pre_samples: List[PreSample],
@@ -149,7 +295,9 @@ def write_processing_summary(
     pairs: List[PairedClass],
     log_file: str,
     samples_dir: str,
+    pair_lines: dict = None,
 ) -> None:
+    """`pair_lines` (pair_id → line) replaces the lines of pairs whose data is not loaded (--merge)"""
     logging.info("Writing summary → %s", out_path)
     with open(out_path, "w") as f:
         f.write("Paired Sample Processing Summary\n")
@@ -169,24 +317,201 @@ def write_processing_summary(
         # Pairs
         f.write("\nPairs\n-----\n")
         for p in pairs:
-            f.write(
-                f"{p.pair_id}  PI_HAT={p.PI_HAT:.4f}  "
-                f"union_bed={'Yes' if p.union_bed is not None else 'No'} (shape={p.union_bed.shape if p.union_bed is not None else 'N/A'})  "
-                f"roh_bed={'Yes' if p.roh_bed is not None else 'No'} (shape={p.roh_bed.shape if p.roh_bed is not None else 'N/A'})  "
-                f"cnv_det={'Yes' if p.cnv_detection_filtered is not None else 'No'} "
-                f"(cols={len(p.cnv_detection_filtered.columns) if p.cnv_detection_filtered is not None else 0})\n"
-            )
+            f.write((pair_lines or {}).get(p.pair_id) or pair_summary_line(p))
 
         f.write("\nLog file : " + os.path.abspath(log_file) + "\n")
         f.write("Generated: " + datetime.now().strftime("%Y-%m-%d %H:%M:%S") + "\n")
     logging.info("Summary done.")
 
 
+# ────────────────────────────────────────────────────────────────────────────────
+# cohort pages
+# ────────────────────────────────────────────────────────────────────────────────
+def write_cohort_pages(
+    args: argparse.Namespace,
+    pre_samples: List[PreSample],
+    post_samples: List[PostSample],
+    pairs: List[PairedClass],
+    parameters: Parameters,
+    output_manager: OutputManager,
+    metrics: StageMetrics,
+    shard_dir: str,
+    pair_lines: dict = None,
+    info_page: bool = True,
+) -> str:
+    """Processing summary, cohort recurrence and heatmap, home page and info page (unless
+    info_page is False); returns the path of processing_summary_paired.txt"""
+    summary_file = os.path.join(args.output_dir, "processing_summary_paired.txt")
+    write_processing_summary(
+        summary_file,
+        pre_samples,
+        post_samples,
+        pairs,
+        args.log_file,
+        args.samples_dir,
+        pair_lines=pair_lines,
+    )
+
+    # Cohort-wide CNV recurrence of the pairs (home page track + cohort ideogram)
+    with metrics.stage("cohort_recurrence") as rec:
+        recurrence = cohort_recurrence(
+            {p.pair_id: p.cnv_detection_filtered for p in pairs},
+            chromosomes=cohort_chromosomes(pairs),
+            bin_size=args.recurrence_bin_size,
+        )
+        rec["output_bytes"] = os.path.getsize(
+            recurrence.to_tsv(os.path.join(args.output_dir, "cohort_recurrence.tsv")))
+    logging.info("Cohort recurrence: %d bins, max %d gains / %d losses per bin",
+                 len(recurrence.gains), recurrence.gains.max(initial=0), recurrence.losses.max(initial=0))
+
+    # Pairs × bins matrix of the POST sample's LRR / BAF deviation and CN_post (cohort heatmap page)
+    with metrics.stage("cohort_matrix") as rec:
+        if args.merge or args.watch or args.samples or args.chromosomes:  # pairs not loaded in this run
+            matrix = merge_cohort_matrix(shard_dir, [p.pair_id for p in pairs],
+                                         chromosomes=cohort_chromosomes(pairs),
+                                         bin_size=args.recurrence_bin_size)
+        else:
+            matrix = cohort_matrix(
+                {p.pair_id: (p.post.baf_lrr_data, p.cnv_detection_filtered) for p in pairs},
+                chromosomes=cohort_chromosomes(pairs),
+                bin_size=args.recurrence_bin_size,
+            )
+        rec["output_bytes"] = os.path.getsize(matrix.save(args.output_dir))
+    with metrics.stage("cohort_heatmap_page") as rec:
+        heatmap_page = CohortHeatmapPageGenerator(
+            matrix, output_manager, cnv_by_sample={p.pair_id: p.cnv_detection_filtered for p in pairs},
+            cnv_title="Differential CNV Counts – Cohort")
+        rec["output_bytes"] = os.path.getsize(heatmap_page.save(os.path.join(args.output_dir, COHORT_HEATMAP_PAGE)))
+
+    logging.info("Generating home page...")
+    home_page_generator = HomePageGenerator(
+        pre_samples, 
+        post_samples, 
+        pairs, 
+        output_manager,
+        parameters,  # Add parameters
+        recurrence=recurrence,
+        cohort_heatmap=True,
+    )
+    html_path = os.path.join(args.output_dir, output_manager.get_home_page_name())
+    with metrics.stage("home_page") as rec:
+        home_page_generator.save(html_path)
+        rec["output_bytes"] = os.path.getsize(html_path)
+    logging.info(f"Successfully generated home page: {output_manager.get_home_page_name()}")
+    logging.info("Created home page")
+
+    if not info_page:
+        return summary_file
+    single_simulated_objs, paired_simulated_objs = load_simulated_samples(args.simulated_data_dir)
+    logging.info("Loaded simulated data")
+    info_generator = InfoPageGenerator(output_manager, single_simulated_objs, paired_simulated_objs, 
+                                       support_email=args.support_helmholtz)
+    with metrics.stage("info_page") as rec:
+        rec["output_bytes"] = os.path.getsize(info_generator.save())
+    logging.info("Created documentation components with simulated data")
+    return summary_file
+
+
+# ────────────────────────────────────────────────────────────────────────────────
+# watch mode
+# ────────────────────────────────────────────────────────────────────────────────
+def render_watched_pair(
+    args: argparse.Namespace,
+    pair_id: str,
+    output_manager: OutputManager,
+    shard_dir: str,
+) -> None:
+    """--watch: load one pair, write its summary and chromosome pages and its shard metadata"""
+    metrics = StageMetrics()
+    _, _, (pair,) = load_sample_objects(args, metrics, shard=[pair_id])
+    output_manager.create_paired_structure([pair_id])
+    # Snapshot before rendering: the page generators add columns to the loaded tables
+    record = {
+        "pair": object_state(pair, SHARD_ATTRIBUTES, PAIR_SHARD_FRAMES),
+        "pre": object_state(pair.pre, SHARD_ATTRIBUTES, SAMPLE_SHARD_FRAMES),
+        "post": object_state(pair.post, SHARD_ATTRIBUTES, SAMPLE_SHARD_FRAMES),
+        "summary_line": pair_summary_line(pair),
+    }
+    row = matrix_row(pair.post.baf_lrr_data, pair.cnv_detection_filtered, args.recurrence_bin_size)
+
+    summary_generator = SampleSummaryGenerator(pair, output_manager)
+    with metrics.stage("summary_page", sample=pair_id) as rec:
+        rec["output_bytes"] = os.path.getsize(summary_generator.save())
+    ChromosomePageGeneratorPaired(pair, output_manager, metrics=metrics).save_chromosome_pages()
+    with metrics.stage("page_writer_flush"):
+        output_manager.flush_pages()
+
+    record["metrics"] = shard_page_metrics(metrics, {pair_id})
+    write_shard(shard_dir, pair_id, record, row)
+
+
+def watch_pairs(
+    args: argparse.Namespace,
+    parameters: Parameters,
+    output_manager: OutputManager,
+    shard_dir: str,
+) -> None:
+    """--watch: render every pair of the pair sheet whose folder gets the done marker, one at
+    a time (its data is released before the next is loaded), then rebuild the home and cohort
+    pages from the shard metadata of all rendered pairs. Runs until interrupted; pairs rendered
+    by an earlier watch run (shard metadata present) are not rendered again."""
+    watcher = SampleWatcher(args.samples_dir, marker=args.done_marker, interval=args.watch_interval)
+    rendered = rendered_shards(shard_dir)
+    failed = set()
+    refresh = bool(rendered)
+    try:
+        while True:
+            try:
+                sheet = sheet_pair_ids(args)
+            except (OSError, ValueError, KeyError) as e:  # sheet being rewritten
+                logging.warning("Could not read the sample sheets, retrying: %s", e)
+                sheet = []
+            for pair_id in sheet:
+                if pair_id in rendered or pair_id in failed or not watcher.is_complete(pair_id):
+                    continue
+                logging.info("Watch mode: rendering new pair %s", pair_id)
+                try:
+                    render_watched_pair(args, pair_id, output_manager, shard_dir)
+                except Exception as e:
+                    logging.error("Error rendering pair %s, skipped until restart: %s", pair_id, e)
+                    failed.add(pair_id)
+                else:
+                    rendered.add(pair_id)
+                    refresh = True
+
+            cohort_ids = [pair_id for pair_id in sheet if pair_id in rendered]
+            if refresh and cohort_ids:
+                metrics = StageMetrics()
+                try:
+                    pre_samples, post_samples, pairs = load_sample_objects(args, metrics, shard=cohort_ids,
+                                                                           load=False)
+                    output_manager.create_paired_structure(cohort_ids)
+                    pair_lines = restore_shards(pairs, shard_dir, metrics)
+                    summary_file = write_cohort_pages(args, pre_samples, post_samples, pairs, parameters,
+                                                      output_manager, metrics, shard_dir, pair_lines)
+                except Exception as e:  # keep watching; the next batch retries the refresh
+                    logging.error("Error refreshing the cohort pages: %s", e)
+                else:
+                    metrics.append_slowest_section(summary_file, ("summary_page", "chromosome_page"),
+                                                   n=args.metrics_top_n)
+                    if args.metrics_json:
+                        metrics.write_json(args.metrics_json, driver="paired",
+                                           output_dir=os.path.abspath(args.output_dir))
+                    logging.info("Watch mode: report refreshed with %d pairs", len(pairs))
+                refresh = False
+            watcher.wait()
+    except KeyboardInterrupt:
+        logging.info("Watch mode stopped")
+    finally:
+        watcher.close()
+
+
 # ────────────────────────────────────────────────────────────────────────────────
 # MAIN
 # ────────────────────────────────────────────────────────────────────────────────
 def main() -> None:
     args = parse_args()
+    metrics = StageMetrics()
     
     # Load parameters first
     parameters = Parameters(args.parameters)
@@ -200,7 +525,43 @@ def main() -> None:
     setup_logger(args.log_file)
 
     logging.info("🟢  CNV paired‑analysis run started")
-    pre_samples, post_samples, pairs = load_sample_objects(args)
+
+    # Optional profiling hooks
+    if args.profile_dir:
+        profiler = Profiler(args.profile_dir, samples=args.profile_samples, chromosomes=args.profile_chromosomes)
+        install_profiling_hooks(
+            profiler,
+            sample_classes=[PreSample, PostSample],
+            pair_classes=[PairedClass],
+            summary_generators=[(SampleSummaryGenerator, "pair_obj")],
+            chromosome_generators=[(ChromosomePageGeneratorPaired, "pair_obj")],
+        )
+        logging.info("Profiling enabled → %s", args.profile_dir)
+    shard_dir = args.shard_dir or os.path.join(args.output_dir, SHARD_DIR)
+    # --samples / --chromosomes: update an existing report, the other pairs come from their metadata
+    targeted = bool(args.samples or args.chromosomes)
+    render_ids = args.shard
+    try:
+        if targeted:
+            _, _, sheet_pairs = load_sample_objects(args, metrics, load=False)
+            if args.samples:
+                selected = select_shard(sheet_pairs, args.samples,
+                                                    lambda p: (p.pair_id, p.pre.sample_id, p.post.sample_id))
+            else:
+                selected = sheet_pairs
+            render_ids = [p.pair_id for p in selected]
+            missing = {p.pair_id for p in sheet_pairs} - set(render_ids) - rendered_shards(shard_dir)
+            if missing:
+                logging.error("No saved metadata in %s for %s; render the full report once before "
+                              "re-rendering selected pairs", shard_dir, sorted(missing))
+                sys.exit(1)
+            logging.info("Re-rendering %s%s", ", ".join(render_ids),
+                         f" (chromosomes {', '.join(args.chromosomes)})" if args.chromosomes else "")
+        pre_samples, post_samples, pairs = load_sample_objects(args, metrics, shard=render_ids,
+                                                               load=not (args.merge or args.watch))
+    except ValueError as e:
+        logging.error(str(e))
+        sys.exit(1)
     logging.info(
         "Loaded %d PRE, %d POST, %d pairs",
         len(pre_samples),
@@ -208,19 +569,25 @@ def main() -> None:
         len(pairs),
     )
 
-    # Create output structure for pairs
-    output_manager = OutputManager(args.output_dir, app_name=args.app_name)
-    pair_ids = [p.pair_id for p in pairs]
-    output_manager.create_paired_structure(pair_ids, args.logo)
+    pair_lines = None
+    if args.merge:
+        # The cohort pages only need the per-pair numbers and CNV calls saved by the shards
+        try:
+            pair_lines = restore_shards(pairs, shard_dir, metrics)
+        except (OSError, ValueError, KeyError) as e:
+            logging.error("Error reading shard metadata: %s", e)
+            sys.exit(1)
+        logging.info("Read shard metadata of %d pairs from %s", len(pair_lines), shard_dir)
 
-    write_processing_summary(
-        os.path.join(args.output_dir, "processing_summary_paired.txt"),
-        pre_samples,
-        post_samples,
-        pairs,
-        args.log_file,
-        args.samples_dir,
-    )
+    # Create output structure for pairs
+    output_manager = OutputManager(args.output_dir, app_name=args.app_name, json_tables=args.json_tables,
+                                   baf_thin_stride=args.baf_thin_stride, single_page=args.single_page,
+                                   offline_assets=args.offline_assets, vendor_dir=args.vendor_dir,
+                                   compress=args.compress, compress_brotli=args.compress_brotli,
+                                   quick_look=args.quick_look, quick_look_stride=args.quick_look_stride,
+                                   region_store=args.region_store)
+    pair_ids = [] if args.watch else [p.pair_id for p in pairs]  # --watch: as they land
+    output_manager.create_paired_structure(pair_ids, None if targeted else args.logo)
 
     # Initialize styling components
     styling_manager = StylingManager(
@@ -230,41 +597,103 @@ def main() -> None:
         email_analyst=args.email_analyst,
         name_analyst=args.name_analyst
     )
-    styling_manager.create_all_components()
-    logging.info("Created styling components")
-    
-    logging.info("Generating home page...")
-    home_page_generator = HomePageGenerator(
-        pre_samples, 
-        post_samples, 
-        pairs, 
-        output_manager,
-        parameters  # Add parameters
-    )
-    html_path = os.path.join(args.output_dir, output_manager.get_home_page_name())
-    home_page_generator.save(html_path)
-    logging.info(f"Successfully generated home page: {output_manager.get_home_page_name()}")
-    logging.info("Created home page")
-        
-    single_simulated_objs, paired_simulated_objs = load_simulated_samples(args.simulated_data_dir)
-    logging.info("Loaded simulated data")
-    info_generator = InfoPageGenerator(output_manager, single_simulated_objs, paired_simulated_objs, 
-                                       support_email=args.support_helmholtz)
-    info_generator.save()
-    logging.info("Created documentation components with simulated data")
-    
-
-    logging.info("Generating paired sample summary pages...")
-    for pair in pairs:
-        summary_generator = SampleSummaryGenerator(pair, output_manager)
-        summary_generator.save()
-        
-        # Add chromosome page generation
-        chrom_generator = ChromosomePageGeneratorPaired(pair, output_manager)
-        chrom_generator.save_chromosome_pages()
+    # Shared by all pages: written once by the merge, kept from the original run by --samples /
+    # --chromosomes. Offline asset tags do not depend on this copy (AssetBundle.available).
+    if not (args.shard or targeted):
+        styling_manager.create_all_components()
+        logging.info("Created styling components")
+
+    if args.watch:
+        watch_pairs(args, parameters, output_manager, shard_dir)
+        return
+
+    if output_manager.quick_look:
+        output_manager.report_status.begin({p.pair_id: len(p.post.available_chromosomes or []) for p in pairs})
+
+    if not args.merge:
+        # Every rendering run saves each pair's metadata (for --merge, --watch and --samples).
+        # Snapshot before rendering: the page generators add columns to the loaded tables
+        shard_records = {
+            pair.pair_id: ({
+                "pair": object_state(pair, SHARD_ATTRIBUTES, PAIR_SHARD_FRAMES),
+                "pre": object_state(pair.pre, SHARD_ATTRIBUTES, SAMPLE_SHARD_FRAMES),
+                "post": object_state(pair.post, SHARD_ATTRIBUTES, SAMPLE_SHARD_FRAMES),
+                "summary_line": pair_summary_line(pair),
+            }, matrix_row(pair.post.baf_lrr_data, pair.cnv_detection_filtered, args.recurrence_bin_size))
+            for pair in pairs
+        }
+
+    if not (args.shard or targeted):
+        try:
+            summary_file = write_cohort_pages(args, pre_samples, post_samples, pairs, parameters,
+                                              output_manager, metrics, shard_dir, pair_lines)
+        except (OSError, ValueError) as e:
+            logging.error("Error writing the cohort pages: %s", e)
+            sys.exit(1)
+
+    if not args.merge:
+        logging.info("Generating paired sample summary pages...")
+        # --quick_look: low-resolution chromosome pages first, replaced after the loop
+        preview_stride = args.quick_look_stride if output_manager.quick_look else 0
+        for pair in pairs:
+            summary_generator = SampleSummaryGenerator(pair, output_manager)
+            with metrics.stage("summary_page", sample=pair.pair_id) as rec:
+                rec["output_bytes"] = os.path.getsize(summary_generator.save())
+            
+            # Add chromosome page generation
+            chrom_generator = ChromosomePageGeneratorPaired(pair, output_manager, metrics=metrics)
+            chrom_generator.save_chromosome_pages(preview_stride=preview_stride, chromosomes=args.chromosomes,
+                                                  viewer=not args.chromosomes)
+
+    if output_manager.quick_look:
+        with metrics.stage("preview_flush"):
+            output_manager.flush_pages()
+        # Phase two: the full pages replace the previews in place (each renamed over its preview)
+        output_manager.report_status.set_phase("full")
+        logging.info("Replacing the quick-look chromosome pages with full-resolution pages...")
+        for pair in pairs:
+            chrom_generator = ChromosomePageGeneratorPaired(pair, output_manager, metrics=metrics)
+            chrom_generator.save_chromosome_pages(viewer=False)
+
+    # Wait for the background writer to finish the chromosome pages
+    with metrics.stage("page_writer_flush"):
+        output_manager.flush_pages()
+    if output_manager.quick_look:
+        output_manager.report_status.set_phase("complete")
+
+    if not args.merge:
+        with metrics.stage("shard_metadata") as rec:
+            previous = rendered_shards(shard_dir) if args.chromosomes else set()
+            for pair_id, (record, row) in shard_records.items():
+                record["metrics"] = shard_page_metrics(metrics, {pair_id})
+                if pair_id in previous:  # keep the metrics of the chromosome pages not re-rendered
+                    record["metrics"] += kept_page_metrics(shard_dir, pair_id, args.chromosomes)
+                rec["output_bytes"] += write_shard(shard_dir, pair_id, record, row)
+
+    if targeted:
+        # Release the loaded pairs; the home and cohort pages are rebuilt from the metadata of all
+        rendered = set(shard_records)
+        try:
+            pre_samples, post_samples, pairs = load_sample_objects(args, metrics, load=False)
+            output_manager.create_paired_structure([p.pair_id for p in pairs])
+            pair_lines = restore_shards(pairs, shard_dir, metrics, rendered=rendered)
+            summary_file = write_cohort_pages(args, pre_samples, post_samples, pairs, parameters,
+                                              output_manager, metrics, shard_dir, pair_lines, info_page=False)
+        except (OSError, ValueError, KeyError) as e:
+            logging.error("Error updating the cohort pages: %s", e)
+            sys.exit(1)
+
+    if not args.shard:
+        metrics.append_slowest_section(summary_file, ("summary_page", "chromosome_page"), n=args.metrics_top_n)
+    if output_manager.precompressor is not None:
+        with metrics.stage("precompress") as rec:
+            stats = output_manager.finish_compression()
+            rec["output_bytes"] = stats["gzip_bytes"] + stats["brotli_bytes"]
+    if args.metrics_json:
+        metrics.write_json(args.metrics_json, driver="paired", output_dir=os.path.abspath(args.output_dir))
+        logging.info("Wrote metrics → %s", args.metrics_json)
 
     logging.info("🏁  Run finished successfully")
 
-
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -21,6 +21,22 @@ from src.pages.home_page_single import HomePageGenerator
 from src.pages.info_page import InfoPageGenerator
 from src.pages.sample_summary_page_single import SampleSummaryGeneratorSingle
 from src.pages.sample_chromosome_single import ChromosomePageGeneratorSingle
+from src.plots.recurrence import DEFAULT_BIN_SIZE, cohort_chromosomes, cohort_recurrence
+from src.plots.cohort_matrix import cohort_matrix
+from src.pages.cohort_heatmap_page import COHORT_HEATMAP_PAGE, CohortHeatmapPageGenerator
+from src.utils.stage_metrics import StageMetrics
+from src.utils.profiling import Profiler, install_profiling_hooks
+from src.utils.region_store import REGION_STORE_DIR
+from src.utils.report_status import QUICK_LOOK_STRIDE, STATUS_JSON
+from src.utils.shards import (
+    SHARD_DIR, matrix_row, merge_cohort_matrix, object_state, read_shards, rendered_shards, restore_state,
+    select_shard, kept_page_metrics, shard_page_metrics, write_shard
+)
+from src.utils.watch import DONE_MARKER, WATCH_INTERVAL, SampleWatcher
+
+# Sample attributes the cohort pages need, saved per sample by --shard runs for --merge
+SHARD_ATTRIBUTES = ('total_cnvs', 'significant_cnvs', 'available_chromosomes')
+SHARD_FRAMES = ('cnv_detection_filtered',)
 
 def setup_logging(log_file):
     """Set up logging configuration"""
@@ -34,26 +50,22 @@ def setup_logging(log_file):
     )
 
 def create_sample_objects(sample_types_file, parameters_obj):
-    """Create SingleSample objects from the sample types CSV file"""
+    """Create SingleSample objects from the sample types CSV file (raises if it cannot be read)"""
     samples = []
-    try:
-        df = pd.read_csv(sample_types_file)
-        for _, row in df.iterrows():
-            sample = SingleSample(
-                sample_id=row['sample_id'],
-                sample_type=row['type'],
-                pre_sample=row['pre_sample'],
-                pre_sex=row['pre_sex'],
-                call_rate=row['call_rate'],
-                call_rate_filt=row['call_rate_filt'],
-                LRR_stdev=row['LRR_stdev'],
-                parameters=parameters_obj
-            )
-            samples.append(sample)
-        return samples
-    except Exception as e:
-        logging.error(f"Error reading sample types file: {str(e)}")
-        sys.exit(1)
+    df = pd.read_csv(sample_types_file)
+    for _, row in df.iterrows():
+        sample = SingleSample(
+            sample_id=row['sample_id'],
+            sample_type=row['type'],
+            pre_sample=row['pre_sample'],
+            pre_sex=row['pre_sex'],
+            call_rate=row['call_rate'],
+            call_rate_filt=row['call_rate_filt'],
+            LRR_stdev=row['LRR_stdev'],
+            parameters=parameters_obj
+        )
+        samples.append(sample)
+    return samples
 
 
 def parse_args() -> argparse.Namespace:
@@ -71,10 +83,247 @@ def parse_args() -> argparse.Namespace:
     p.add_argument("--support_helmholtz", default="", help="Helmholtz support email")
     p.add_argument("--email_analyst", default="", help="Analyst email (optional)")
     p.add_argument("--name_analyst", default="", help="Analyst name (optional)")
-    return p.parse_args()
+    p.add_argument("--json_tables", "--json-tables", action="store_true",
+                   help="Embed sample and CNV tables as JSON, drawn by a virtual-scrolling table in the browser")
+    p.add_argument("--baf_thin_stride", "--baf-thin-stride", type=int, default=0,
+                   help="On chromosome pages keep all informative BAF points (0.1-0.9) but only every n-th "
+                        "homozygous one (default: 0, draw all points)")
+    p.add_argument("--single_page", "--single-page", action="store_true",
+                   help="Write one chromosome viewer page per sample that loads small per-chromosome "
+                        "data scripts (chr<N>.js) on demand, instead of one HTML page per chromosome")
+    p.add_argument("--offline_assets", "--offline-assets", action="store_true",
+                   help="Copy BokehJS and the other front-end assets into components/vendor and load them "
+                        "from there, so opening the report needs no network access")
+    p.add_argument("--vendor_dir", "--vendor-dir", default=None,
+                   help="With --offline_assets: directory holding html2canvas/, font-awesome/ and inter/ "
+                        "to copy alongside BokehJS (assets missing here are left out of the pages)")
+    p.add_argument("--compress", action="store_true",
+                   help="Also write a gzip-compressed .gz sibling of every page and data file, plus example "
+                        "nginx / Apache configuration for serving them (gzip_static)")
+    p.add_argument("--compress_brotli", "--compress-brotli", action="store_true",
+                   help="Like --compress, and also write .br siblings (needs the brotli module)")
+    p.add_argument("--shard", nargs="+", default=None, metavar="SAMPLE_ID",
+                   help="Render only the summary and chromosome pages of these samples and write their "
+                        "metadata to --shard_dir; the home, info and cohort pages are built by --merge")
+    p.add_argument("--merge", action="store_true",
+                   help="Build the home, info and cohort pages and processing_summary.txt from the metadata "
+                        "of earlier --shard runs in --shard_dir, without loading any sample data")
+    p.add_argument("--shard_dir", "--shard-dir", default=None,
+                   help=f"Directory of the per-sample shard metadata (default: <output_dir>/{SHARD_DIR})")
+    p.add_argument("--quick_look", "--quick-look", action="store_true",
+                   help="Write the home and summary pages and low-resolution chromosome pages first, then "
+                        f"replace the chromosome pages in place with full ones (progress in {STATUS_JSON})")
+    p.add_argument("--quick_look_stride", "--quick-look-stride", type=int, default=QUICK_LOOK_STRIDE,
+                   help=f"Quick-look chromosome pages draw every n-th SNP (default: {QUICK_LOOK_STRIDE})")
+    p.add_argument("--region_store", "--region-store", action="store_true",
+                   help="Embed only a min/max overview of the BAF / LRR points in the chromosome pages and write "
+                        f"each sample's points to <output_dir>/{REGION_STORE_DIR}; served with serve_report.py, "
+                        "the plots reload the visible range at screen resolution on pan / zoom")
+    p.add_argument("--samples", nargs="+", default=None, metavar="SAMPLE_ID",
+                   help="Re-render only these samples in an existing report: load just their data, rewrite their "
+                        "pages and metadata, and update the home and cohort pages from the saved metadata of the rest")
+    p.add_argument("--chromosomes", nargs="+", default=None, metavar="CHROM",
+                   help="Only (re-)write the chromosome pages of these chromosomes (e.g. 1 X); with --samples, "
+                        "of those samples only")
+    p.add_argument("--watch", action="store_true",
+                   help="Keep running and render each sample as soon as its folder in --samples_dir contains "
+                        "--done_marker, refreshing the home and cohort pages after each batch (stop with Ctrl-C)")
+    p.add_argument("--done_marker", "--done-marker", default=DONE_MARKER,
+                   help=f"With --watch: file marking a sample folder as complete (default: {DONE_MARKER})")
+    p.add_argument("--watch_interval", "--watch-interval", type=float, default=WATCH_INTERVAL,
+                   help=f"With --watch: seconds between checks without inotify (default: {WATCH_INTERVAL:g})")
+    p.add_argument("--recurrence_bin_size", "--recurrence-bin-size", type=int, default=DEFAULT_BIN_SIZE,
+                   help=f"Bin size (bp) of the cohort CNV recurrence track and the cohort heatmap (default: {DEFAULT_BIN_SIZE})")
+    p.add_argument("--metrics_json", "--metrics-json", default=None,
+                   help="Write per-stage / per-sample / per-chromosome timing, memory and size metrics to this JSON file")
+    p.add_argument("--profile_dir", "--profile-dir", default=None,
+                   help="Profile load_data, summary and chromosome pages (cProfile, collapsed stacks, tracemalloc) into this directory")
+    p.add_argument("--profile_samples", nargs="+", default=None,
+                   help="Only profile these samples / pair IDs (default: all)")
+    p.add_argument("--profile_chromosomes", nargs="+", default=None,
+                   help="Only profile chromosome pages of these chromosomes (default: all)")
+    p.add_argument("--metrics_top_n", type=int, default=10,
+                   help="Number of slowest pages listed in processing_summary.txt (default: 10)")
+    args = p.parse_args()
+    if args.shard and args.merge:
+        p.error("--shard and --merge are mutually exclusive")
+    if args.quick_look and (args.shard or args.merge):
+        p.error("--quick_look cannot be combined with --shard / --merge")
+    if args.quick_look_stride < 2:
+        p.error("--quick_look_stride must be at least 2")
+    if (args.samples or args.chromosomes) and (args.shard or args.merge or args.quick_look):
+        p.error("--samples / --chromosomes cannot be combined with --shard / --merge / --quick_look")
+    if args.chromosomes:
+        args.chromosomes = [c[3:] if c.lower().startswith('chr') else c for c in args.chromosomes]
+    if args.watch and (args.samples or args.chromosomes or args.shard or args.merge or args.quick_look
+                       or args.compress or args.compress_brotli):
+        p.error("--watch cannot be combined with --samples / --chromosomes / --shard / --merge / --quick_look / --compress")
+    return args
+
+def write_cohort_pages(args, real_samples, output_manager, metrics, shard_dir, info_page=True):
+    """Cohort recurrence and heatmap, home page, processing summary and info page (unless
+    info_page is False); returns the path of processing_summary.txt. Errors are raised, so
+    --watch can log them and keep running"""
+    # Cohort-wide CNV recurrence (home page track + cohort ideogram)
+    with metrics.stage('cohort_recurrence') as rec:
+        recurrence = cohort_recurrence(
+            {s.sample_id: s.cnv_detection_filtered for s in real_samples},
+            chromosomes=cohort_chromosomes(real_samples),
+            bin_size=args.recurrence_bin_size,
+        )
+        rec['output_bytes'] = os.path.getsize(
+            recurrence.to_tsv(os.path.join(args.output_dir, 'cohort_recurrence.tsv')))
+    logging.info(f"Cohort recurrence: {len(recurrence.gains)} bins, max {recurrence.gains.max(initial=0)} gains / "
+                 f"{recurrence.losses.max(initial=0)} losses per bin")
+
+    # Samples × bins matrix of LRR / BAF deviation / CN (cohort heatmap page)
+    with metrics.stage('cohort_matrix') as rec:
+        if args.merge or args.watch or args.samples or args.chromosomes:  # samples not loaded in this run
+            matrix = merge_cohort_matrix(shard_dir, [s.sample_id for s in real_samples],
+                                         chromosomes=cohort_chromosomes(real_samples),
+                                         bin_size=args.recurrence_bin_size)
+        else:
+            matrix = cohort_matrix(
+                {s.sample_id: (s.baf_lrr_data, s.cnv_detection_filtered) for s in real_samples},
+                chromosomes=cohort_chromosomes(real_samples),
+                bin_size=args.recurrence_bin_size,
+            )
+        rec['output_bytes'] = os.path.getsize(matrix.save(args.output_dir))
+    with metrics.stage('cohort_heatmap_page') as rec:
+        heatmap_page = CohortHeatmapPageGenerator(
+            matrix, output_manager, cnv_by_sample={s.sample_id: s.cnv_detection_filtered for s in real_samples})
+        rec['output_bytes'] = os.path.getsize(heatmap_page.save(os.path.join(args.output_dir, COHORT_HEATMAP_PAGE)))
+
+    # Generate home page
+    try:
+        logging.info("Generating home page...")
+        home_page_generator = HomePageGenerator(real_samples, output_manager, recurrence=recurrence,
+                                                cohort_heatmap=True)
+        output_path = os.path.join(args.output_dir, output_manager.get_home_page_name())
+        with metrics.stage('home_page') as rec:
+            home_page_generator.save(output_path)
+            rec['output_bytes'] = os.path.getsize(output_path)
+        logging.info(f"Successfully generated home page: {output_manager.get_home_page_name()}")
+    except Exception as e:
+        logging.error(f"Error generating home page: {str(e)}")
+        raise
+    
+    # Create a summary file in the output directory
+    summary_file = os.path.join(args.output_dir, "processing_summary.txt")
+    with open(summary_file, 'w') as f:
+        f.write("Processing Summary\n")
+        f.write("================\n\n")
+        f.write(f"Total samples processed: {len(real_samples)}\n")
+        for sample in real_samples:
+            f.write(f"\nSample: {sample.pre_sample}\n")
+            f.write(f"Type: {sample.sample_type}\n")
+            f.write(f"Sex: {sample.pre_sex}\n")
+            f.write(f"Call Rate: {sample.call_rate:.2f}\n")
+            f.write(f"Filtered Call Rate: {sample.call_rate_filt:.2f}\n")
+            f.write(f"LRR Standard Deviation: {sample.LRR_stdev:.2f}\n")
+            f.write(f"Total CNVs: {sample.total_cnvs}\n")
+    logging.info("Processing complete")
+
+    if not info_page:
+        return summary_file
+    single_simulated_objs, paired_simulated_objs = load_simulated_samples(args.simulated_data_dir)
+
+    info_generator = InfoPageGenerator(output_manager, single_simulated_objs, paired_simulated_objs,
+                                       support_email=args.support_helmholtz)
+    with metrics.stage('info_page') as rec:
+        rec['output_bytes'] = os.path.getsize(info_generator.save())
+    logging.info("Created documentation components with simulated data")
+    return summary_file
+
+def restore_shards(real_samples, shard_dir, metrics, rendered=()):
+    """Set the saved numbers and CNV calls on samples whose data is not loaded (--merge, --watch,
+    --samples) and add their page metrics to `metrics`, except those of the `rendered` samples
+    (already recorded by this run)"""
+    with metrics.stage('shard_metadata'):
+        shards = read_shards(shard_dir, [s.sample_id for s in real_samples])
+        for sample in real_samples:
+            restore_state(sample, shards[sample.sample_id]['sample'])
+            if sample.sample_id not in rendered:
+                metrics.records.extend(shards[sample.sample_id]['metrics'])
+    return shards
+
+def render_watched_sample(args, sample, output_manager, shard_dir):
+    """--watch: load one sample, write its summary and chromosome pages and its shard metadata"""
+    metrics = StageMetrics()
+    output_manager.create_directory_structure([sample.pre_sample])
+    with metrics.stage('load', sample=sample.sample_id):
+        sample.load_data(args.samples_dir)
+    # Snapshot before rendering: the page generators add columns to the loaded tables
+    record = {'sample': object_state(sample, SHARD_ATTRIBUTES, SHARD_FRAMES)}
+    row = matrix_row(sample.baf_lrr_data, sample.cnv_detection_filtered, args.recurrence_bin_size)
+
+    summary_generator = SampleSummaryGeneratorSingle(sample, output_manager)
+    with metrics.stage('summary_page', sample=sample.sample_id) as rec:
+        rec['output_bytes'] = os.path.getsize(summary_generator.save())
+    ChromosomePageGeneratorSingle(sample, output_manager, metrics=metrics).save_chromosome_pages()
+    with metrics.stage('page_writer_flush'):
+        output_manager.flush_pages()
+
+    record['metrics'] = shard_page_metrics(metrics, {sample.sample_id})
+    write_shard(shard_dir, sample.sample_id, record, row)
+
+def watch_samples(args, parameters, output_manager, shard_dir):
+    """--watch: render every sample of the sample sheet whose folder gets the done marker,
+    one at a time (its data is released before the next is loaded), then rebuild the home
+    and cohort pages from the shard metadata of all rendered samples. Runs until interrupted;
+    samples rendered by an earlier watch run (shard metadata present) are not rendered again."""
+    watcher = SampleWatcher(args.samples_dir, marker=args.done_marker, interval=args.watch_interval)
+    rendered = rendered_shards(shard_dir)
+    failed = set()
+    refresh = bool(rendered)
+    try:
+        while True:
+            try:
+                sheet = create_sample_objects(args.sample_types, parameters)
+            except Exception as e:  # sheet being rewritten
+                logging.warning(f"Could not read the sample types file, retrying: {str(e)}")
+                sheet = []
+            new = [s for s in sheet if s.sample_id not in (rendered | failed) and watcher.is_complete(s.pre_sample)]
+            while new:
+                sample = new.pop(0)
+                logging.info(f"Watch mode: rendering new sample {sample.sample_id}")
+                try:
+                    render_watched_sample(args, sample, output_manager, shard_dir)
+                except Exception as e:
+                    logging.error(f"Error rendering sample {sample.sample_id}, skipped until restart: {str(e)}")
+                    failed.add(sample.sample_id)
+                else:
+                    rendered.add(sample.sample_id)
+                    refresh = True
+                del sample  # drop the loaded tables before the next sample
+
+            if refresh:
+                metrics = StageMetrics()
+                try:
+                    cohort = [s for s in create_sample_objects(args.sample_types, parameters)
+                              if s.sample_id in rendered]
+                    output_manager.create_directory_structure([s.pre_sample for s in cohort])
+                    restore_shards(cohort, shard_dir, metrics)
+                    summary_file = write_cohort_pages(args, cohort, output_manager, metrics, shard_dir)
+                except Exception as e:  # keep watching; the next batch retries the refresh
+                    logging.error(f"Error refreshing the cohort pages: {str(e)}")
+                else:
+                    metrics.append_slowest_section(summary_file, ('summary_page', 'chromosome_page'),
+                                                   n=args.metrics_top_n)
+                    if args.metrics_json:
+                        metrics.write_json(args.metrics_json, driver='single',
+                                           output_dir=os.path.abspath(args.output_dir))
+                    logging.info(f"Watch mode: report refreshed with {len(cohort)} samples")
+                refresh = False
+            watcher.wait()
+    except KeyboardInterrupt:
+        logging.info("Watch mode stopped")
+    finally:
+        watcher.close()
 
 def main() -> None:
     args = parse_args()
+    metrics = StageMetrics()
     
     # Load parameters first
     parameters = Parameters(args.parameters)
@@ -83,6 +332,17 @@ def main() -> None:
     setup_logging(args.log_file)
     logging.info("Starting dynamic plotting for single samples")
     
+    # Optional profiling hooks
+    if args.profile_dir:
+        profiler = Profiler(args.profile_dir, samples=args.profile_samples, chromosomes=args.profile_chromosomes)
+        install_profiling_hooks(
+            profiler,
+            sample_classes=[SingleSample],
+            summary_generators=[(SampleSummaryGeneratorSingle, 'sample_obj')],
+            chromosome_generators=[(ChromosomePageGeneratorSingle, 'sample_obj')],
+        )
+        logging.info(f"Profiling enabled → {args.profile_dir}")
+    
     # Verify inputs exist
     if not os.path.isdir(args.samples_dir):
         logging.error(f"Samples directory not found: {args.samples_dir}")
@@ -100,12 +360,46 @@ def main() -> None:
         sys.exit(f"simulated_data_dir not found → {args.simulated_data_dir}")
     
     # Then create samples with parameters
-    real_samples = create_sample_objects(args.sample_types, parameters)
+    try:
+        real_samples = create_sample_objects(args.sample_types, parameters)
+    except Exception as e:
+        logging.error(f"Error reading sample types file: {str(e)}")
+        sys.exit(1)
+    sheet_ids = [s.sample_id for s in real_samples]
+    shard_dir = args.shard_dir or os.path.join(args.output_dir, SHARD_DIR)
+    if args.shard:
+        try:
+            real_samples = select_shard(real_samples, args.shard, lambda s: (s.sample_id, s.pre_sample))
+        except ValueError as e:
+            logging.error(str(e))
+            sys.exit(1)
+        logging.info(f"Rendering shard: {', '.join(s.sample_id for s in real_samples)}")
+    # --samples / --chromosomes: update an existing report, the other samples come from their metadata
+    targeted = bool(args.samples or args.chromosomes)
+    if args.samples:
+        try:
+            real_samples = select_shard(real_samples, args.samples, lambda s: (s.sample_id, s.pre_sample))
+        except ValueError as e:
+            logging.error(str(e))
+            sys.exit(1)
+    if targeted:
+        missing = set(sheet_ids) - {s.sample_id for s in real_samples} - rendered_shards(shard_dir)
+        if missing:
+            logging.error(f"No saved metadata in {shard_dir} for {sorted(missing)}; "
+                          f"render the full report once before re-rendering selected samples")
+            sys.exit(1)
+        logging.info(f"Re-rendering {', '.join(s.sample_id for s in real_samples)}"
+                     + (f" (chromosomes {', '.join(args.chromosomes)})" if args.chromosomes else ""))
     
     # Initialize output manager with REAL SAMPLES ONLY
-    output_manager = OutputManager(args.output_dir, app_name=args.app_name)
-    sample_names = [s.pre_sample for s in real_samples]  # Only real samples
-    directory_structure = output_manager.create_directory_structure(sample_names, args.logo)
+    output_manager = OutputManager(args.output_dir, app_name=args.app_name, json_tables=args.json_tables,
+                                   baf_thin_stride=args.baf_thin_stride, single_page=args.single_page,
+                                   offline_assets=args.offline_assets, vendor_dir=args.vendor_dir,
+                                   compress=args.compress, compress_brotli=args.compress_brotli,
+                                   quick_look=args.quick_look, quick_look_stride=args.quick_look_stride,
+                                   region_store=args.region_store)
+    sample_names = [] if args.watch else [s.pre_sample for s in real_samples]  # Only real samples (--watch: as they land)
+    directory_structure = output_manager.create_directory_structure(sample_names, None if targeted else args.logo)
     logging.info("Created output directory structure:\n" + str(directory_structure))
     
     # Initialize styling manager and create styling components
@@ -116,61 +410,114 @@ def main() -> None:
         email_analyst=args.email_analyst,
         name_analyst=args.name_analyst
     )
-    styling_manager.create_all_components()
-    logging.info("Created styling components")
-    
-    # Load data for each sample
-    for sample in real_samples:
-        logging.info(f"Loading data for sample: {sample.pre_sample}")
-        sample.load_data(args.samples_dir)
+    # Shared by all pages: written once by the merge, kept from the original run by --samples /
+    # --chromosomes. Offline asset tags do not depend on this copy (AssetBundle.available).
+    if not (args.shard or targeted):
+        styling_manager.create_all_components()
+        logging.info("Created styling components")
+
+    if args.watch:
+        watch_samples(args, parameters, output_manager, shard_dir)
+        return
     
-    # Generate home page
-    try:
-        logging.info("Generating home page...")
-        home_page_generator = HomePageGenerator(real_samples, output_manager)
-        html_content = home_page_generator.generate()
-        output_path = os.path.join(args.output_dir, output_manager.get_home_page_name())
-        home_page_generator.save(output_path)
-        logging.info(f"Successfully generated home page: {output_manager.get_home_page_name()}")
-    except Exception as e:
-        logging.error(f"Error generating home page: {str(e)}")
-        sys.exit(1)
+    if args.merge:
+        # The cohort pages only need the per-sample numbers and CNV calls saved by the shards
+        try:
+            shards = restore_shards(real_samples, shard_dir, metrics)
+        except (OSError, ValueError, KeyError) as e:
+            logging.error(f"Error reading shard metadata: {str(e)}")
+            sys.exit(1)
+        logging.info(f"Read shard metadata of {len(shards)} samples from {shard_dir}")
+    else:
+        # Load data for each sample
+        for sample in real_samples:
+            logging.info(f"Loading data for sample: {sample.pre_sample}")
+            with metrics.stage('load', sample=sample.sample_id):
+                sample.load_data(args.samples_dir)
     
-    # Create a summary file in the output directory
-    summary_file = os.path.join(args.output_dir, "processing_summary.txt")
-    with open(summary_file, 'w') as f:
-        f.write("Processing Summary\n")
-        f.write("================\n\n")
-        f.write(f"Total samples processed: {len(real_samples)}\n")
+    if output_manager.quick_look:
+        output_manager.report_status.begin({s.sample_id: len(s.available_chromosomes or []) for s in real_samples})
+
+    if not args.merge:
+        # Every rendering run saves each sample's metadata (for --merge, --watch and --samples).
+        # Snapshot before rendering: the page generators add columns to the loaded tables
+        shard_records = {
+            sample.sample_id: ({'sample': object_state(sample, SHARD_ATTRIBUTES, SHARD_FRAMES)},
+                               matrix_row(sample.baf_lrr_data, sample.cnv_detection_filtered,
+                                          args.recurrence_bin_size))
+            for sample in real_samples
+        }
+
+    if not (args.shard or targeted):
+        try:
+            summary_file = write_cohort_pages(args, real_samples, output_manager, metrics, shard_dir)
+        except Exception as e:
+            logging.error(f"Error writing the cohort pages: {str(e)}")
+            sys.exit(1)
+
+    if not args.merge:
+        # --quick_look: low-resolution chromosome pages first, replaced after the loop
+        preview_stride = args.quick_look_stride if output_manager.quick_look else 0
+        # Remove simulated samples from any other processing
+        # Keep only real samples in these loops:
         for sample in real_samples:
-            f.write(f"\nSample: {sample.pre_sample}\n")
-            f.write(f"Type: {sample.sample_type}\n")
-            f.write(f"Sex: {sample.pre_sex}\n")
-            f.write(f"Call Rate: {sample.call_rate:.2f}\n")
-            f.write(f"Filtered Call Rate: {sample.call_rate_filt:.2f}\n")
-            f.write(f"LRR Standard Deviation: {sample.LRR_stdev:.2f}\n")
-            f.write(f"Total CNVs: {sample.total_cnvs}\n")
-    logging.info("Processing complete")
+            summary_generator = SampleSummaryGeneratorSingle(sample, output_manager)
+            with metrics.stage('summary_page', sample=sample.sample_id) as rec:
+                rec['output_bytes'] = os.path.getsize(summary_generator.save())
+            
+            chrom_generator = ChromosomePageGeneratorSingle(sample, output_manager, metrics=metrics)
+            chrom_generator.save_chromosome_pages(preview_stride=preview_stride, chromosomes=args.chromosomes,
+                                                  viewer=not args.chromosomes)
 
+    if output_manager.quick_look:
+        with metrics.stage('preview_flush'):
+            output_manager.flush_pages()
+        # Phase two: the full pages replace the previews in place (each renamed over its preview)
+        output_manager.report_status.set_phase('full')
+        for sample in real_samples:
+            chrom_generator = ChromosomePageGeneratorSingle(sample, output_manager, metrics=metrics)
+            chrom_generator.save_chromosome_pages(viewer=False)
 
-    single_simulated_objs, paired_simulated_objs = load_simulated_samples(args.simulated_data_dir)
+    # Wait for the background writer to finish the chromosome pages
+    with metrics.stage('page_writer_flush'):
+        output_manager.flush_pages()
+    if output_manager.quick_look:
+        output_manager.report_status.set_phase('complete')
 
-    info_generator = InfoPageGenerator(output_manager, single_simulated_objs, paired_simulated_objs,
-                                       support_email=args.support_helmholtz)
-    info_generator.save()
-    logging.info("Created documentation components with simulated data")
+    if not args.merge:
+        with metrics.stage('shard_metadata') as rec:
+            previous = rendered_shards(shard_dir) if args.chromosomes else set()
+            for sample_id, (record, row) in shard_records.items():
+                record['metrics'] = shard_page_metrics(metrics, {sample_id})
+                if sample_id in previous:  # keep the metrics of the chromosome pages not re-rendered
+                    record['metrics'] += kept_page_metrics(shard_dir, sample_id, args.chromosomes)
+                rec['output_bytes'] += write_shard(shard_dir, sample_id, record, row)
 
-    # Remove simulated samples from any other processing
-    # Keep only real samples in these loops:
-    for sample in real_samples:
-        summary_generator = SampleSummaryGeneratorSingle(sample, output_manager)
-        summary_generator.save()
-        
-        chrom_generator = ChromosomePageGeneratorSingle(sample, output_manager)
-        chrom_generator.save_chromosome_pages()
+    if targeted:
+        # Release the loaded samples; the home and cohort pages are rebuilt from the metadata of all
+        rendered = set(shard_records)
+        real_samples = create_sample_objects(args.sample_types, parameters)
+        output_manager.create_directory_structure([s.pre_sample for s in real_samples])
+        try:
+            restore_shards(real_samples, shard_dir, metrics, rendered=rendered)
+            summary_file = write_cohort_pages(args, real_samples, output_manager, metrics, shard_dir,
+                                              info_page=False)
+        except (OSError, ValueError, KeyError) as e:
+            logging.error(f"Error updating the cohort pages: {str(e)}")
+            sys.exit(1)
 
     # After generating all pages
     logging.info("Final directory structure:\n%s", output_manager.dir_structure.detailed_str())
 
+    if not args.shard:
+        metrics.append_slowest_section(summary_file, ('summary_page', 'chromosome_page'), n=args.metrics_top_n)
+    if output_manager.precompressor is not None:
+        with metrics.stage('precompress') as rec:
+            stats = output_manager.finish_compression()
+            rec['output_bytes'] = stats['gzip_bytes'] + stats['brotli_bytes']
+    if args.metrics_json:
+        metrics.write_json(args.metrics_json, driver='single', output_dir=os.path.abspath(args.output_dir))
+        logging.info(f"Wrote metrics to {args.metrics_json}")
+
 if __name__ == "__main__":
     main()
@@ -0,0 +1,43 @@
+#!/usr/bin/env python3
+"""
+Local report server for reports rendered with --region_store.
+
+Serves the report directory like any static server and answers region queries
+from its region store, so the chromosome plots reload the points of the visible
+range at screen resolution on every pan / zoom instead of embedding all of them.
+
+Usage:
+    python serve_report.py --report_dir results/dynamic_plotting_single
+    python serve_report.py --report_dir results/dynamic_plotting_paired --port 8080
+"""
+import argparse
+import logging
+import os
+import sys
+
+from src.utils.region_store import REGION_STORE_DIR
+from src.utils.report_server import serve_report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Serve a rendered report with server-side region queries")
+    parser.add_argument("--report_dir", "--report-dir", required=True, help="Output directory of the report")
+    parser.add_argument("--store_dir", "--store-dir", default=None,
+                        help=f"Region store (default: <report_dir>/{REGION_STORE_DIR})")
+    parser.add_argument("--host", default="127.0.0.1", help="Interface to listen on")
+    parser.add_argument("--port", type=int, default=8000, help="Port to listen on (0: any free port)")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+
+    report_dir = os.path.abspath(args.report_dir)
+    store_dir = os.path.abspath(args.store_dir or os.path.join(report_dir, REGION_STORE_DIR))
+    if not os.path.isdir(report_dir):
+        logging.error(f"Report directory not found: {report_dir}")
+        sys.exit(1)
+    if not os.path.isdir(store_dir):
+        logging.warning(f"No region store at {store_dir}: render with --region_store to enable region queries")
+    serve_report(report_dir, store_dir, args.host, args.port)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+import json
+import logging
+
+from src.utils.page_writer import write_text_atomic
+from src.utils.templates import render_template
+
+
+def chromosome_viewer_name(owner_id: str) -> str:
+    """File name of the single-page chromosome viewer inside chromosomes_<owner_id>/"""
+    return f"chromosomes_{owner_id}.html"
+
+
+def chromosome_script_name(chromosome: str) -> str:
+    """File name of one chromosome's data script next to the viewer page"""
+    return f"chr{chromosome.replace(' ', '_')}.js"
+
+
+def chromosome_script(chromosome: str, content_html: str, plot_item, target_id: str) -> list:
+    """Data script registering one chromosome's markup and Bokeh item with components/js/chromosome_viewer.js,
+    as parts for OutputManager.write_page (the item is serialized while writing)"""
+    return [f"KaryoViewer.register({json.dumps(chromosome)}, {json.dumps(content_html)}, ",
+            plot_item,
+            f", {json.dumps(target_id)});\n"]
+
+
+class ChromosomeViewerPageGenerator:
+    """Class to generate the single-page chromosome viewer of one sample or pair.
+
+    The page carries the header, styles and Bokeh bootstrap once; the chromosome
+    content comes from the chr<N>.js scripts written next to it and is loaded
+    when a chromosome is selected."""
+
+    def __init__(self, owner_id, chromosomes, output_manager, table_generator,
+                 summary_label="Sample Summary", paired=False):
+        """Initialize with the sample / pair ID, its chromosomes and the page options"""
+        self.owner_id = owner_id
+        self.chromosomes = list(chromosomes)
+        self.output_manager = output_manager
+        self.table_generator = table_generator
+        self.summary_label = summary_label
+        self.paired = paired
+
+    def generate(self) -> str:
+        """Generate the viewer page HTML from chromosome_viewer.html"""
+        root = '../../../../'
+        return render_template(
+            'chromosome_viewer.html',
+            root=root,
+            title=f"{self.owner_id} - Chromosomes",
+            home_page=self.output_manager.get_home_page_name(),
+            nav_links=[(self.summary_label, f"../summary_page_{self.owner_id}.html")],
+            head=self.table_generator.virtual_table_script(root)
+                 + self.output_manager.assets.tags('font-awesome', 'bokeh', 'bokeh-widgets', prefix=root),
+            paired=self.paired,
+            region_fetch=self.output_manager.region_store is not None,
+            chromosomes=self.chromosomes,
+            viewer_options={
+                'title': self.owner_id,
+                'content': 'chromosome-content',
+                'chromosomes': self.chromosomes,
+                'scripts': {chrom: chromosome_script_name(chrom) for chrom in self.chromosomes},
+                'nestedDropdowns': self.paired,
+            },
+        )
+
+    def save(self, output_path: str):
+        """Save the generated HTML to a file"""
+        try:
+            write_text_atomic(output_path, self.generate())
+            logging.info(f"Saved chromosome viewer to {output_path}")
+            return self.output_manager.written(output_path)
+        except Exception as e:
+            logging.error(f"Error saving chromosome viewer: {str(e)}")
+            raise
@@ -0,0 +1,46 @@
+import logging
+from src.plots.cnv_distribution import generate_cohort_cnv_distribution_plot
+from src.plots.cohort_matrix import generate_cohort_heatmap
+from src.utils.templates import render_template
+from src.utils.page_writer import write_text_atomic
+
+COHORT_HEATMAP_PAGE = "cohort_heatmap.html"
+
+
+class CohortHeatmapPageGenerator:
+    """Class to generate the cohort heatmap page (samples × genome bins) next to the home page"""
+
+    def __init__(self, matrix, output_manager, cnv_by_sample=None, cnv_title='CNV Counts – Cohort'):
+        """Initialize with a CohortMatrix and output manager; `cnv_by_sample` (sample / pair id → CNV calls)
+        adds the cohort CNV size distribution below the heatmap"""
+        self.matrix = matrix
+        self.output_manager = output_manager
+        self.cnv_by_sample = cnv_by_sample
+        self.cnv_title = cnv_title
+
+    def generate(self) -> str:
+        """Generate the complete cohort heatmap page HTML from cohort_heatmap.html"""
+        return render_template(
+            'cohort_heatmap.html',
+            root='',
+            title="Cohort Heatmap",
+            home_page=self.output_manager.get_home_page_name(),
+            nav_links=[("Cohort Heatmap", COHORT_HEATMAP_PAGE)],
+            head=self.output_manager.assets.tags('font-awesome', 'bokeh', 'bokeh-widgets'),
+            n_samples=len(self.matrix.samples),
+            n_bins=int(self.matrix.offsets[-1]),
+            bin_size_mb=f"{self.matrix.bin_size / 1e6:g}",
+            heatmap_json=generate_cohort_heatmap(self.matrix).replace('</', '<\\/'),
+            cnv_distribution_json=None if self.cnv_by_sample is None else generate_cohort_cnv_distribution_plot(
+                self.cnv_by_sample, self.matrix.chromosomes, title=self.cnv_title).replace('</', '<\\/'),
+        )
+
+    def save(self, output_path: str):
+        """Save the generated HTML to a file"""
+        try:
+            write_text_atomic(output_path, self.generate())
+            logging.info(f"Saved cohort heatmap page to {output_path}")
+            return output_path
+        except Exception as e:
+            logging.error(f"Error saving cohort heatmap page: {str(e)}")
+            raise
@@ -1,16 +1,23 @@
 import logging
 from pathlib import Path
 from src.tables.table_generator import TableGenerator
+from src.plots.recurrence import recurrence_section
+from src.pages.cohort_heatmap_page import COHORT_HEATMAP_PAGE
+from src.utils.report_status import report_status_section
+from src.utils.page_writer import write_text_atomic
 from datetime import datetime
 
 class HomePageGenerator:
     """Class to generate the home page HTML content"""
     
-    def __init__(self, samples, output_manager):
-        """Initialize with sample data and output manager"""
+    def __init__(self, samples, output_manager, recurrence=None, cohort_heatmap=False):
+        """Initialize with sample data and output manager; `recurrence` (CohortRecurrence) adds the cohort
+        recurrence section, `cohort_heatmap` a link to the cohort heatmap page"""
         self.samples = samples
         self.output_manager = output_manager
-        self.table_generator = TableGenerator()
+        self.table_generator = TableGenerator(json_tables=output_manager.json_tables)
+        self.recurrence = recurrence
+        self.cohort_heatmap = cohort_heatmap
     
     def _prepare_sample_data(self):
         """Prepare sample data for table generation"""
@@ -117,6 +124,7 @@ class HomePageGenerator:
 
     <div class="nav-center">
         <a class="home-link" href="{home_page}">Home</a>
+        {f'<a class="home-link" href="{COHORT_HEATMAP_PAGE}">Cohort Heatmap</a>' if self.cohort_heatmap else ''}
         <a class="home-link" href="components/info.html" title="Documentation">
             <i class="fas fa-info-circle" style="font-size: 0.9em"></i>
         </a>
@@ -138,8 +146,9 @@ class HomePageGenerator:
                 <meta charset="UTF-8">
                 <meta name="viewport" content="width=device-width, initial-scale=1.0">
                 <link rel="stylesheet" href="components/css/styles.css">
-                <link rel="stylesheet" href="https://cdnjs.cloudflare.com/ajax/libs/font-awesome/5.15.4/css/all.min.css">
-                <script src="https://cdnjs.cloudflare.com/ajax/libs/html2canvas/1.4.1/html2canvas.min.js"></script>
+                {self.table_generator.virtual_table_script('')}
+                {self.output_manager.assets.tags('bokeh') if self.recurrence is not None else ''}
+                {self.output_manager.assets.tags('font-awesome', 'html2canvas')}
                 <style>
                   @media print {{
                     #header-placeholder,
@@ -154,6 +163,7 @@ class HomePageGenerator:
                 
                 <!-- Main Content -->
                 <div class="content-container">
+                    {report_status_section() if self.output_manager.quick_look else ''}
                     
                     <!-- PDF Button -->
                     <div class="nav-buttons_info_page" style="text-align: right; margin: 10px 0;">
@@ -171,6 +181,7 @@ class HomePageGenerator:
                     </div>
 
                     {info_boxes_html}
+                    {recurrence_section(self.recurrence) if self.recurrence is not None else ''}
 
                     {sample_table}
                 </div>
@@ -275,9 +286,7 @@ class HomePageGenerator:
     def save(self, output_path: str):
         """Save the generated HTML to a file"""
         try:
-            html_content = self.generate()
-            with open(output_path, 'w') as f:
-                f.write(html_content)
+            write_text_atomic(output_path, self.generate())  # replaced while open in --watch mode
             logging.info(f"Saved home page to {output_path}")
         except Exception as e:
             logging.error(f"Error saving home page: {str(e)}")
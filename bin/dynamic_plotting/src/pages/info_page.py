@@ -125,10 +125,7 @@ class InfoPageGenerator:
                 <meta name="viewport" content="width=device-width, initial-scale=1.0">
                 <title>Analysis Documentation</title>
                     <link rel="stylesheet" href="css/styles.css">
-                    <link rel="stylesheet" href="https://cdnjs.cloudflare.com/ajax/libs/font-awesome/5.15.4/css/all.min.css">
-                    <script src="https://cdn.bokeh.org/bokeh/release/bokeh-3.3.4.min.js"></script>
-                    <script src="https://cdn.bokeh.org/bokeh/release/bokeh-widgets-3.3.4.min.js"></script>
-                    <script src="https://cdn.bokeh.org/bokeh/release/bokeh-tables-3.3.4.min.js"></script>
+                    {self.output_manager.assets.tags('font-awesome', 'bokeh', 'bokeh-widgets', 'bokeh-tables', prefix='../')}
                 <style>
                   @media print {{
                     .navbar,
@@ -186,7 +183,7 @@ class InfoPageGenerator:
         document.addEventListener('DOMContentLoaded', initializeDropdowns);
     </script>
 
-    <script src="https://cdnjs.cloudflare.com/ajax/libs/html2canvas/1.4.1/html2canvas.min.js"></script>
+    {self.output_manager.assets.tags('html2canvas', prefix='../')}
 
     <script>
         // Helper function to convert a Bokeh plot to a static image
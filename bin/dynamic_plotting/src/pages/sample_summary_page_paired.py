@@ -1,12 +1,15 @@
 import os
 import logging
 from pathlib import Path
+from urllib.parse import quote
 from typing import Dict, Any
 from src.tables.table_generator import TableGenerator
 from src.plots.cnv_distribution import generate_cnv_distribution_plot
 from src.utils.css_styles.table_styles import get_table_styles
 import json
 from src.plots.karyotype import generate_karyotype_plot
+from src.plots.genome_overview import generate_genome_overview_plot
+from src.pages.chromosome_viewer_page import chromosome_viewer_name
 
 class SampleSummaryGenerator:
     """Class to generate paired sample summary pages"""
@@ -15,23 +18,7 @@ class SampleSummaryGenerator:
         """Initialize with pair object and output manager"""
         self.pair_obj = pair_obj
         self.output_manager = output_manager
-        self.table_generator = TableGenerator()
-    
-    def _ensure_dict_format(self, table_data):
-        """Ensure table data is in dictionary format with required keys"""
-        if isinstance(table_data, dict) and 'significant' in table_data and 'nonsignificant' in table_data:
-            return table_data
-        
-        # If it's a string or any other format, wrap it in a dict
-        placeholder = """<div class="info-box_empty">
-            <i class="fas fa-info-circle"></i>
-            No data available
-        </div>"""
-        
-        return {
-            'significant': table_data if isinstance(table_data, str) else placeholder,
-            'nonsignificant': placeholder
-        }
+        self.table_generator = TableGenerator(json_tables=output_manager.json_tables)
     
     def generate(self) -> str:
         """Generate the complete sample summary HTML"""
@@ -64,21 +51,18 @@ class SampleSummaryGenerator:
             )
             
             # Generate detailed differential CNV table
-            detailed_differential_tables = self.table_generator.generate_detailed_cnv_table(
+            detailed_differential_tables = self.table_generator.detailed_cnv_tables(
                 self.pair_obj.cnv_detection_filtered
-            )
-            detailed_differential_tables = self._ensure_dict_format(detailed_differential_tables)
+            ).render()
             
             # Split pre/post CNV tables into significant and non-significant
-            detailed_pre_CNV_tables = self.table_generator.generate_detailed_cnv_table_single(
+            detailed_pre_CNV_tables = self.table_generator.detailed_cnv_tables_single(
                 self.pair_obj.pre.cn_summary_data
-            )
-            detailed_pre_CNV_tables = self._ensure_dict_format(detailed_pre_CNV_tables)
+            ).render()
             
-            detailed_post_CNV_tables = self.table_generator.generate_detailed_cnv_table_single(
+            detailed_post_CNV_tables = self.table_generator.detailed_cnv_tables_single(
                 self.pair_obj.post.cn_summary_data
-            )
-            detailed_post_CNV_tables = self._ensure_dict_format(detailed_post_CNV_tables)
+            ).render()
         
 
             # Generate individual sample plots
@@ -143,6 +127,18 @@ class SampleSummaryGenerator:
             except Exception as e:
                 logging.error(f"Error generating differential karyotype plot: {str(e)}")
                 bokeh_differential_karyotype = json.dumps({'error': 'Failed to generate karyotype visualization'})
+
+            # Generate genome-wide overview of both samples
+            try:
+                pre, post = self.pair_obj.pre, self.pair_obj.post
+                bokeh_genome_overview = generate_genome_overview_plot(
+                    {f"Pre ({pre.sample_id})": pre.baf_lrr_data, f"Post ({post.sample_id})": post.baf_lrr_data},
+                    post.available_chromosomes,
+                    self._chromosome_links()
+                )
+            except Exception as e:
+                logging.error(f"Error generating genome overview plot: {str(e)}")
+                bokeh_genome_overview = json.dumps({'error': 'Failed to generate genome overview'})
                 
             # Get home page name for links
             home_page = self.output_manager.get_home_page_name()
@@ -155,12 +151,10 @@ class SampleSummaryGenerator:
                 <meta name="viewport" content="width=device-width, initial-scale=1.0">
                 <title>{pair_id} - Paired Analysis</title>
                 <link rel="stylesheet" href="../../../components/css/styles.css">
-                <link rel="stylesheet" href="https://cdnjs.cloudflare.com/ajax/libs/font-awesome/5.15.4/css/all.min.css">
+                {self.table_generator.virtual_table_script('../../../')}
+                {self.output_manager.assets.tags('font-awesome', prefix='../../../')}
                 <!-- Add Bokeh resources -->
-                <script src="https://cdn.bokeh.org/bokeh/release/bokeh-3.3.4.min.js"></script>
-                <script src="https://cdn.bokeh.org/bokeh/release/bokeh-widgets-3.3.4.min.js"></script>
-                <script src="https://cdn.bokeh.org/bokeh/release/bokeh-tables-3.3.4.min.js"></script>
-                <script src="https://cdnjs.cloudflare.com/ajax/libs/html2canvas/1.4.1/html2canvas.min.js"></script>
+                {self.output_manager.assets.tags('bokeh', 'bokeh-widgets', 'bokeh-tables', 'html2canvas', prefix='../../../')}
                 <style>
                   @media print {{
                     .navbar,
@@ -324,6 +318,13 @@ class SampleSummaryGenerator:
                         </div>
                     </div>
 
+                    <div class="plot-section">
+                        <h3 class="section-title">Genome Overview</h3>
+                        <div class="plot-container">
+                            <div id="genome-overview-plot" class="responsive-plot"></div>
+                        </div>
+                    </div>
+
                     <div class="plot-section">
                         <h3 class="section-title">Karyotype Overview</h3>
                         
@@ -660,6 +661,20 @@ class SampleSummaryGenerator:
                                     '<div class="info-box_empty">Error loading post-sample karyotype</div>';
                             }}
 
+                            try {{
+                                const genomeOverviewJson = {bokeh_genome_overview};
+                                if (genomeOverviewJson && !genomeOverviewJson.error) {{
+                                    Bokeh.embed.embed_item(genomeOverviewJson, "genome-overview-plot");
+                                }} else {{
+                                    document.getElementById('genome-overview-plot').innerHTML = 
+                                        '<div class="info-box_empty">' + (genomeOverviewJson && genomeOverviewJson.error ? genomeOverviewJson.error : 'No BAF/LRR data') + '</div>';
+                                }}
+                            }} catch (error) {{
+                                console.error("Genome overview plot error:", error);
+                                document.getElementById('genome-overview-plot').innerHTML = 
+                                    '<div class="info-box_empty">Error loading genome overview</div>';
+                            }}
+
                             // Handle differential plot data
                             const diffPlotJson = {bokeh_differential_cnv_distribution_summary};
                             
@@ -803,10 +818,23 @@ class SampleSummaryGenerator:
             with open(output_path, 'w') as f:
                 f.write(html_content)
             logging.info(f"Saved paired summary page to {output_path}")
+            return self.output_manager.written(output_path)
         except Exception as e:
             logging.error(f"Error saving summary page: {str(e)}")
             raise
 
+    def _chromosome_links(self):
+        """Relative path from the summary page to each chromosome page"""
+        pair_id = self.pair_obj.pair_id
+        chromosomes = getattr(self.pair_obj.post, 'available_chromosomes', None) or []
+        if self.output_manager.single_page:
+            viewer = f"chromosomes_{pair_id}/{chromosome_viewer_name(pair_id)}"
+            return {chrom: f"{viewer}#{quote(chrom)}" for chrom in chromosomes}
+        return {
+            chrom: f"chromosomes_{pair_id}/chromosome_{chrom.replace(' ', '_')}_{pair_id}.html"
+            for chrom in chromosomes
+        }
+
     def _get_chromosome_selector(self):
         """Generate chromosome navigation buttons"""
         if not hasattr(self.pair_obj.post, 'available_chromosomes') or not self.pair_obj.post.available_chromosomes:
@@ -814,9 +842,7 @@ class SampleSummaryGenerator:
             return '<div class="info-box_empty">No chromosome data available</div>'
         
         buttons = []
-        for chrom in self.pair_obj.post.available_chromosomes:
-            safe_chrom = chrom.replace(" ", "_")
-            href = f"chromosomes_{self.pair_obj.pair_id}/chromosome_{safe_chrom}_{self.pair_obj.pair_id}.html"
+        for chrom, href in self._chromosome_links().items():
             buttons.append(
                 f'<button class="chromosome-button" data-chromosome="{chrom}" '
                 f'onclick="window.location.href=\'{href}\'">{chrom}</button>'
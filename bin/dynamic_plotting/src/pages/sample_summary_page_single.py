@@ -2,10 +2,13 @@ import os
 import logging
 import json
 from pathlib import Path
+from urllib.parse import quote
 from typing import Dict, Any
 from src.tables.table_generator import TableGenerator
 from src.plots.cnv_distribution import generate_cnv_distribution_plot
 from src.plots.karyotype import generate_karyotype_plot
+from src.plots.genome_overview import generate_genome_overview_plot
+from src.pages.chromosome_viewer_page import chromosome_viewer_name
 from src.utils.css_styles.table_styles import get_table_styles
 from bokeh.embed import json_item
 
@@ -16,23 +19,7 @@ class SampleSummaryGeneratorSingle:
         """Initialize with sample object and output manager"""
         self.sample_obj = sample_obj
         self.output_manager = output_manager
-        self.table_generator = TableGenerator()
-    
-    def _ensure_dict_format(self, table_data):
-        """Ensure table data is in dictionary format with required keys"""
-        if isinstance(table_data, dict) and 'significant' in table_data and 'nonsignificant' in table_data:
-            return table_data
-        
-        # If it's a string or any other format, wrap it in a dict
-        placeholder = """<div class="info-box_empty">
-            <i class="fas fa-info-circle"></i>
-            No data available
-        </div>"""
-        
-        return {
-            'significant': table_data if isinstance(table_data, str) else placeholder,
-            'nonsignificant': placeholder
-        }
+        self.table_generator = TableGenerator(json_tables=output_manager.json_tables)
     
     def generate(self) -> str:
         """Generate the complete sample summary HTML"""
@@ -74,15 +61,24 @@ class SampleSummaryGeneratorSingle:
             except Exception as e:
                 logging.error(f"Error generating karyotype plot: {str(e)}")
                 karyotype_json = json.dumps({'error': 'Failed to generate karyotype visualization'})
+
+            try:
+                genome_overview_json = generate_genome_overview_plot(
+                    {self.sample_obj.sample_id: self.sample_obj.baf_lrr_data},
+                    self.sample_obj.available_chromosomes,
+                    self._chromosome_links()
+                )
+            except Exception as e:
+                logging.error(f"Error generating genome overview plot: {str(e)}")
+                genome_overview_json = json.dumps({'error': 'Failed to generate genome overview'})
             
             safe_bokeh_cnv = bokeh_cnv_distribution_summary  
             safe_karyotype = karyotype_json 
             
             # Generate detailed CNV tables (significant and non-significant)
-            detailed_cnv_tables = self.table_generator.generate_detailed_cnv_table(
+            detailed_cnv_tables = self.table_generator.detailed_cnv_tables(
                 self.sample_obj.cnv_detection_filtered
-            )
-            detailed_cnv_tables = self._ensure_dict_format(detailed_cnv_tables)
+            ).render()
             
             significant_cnv_table = detailed_cnv_tables['significant']
             nonsignificant_cnv_table = detailed_cnv_tables['nonsignificant']
@@ -98,11 +94,8 @@ class SampleSummaryGeneratorSingle:
                 <meta name="viewport" content="width=device-width, initial-scale=1.0">
                 <title>{self.sample_obj.sample_id} - Single Analysis</title>
                 <link rel="stylesheet" href="../../../components/css/styles.css">
-                <link rel="stylesheet" href="https://cdnjs.cloudflare.com/ajax/libs/font-awesome/5.15.4/css/all.min.css">
-                <script src="https://cdn.bokeh.org/bokeh/release/bokeh-3.3.4.min.js"></script>
-                <script src="https://cdn.bokeh.org/bokeh/release/bokeh-widgets-3.3.4.min.js"></script>
-                <script src="https://cdn.bokeh.org/bokeh/release/bokeh-tables-3.3.4.min.js"></script>
-                <script src="https://cdnjs.cloudflare.com/ajax/libs/html2canvas/1.4.1/html2canvas.min.js"></script>
+                {self.table_generator.virtual_table_script('../../../')}
+                {self.output_manager.assets.tags('font-awesome', 'bokeh', 'bokeh-widgets', 'bokeh-tables', 'html2canvas', prefix='../../../')}
                 <style>
                   @media print {{
                     .navbar,
@@ -191,6 +184,14 @@ class SampleSummaryGeneratorSingle:
                         </div>
                     </div>
                     
+                    <!-- Genome Overview Section -->
+                    <div class="plot-section">
+                        <h3 class="section-title">Genome Overview</h3>
+                        <div class="plot-container">
+                            <div id="genome-overview-plot" class="responsive-plot"></div>
+                        </div>
+                    </div>
+
                     <!-- Karyotype Overview Section -->
                     <div class="plot-section">
                         <h3 class="section-title">Karyotype Overview</h3>
@@ -388,6 +389,14 @@ class SampleSummaryGeneratorSingle:
                                     `<div class="info-box_empty">${{errorMsg}}</div>`;
                             }}
 
+                            const genomeOverviewJson = {genome_overview_json};
+                            if (genomeOverviewJson && !genomeOverviewJson.error) {{
+                                Bokeh.embed.embed_item(genomeOverviewJson, "genome-overview-plot");
+                            }} else {{
+                                document.getElementById('genome-overview-plot').innerHTML = 
+                                    `<div class="info-box_empty">${{genomeOverviewJson?.error || 'Failed to load genome overview'}}</div>`;
+                            }}
+
                             // Table sorting functionality
                             const getCellValue = (tr, idx) => {{
                                 const cell = tr.children[idx];
@@ -509,10 +518,22 @@ class SampleSummaryGeneratorSingle:
             with open(output_path, 'w') as f:
                 f.write(html_content)
             logging.info(f"Saved single sample summary page to {output_path}")
+            return self.output_manager.written(output_path)
         except Exception as e:
             logging.error(f"Error saving summary page: {str(e)}")
             raise
 
+    def _chromosome_links(self):
+        """Relative path from the summary page to each chromosome page"""
+        sample_id = self.sample_obj.sample_id
+        if self.output_manager.single_page:
+            viewer = f"chromosomes_{sample_id}/{chromosome_viewer_name(sample_id)}"
+            return {chrom: f"{viewer}#{quote(chrom)}" for chrom in (self.sample_obj.available_chromosomes or [])}
+        return {
+            chrom: f"chromosomes_{sample_id}/chromosome_{chrom.replace(' ', '_')}_{sample_id}.html"
+            for chrom in (self.sample_obj.available_chromosomes or [])
+        }
+
     def _get_chromosome_selector(self):
         """Generate HTML for chromosome selector"""
         
@@ -521,11 +542,7 @@ class SampleSummaryGeneratorSingle:
         if not self.sample_obj.available_chromosomes:
             return '<div class="info-box_empty">No chromosome data available</div>'
         buttons = []
-        sample_id = self.sample_obj.sample_id
-        for chrom in self.sample_obj.available_chromosomes:
-            safe_chrom = chrom.replace(" ", "_")
-            # Relative path from summary page to chromosome pages
-            href = f"chromosomes_{sample_id}/chromosome_{safe_chrom}_{sample_id}.html"
+        for chrom, href in self._chromosome_links().items():
             buttons.append(
                 f'<button class="chromosome-button" data-chromosome="{chrom}" '
                 f'onclick="window.location.href=\'{href}\'">{chrom}</button>'
@@ -7,7 +7,8 @@ Exports:
     generate_combined_plots()
 
 Functions return a JSON string generated via ``bokeh.embed.json_item``
-which you can embed directly in any Bokeh‑JS front‑end.  The JSON bundle
+which you can embed directly in any Bokeh‑JS front‑end (with ``as_item=True``
+the ``json_item`` dict itself, for pages that serialize it while writing).  The JSON bundle
 contains one of the following layouts:
 
 * **generate_chromosome_plot** – a single 3‑panel view:
@@ -41,6 +42,8 @@ from bokeh.plotting import figure
 from bokeh.layouts import row, column
 from bokeh.models  import Div, Spacer
 
+from src.utils.region_store import OVERVIEW_WIDTH, minmax_indices, region_tag
+
 __all__ = ["generate_chromosome_plot", "generate_combined_plots"]
 
 
@@ -57,6 +60,23 @@ CLR_CN      = "#c4a0ff"   # soft lavender (CN regions)
 CLR_OVERLAP = "#ff6961"   # light red (overlaps)
 CLR_SEGMENT = "#ff7f0e"   # orange for segments
 
+# BAF values drawn in full when thinning; outside this band (homozygous
+# AA / BB SNPs) only every ``baf_thin_stride``-th point is kept
+BAF_INFORMATIVE = (0.1, 0.9)
+
+
+def thin_baf_points(baf, stride: int) -> np.ndarray:
+    """Indices of the BAF points to draw, in input order.
+
+    Every point inside ``BAF_INFORMATIVE`` is kept; the remaining (homozygous)
+    points are subsampled with a fixed stride, so the selection is
+    deterministic.  Missing BAF values are dropped."""
+    baf = np.asarray(baf, dtype=float)
+    informative = (baf >= BAF_INFORMATIVE[0]) & (baf <= BAF_INFORMATIVE[1])
+    keep = informative.copy()
+    keep[np.flatnonzero(~informative & ~np.isnan(baf))[::max(int(stride), 1)]] = True
+    return np.flatnonzero(keep)
+
 # =========================================================================
 # INTERNAL: build a 3‑panel chromosome view **and return the live Bokeh grid**
 # =========================================================================
@@ -73,6 +93,9 @@ def _build_chromosome_grid(
     *,
     x_range_shared: Range1d | None = None,
     panel_width: int = 1000,
+    baf_thin_stride: int = 0,
+    preview_stride: int = 0,
+    region: tuple[str, str] | None = None,
 ):
     """Return a *live* Bokeh ``gridplot`` containing the 3 panes.
 
@@ -80,6 +103,18 @@ def _build_chromosome_grid(
     - CN regions (lavender): Only CN = 1 (copy-loss LoH)
     - Union regions (light red): Only CN = 2 + ROH overlaps (cnLoH candidates)
     - ROH regions (light green): All ROH regions
+
+    With ``baf_thin_stride`` > 1 the BAF panel draws every informative SNP
+    but only every n-th homozygous one (see ``thin_baf_points``); the LRR
+    panel always shows all points.
+
+    With ``preview_stride`` > 1 (quick-look pages) both panels draw only every
+    n-th SNP; the CNV, ROH and segment overlays are unchanged.
+
+    With ``region`` = (owner id, track) the pages embed only a min/max
+    overview of the points (``OVERVIEW_WIDTH`` pixels) and tag the point
+    sources, so region_fetch.js can refetch the zoomed range from the
+    report server (serve_report.py).
     """
     try:
         # ---- slice all inputs ------------------------------------------------
@@ -200,13 +235,42 @@ def _build_chromosome_grid(
             raise ValueError("No recognized CN column in CNV data")
 
         # ---- shared ColumnDataSource for scatter points ----------------------
-        src_pts = ColumnDataSource(
-            {
-                "pos": chr_baf["Position"],
-                "baf": chr_baf["BAF"],
-                "lrr": chr_baf["LRR"],
-            }
-        )
+        n_baf = len(chr_baf)
+        if preview_stride > 1:
+            drawn = chr_baf.iloc[::preview_stride]
+        elif region is not None and n_baf:
+            pos = chr_baf["Position"].to_numpy(dtype=float)
+            drawn = chr_baf.iloc[minmax_indices(
+                pos,
+                (chr_baf["BAF"].to_numpy(dtype=float), chr_baf["LRR"].to_numpy(dtype=float)),
+                pos.min(), pos.max(), OVERVIEW_WIDTH,
+            )]
+        else:
+            drawn = chr_baf
+        if baf_thin_stride > 1:
+            kept = thin_baf_points(drawn["BAF"], baf_thin_stride)
+            src_pts = ColumnDataSource({"pos": drawn["Position"], "lrr": drawn["LRR"]})
+            src_baf = ColumnDataSource(
+                {
+                    "pos": drawn["Position"].to_numpy()[kept],
+                    "baf": drawn["BAF"].to_numpy()[kept],
+                }
+            )
+            baf_label = f"BAF ({len(kept):,} of {n_baf:,} points)"
+            logging.info(f"BAF thinning chr {chr_str}: kept {len(kept)} of {n_baf} points (stride {baf_thin_stride})")
+        else:
+            src_pts = ColumnDataSource(
+                {
+                    "pos": drawn["Position"],
+                    "baf": drawn["BAF"],
+                    "lrr": drawn["LRR"],
+                }
+            )
+            src_baf = src_pts
+            baf_label = f"BAF ({len(drawn):,} of {n_baf:,} points)" if len(drawn) < n_baf else "BAF"
+        if region is not None:
+            src_pts.tags = [region_tag(region[0], region[1], chr_str)]
+            src_baf.tags = src_pts.tags
 
         # ---- Calculate segment statistics or use provided segment data ------
         # Only calculate if no segment data was provided
@@ -496,11 +560,11 @@ def _build_chromosome_grid(
         r_baf = p_baf.scatter(
             "pos",
             "baf",
-            source=src_pts,
+            source=src_baf,
             color=CLR_BAF,
             size=2,
             alpha=0.6,
-            legend_label="BAF",
+            legend_label=baf_label,
             muted_alpha=0.1,
         )
         p_baf.add_tools(
@@ -697,7 +761,11 @@ def generate_combined_plots(
     pre_cn_summary_data: pd.DataFrame | None = None,
     post_cn_summary_data: pd.DataFrame | None = None,
     diff_cn_summary_data: pd.DataFrame | None = None,
-) -> str:
+    baf_thin_stride: int = 0,
+    preview_stride: int = 0,
+    region_id: str | None = None,
+    as_item: bool = False,
+) -> str | dict:
     """
     Return a JSON bundle with
 
@@ -706,6 +774,11 @@ def generate_combined_plots(
         +---------------------+----------------------+
         |        DIFF (3 panels – full width)        |
         +--------------------------------------------+
+
+    (the json_item dict itself with ``as_item=True``)
+
+    ``region_id`` (the pair id) makes the point panels refetchable from the
+    report server's region store; the DIFF grid draws the POST points.
     """
     try:
         chr_str = str(chromosome)
@@ -740,6 +813,9 @@ def generate_combined_plots(
             cn_summary_data=pre_cn_summary_data,
             x_range_shared = shared_range,
             panel_width    = half_w,
+            baf_thin_stride = baf_thin_stride,
+            preview_stride = preview_stride,
+            region         = (region_id, "pre") if region_id else None,
         )
 
         post_grid = _build_chromosome_grid(
@@ -748,6 +824,9 @@ def generate_combined_plots(
             cn_summary_data=post_cn_summary_data,
             x_range_shared = shared_range,
             panel_width    = half_w,
+            baf_thin_stride = baf_thin_stride,
+            preview_stride = preview_stride,
+            region         = (region_id, "post") if region_id else None,
         )
 
         diff_grid = _build_chromosome_grid(
@@ -756,6 +835,9 @@ def generate_combined_plots(
             cn_summary_data=diff_cn_summary_data,
             x_range_shared = shared_range,
             panel_width    = full_w,
+            baf_thin_stride = baf_thin_stride,
+            preview_stride = preview_stride,
+            region         = (region_id, "post") if region_id else None,
         )
             
         # ───────── 4. coloured section headers ──────────────────────────────
@@ -782,11 +864,13 @@ def generate_combined_plots(
             sizing_mode="stretch_width",
         )
 
-        return json.dumps(json_item(layout))
+        item = json_item(layout)
+        return item if as_item else json.dumps(item)
 
     except Exception as exc:
         logging.error("generate_combined_plots failed: %s", exc)
-        return json.dumps({"error": str(exc)})
+        error = {"error": str(exc)}
+        return error if as_item else json.dumps(error)
 
 def generate_chromosome_plot(
     baf_lrr_data: pd.DataFrame,
@@ -798,8 +882,12 @@ def generate_chromosome_plot(
     cn_bed: pd.DataFrame | None = None,
     cn_summary_data: pd.DataFrame | None = None,
     *,
+    baf_thin_stride: int = 0,
+    preview_stride: int = 0,
+    region_id: str | None = None,
+    as_item: bool = False,
     _return_grid: bool = False,
-) -> str | gridplot:
+) -> str | dict | gridplot:
     """
     Public API — behaves exactly like the original function.
     If ``_return_grid`` is True you get the live Bokeh grid instead of JSON.
@@ -814,6 +902,10 @@ def generate_chromosome_plot(
     union_bed: Union of ROH and CN regions (optional)
     cn_bed: CN regions (optional)
     cn_summary_data: Segment summary data with statistics (optional)
+    baf_thin_stride: Keep every n-th homozygous BAF point (0 / 1: all points)
+    preview_stride: Draw only every n-th SNP in both panels, for quick-look pages (0 / 1: all)
+    region_id: Region store id of the sample: embed a min/max overview, refetched on zoom (optional)
+    as_item: Return the json_item dict (or {"error": ...}) instead of its JSON string
     _return_grid: Whether to return the grid object instead of JSON
     """
     try:
@@ -828,17 +920,22 @@ def generate_chromosome_plot(
             cn_summary_data=cn_summary_data,
             x_range_shared=None,
             panel_width=1000,
+            baf_thin_stride=baf_thin_stride,
+            preview_stride=preview_stride,
+            region=(region_id, "sample") if region_id else None,
         )
         if _return_grid:
             return grid
         
         # Handle case where grid is a string (error message) rather than a grid object
         if isinstance(grid, str):
-            return grid
+            return json.loads(grid) if as_item else grid
             
         # Convert grid to JSON
-        return json.dumps(json_item(grid))
+        item = json_item(grid)
+        return item if as_item else json.dumps(item)
 
     except Exception as exc:
         logging.error("generate_chromosome_plot failed: %s", exc)
-        return json.dumps({"error": str(exc)})
+        error = {"error": str(exc)}
+        return error if as_item else json.dumps(error)
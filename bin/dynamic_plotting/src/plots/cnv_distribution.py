@@ -6,223 +6,259 @@ from bokeh.models import (
 from bokeh.transform import dodge
 from bokeh.layouts import column
 from bokeh.embed import json_item
+import numpy as np
 import pandas as pd
 import json
 
 
+CNV_TYPES = ['Deletion', 'Duplication']
+LENGTH_CATEGORIES = ['<0.2Mb', '0.2-1.0Mb', '>1.0Mb']
+# Stacked-bar columns: (Type, length category) → ColumnDataSource key; CNVs < 0.2 Mb are not drawn
+COUNT_COLUMNS = {
+    ('Deletion', '0.2-1.0Mb'): 'del_medium',
+    ('Deletion', '>1.0Mb'): 'del_large',
+    ('Duplication', '0.2-1.0Mb'): 'dup_medium',
+    ('Duplication', '>1.0Mb'): 'dup_large',
+}
+
+
+def classify_cnvs(cnv_data):
+    """Chromosome / Start / End / Type / length_category frame of the deletions and duplications in `cnv_data`.
+
+    Accepts both the single sample (pre/post) layout with a CopyNumber column and the
+    differential layout with a Type column."""
+    if 'CopyNumber' in cnv_data.columns:  # Single sample case
+        copy_number = pd.to_numeric(cnv_data['CopyNumber'], errors='coerce')
+        cnv_type = np.select([copy_number < 2, copy_number > 2], CNV_TYPES, default='Normal')
+    else:
+        required_cols = ['Chromosome', 'Start', 'End', 'Type']
+        missing = [col for col in required_cols if col not in cnv_data.columns]
+        if missing:
+            raise ValueError(f"Missing required columns: {', '.join(missing)}")
+        cnv_type = cnv_data['Type'].to_numpy()
+
+    df = pd.DataFrame({
+        'Chromosome': cnv_data['Chromosome'].astype(str).to_numpy(),
+        'Start': cnv_data['Start'].to_numpy(),
+        'End': cnv_data['End'].to_numpy(),
+        'Type': cnv_type,
+        'length_category': pd.cut(
+            (cnv_data['End'] - cnv_data['Start']) / 1e6,
+            bins=[0, 0.2, 1.0, float('inf')],
+            labels=LENGTH_CATEGORIES,
+            include_lowest=True
+        ).to_numpy(),
+    }, index=cnv_data.index)
+    return df[df['Type'].isin(CNV_TYPES)]
+
+
+def _crosstab_counts(classified, row_keys):
+    """COUNT_COLUMNS counts for every row of `row_keys` (an Index or MultiIndex over
+    columns of `classified`), from one categorical crosstab."""
+    if classified.empty:
+        return pd.DataFrame(0, index=row_keys, columns=list(COUNT_COLUMNS.values()))
+    levels = row_keys.levels if isinstance(row_keys, pd.MultiIndex) else [row_keys]
+    table = pd.crosstab(
+        [pd.Categorical(classified[name], categories=level) for name, level in zip(row_keys.names, levels)],
+        [pd.Categorical(classified['Type'], categories=CNV_TYPES),
+         pd.Categorical(classified['length_category'], categories=LENGTH_CATEGORIES)],
+        dropna=False,
+    )
+    table = table.reindex(index=row_keys, columns=pd.MultiIndex.from_tuples(COUNT_COLUMNS), fill_value=0)
+    table.columns = list(COUNT_COLUMNS.values())
+    return table
+
+
+def cnv_size_counts(cnv_data, available_chromosomes):
+    """del/dup × medium/large counts per chromosome (rows in `available_chromosomes` order)"""
+    if cnv_data is None or len(cnv_data) == 0:
+        cnv_data = pd.DataFrame(columns=['Chromosome', 'Start', 'End', 'Type'])
+    chromosomes = pd.Index([str(c) for c in available_chromosomes], name='Chromosome')
+    return _crosstab_counts(classify_cnvs(cnv_data), chromosomes)
+
+
+def classify_cohort_cnvs(cnv_by_sample):
+    """classify_cnvs for many samples at once, plus a Sample column.
+
+    The frames are concatenated per input layout and classified once per layout,
+    instead of paying the pandas overhead once per sample."""
+    by_layout = {}
+    for sample, df in cnv_by_sample.items():
+        if df is not None and len(df):
+            by_layout.setdefault('CopyNumber' in df.columns, {})[str(sample)] = df
+    frames = []
+    for layout in by_layout.values():
+        classified = classify_cnvs(pd.concat(layout, names=['Sample', None]))
+        frames.append(classified.assign(Sample=classified.index.get_level_values('Sample')))
+    if not frames:
+        return pd.DataFrame(columns=['Chromosome', 'Start', 'End', 'Type', 'length_category', 'Sample'])
+    return pd.concat(frames, ignore_index=True)
+
+
+def cohort_cnv_size_counts(cnv_by_sample, available_chromosomes):
+    """cnv_size_counts for a whole cohort in one grouped pass.
+
+    `cnv_by_sample` maps sample id → CNV frame (either layout, see classify_cnvs).
+    Returns a frame indexed by (Sample, Chromosome) with the COUNT_COLUMNS columns."""
+    keys = pd.MultiIndex.from_product(
+        [[str(s) for s in cnv_by_sample], [str(c) for c in available_chromosomes]],
+        names=['Sample', 'Chromosome'],
+    )
+    return _crosstab_counts(classify_cohort_cnvs(cnv_by_sample), keys)
+
+
+def _counts_source(counts, all_chroms):
+    """ColumnDataSource columns for the stacked bars from a cnv_size_counts frame"""
+    cds = {'chromosomes': all_chroms, **{k: counts[k].tolist() for k in COUNT_COLUMNS.values()}}
+    cds['dup_total'] = [m + l for m, l in zip(cds['dup_medium'], cds['dup_large'])]
+    cds['del_total'] = [m + l for m, l in zip(cds['del_medium'], cds['del_large'])]
+    return cds
+
+
 def generate_cnv_distribution_plot(cnv_data, sample_id, available_chromosomes, gender=None):
     """Generate interactive CNV count plot with gender‑aware analysis."""
     print(f"Debug - CNV data columns: {cnv_data.columns if cnv_data is not None else 'No data'}")
     print(f"Debug - CNV data entries: {len(cnv_data) if cnv_data is not None else 0}")
-    
+
     # Track if data is empty - but don't return error, generate empty plot instead
     is_empty_data = cnv_data is None or len(cnv_data) == 0
 
     try:
-        # Handle empty data - create empty counts for all chromosomes
-        if is_empty_data:
-            all_chroms = [str(c) for c in available_chromosomes]
-            counts = {
-                k: {c: 0 for c in all_chroms}
-                for k in ['del_medium', 'del_large', 'dup_medium', 'dup_large']
-            }
-        # Handle single sample (pre/post) data structure
-        elif 'CopyNumber' in cnv_data.columns:  # Single sample case
-            df = cnv_data.copy()
-            # Create Type from CopyNumber
-            df['Type'] = df['CopyNumber'].apply(
-                lambda x: 'Deletion' if x < 2 else 'Duplication' if x > 2 else 'Normal'
-            )
-            # Filter out normal regions
-            df = df[df['Type'] != 'Normal']
-            # Create length column
-            df['Length'] = (df['End'] - df['Start']) / 1e6
-            
-        # Handle differential CNV data
-        else:  
-            if cnv_data is None or cnv_data.empty:
-                return json.dumps({'error': 'No CNV data available'})
-                
-            required_cols = ['Chromosome', 'Start', 'End', 'Type']
-            if not all(col in cnv_data.columns for col in required_cols):
-                missing = [col for col in required_cols if col not in cnv_data.columns]
-                return json.dumps({'error': f"Missing required columns: {', '.join(missing)}"})
-
-            df = cnv_data.copy()
-            df['Length'] = (df['End'] - df['Start']) / 1e6
-            df = df[df['Type'].isin(['Deletion', 'Duplication'])]
-
-        # Common processing for data (skip if empty)
-        if not is_empty_data:
-            df['length_category'] = pd.cut(
-                df['Length'],
-                bins=[0, 0.2, 1.0, float('inf')],
-                labels=['<0.2Mb', '0.2-1.0Mb', '>1.0Mb'],
-                include_lowest=True
-            )
-
-            # ------------------------- chromosome sets ------------------------
-            # Convert to strings while preserving order
-            all_chroms = [str(c) for c in available_chromosomes]
-            
-            # Keep ALL chromosomes from available_chromosomes (don't filter df here)
-            # Just ensure we only count chromosomes in the allowed list
-            df['Chromosome'] = df['Chromosome'].astype(str)
-            df = df[df['Chromosome'].isin(all_chroms)]
-
-            # --------------------------- counting -----------------------------
-            # Initialize counts for ALL chromosomes in available_chromosomes
-            counts = {
-                k: {c: 0 for c in all_chroms}
-                for k in ['del_medium', 'del_large', 'dup_medium', 'dup_large']
-            }
-
-            for _, row in df.iterrows():
-                chrom = str(row['Chromosome'])
-                cnv_type = row['Type']
-                length_cat = row['length_category']
-
-                if chrom not in all_chroms:
-                    continue  # skip chromosomes not in our list
-
-                if cnv_type == 'Deletion':
-                    if length_cat == '0.2-1.0Mb':
-                        counts['del_medium'][chrom] += 1
-                    elif length_cat == '>1.0Mb':
-                        counts['del_large'][chrom] += 1
-                else:
-                    if length_cat == '0.2-1.0Mb':
-                        counts['dup_medium'][chrom] += 1
-                    elif length_cat == '>1.0Mb':
-                        counts['dup_large'][chrom] += 1
-        else:
-            # Already initialized counts above for empty data
-            all_chroms = [str(c) for c in available_chromosomes]
-
-        # --------------------- ColumnDataSource ---------------------------
-        cds = {
-            'chromosomes': all_chroms,
-            'del_medium': [counts['del_medium'][c] for c in all_chroms],
-            'del_large':  [counts['del_large'][c] for c in all_chroms],
-            'dup_medium': [counts['dup_medium'][c] for c in all_chroms],
-            'dup_large':  [counts['dup_large'][c] for c in all_chroms],
-        }
-        cds['dup_total'] = [m + l for m, l in zip(cds['dup_medium'], cds['dup_large'])]
-        cds['del_total'] = [m + l for m, l in zip(cds['del_medium'], cds['del_large'])]
-
-        source = ColumnDataSource(cds)
-
-        # ------------------ FIXED y‑axis range (NEW) ----------------------
-        axis_max = max(max(cds['dup_total']), max(cds['del_total']))
-        y_fixed = Range1d(0, max(1, axis_max * 1.1))            # 10 % head-room
-
-        # -------------------------- figure --------------------------------
-        p = figure(
-            x_range=all_chroms,
-            height=400,  # Fixed height for better mobile experience
-            sizing_mode='stretch_width',  # Makes plot responsive
-            title=f'CNV Counts – {sample_id}',
-            toolbar_location='above',
-            tools='pan,box_zoom,reset,save',
-            x_axis_label='Chromosome',
-            y_axis_label='Number of CNVs',
-            y_range=y_fixed,
-            min_width=600,  # Minimum width before mobile layout kicks in
-            max_width=1200,  # Maximum width on large screens
-            margin=(0, 20, 0, 20)  # Add horizontal padding
-        )
-
-        dup_bars = p.vbar(
-            x=dodge('chromosomes', -0.15, range=p.x_range),
-            top='dup_total',
-            width=0.3,
-            color='#377eb8',
-            alpha=0.6,
-            muted_alpha=0.1,
-            source=source,
-        )
-
-        del_bars = p.vbar(
-            x=dodge('chromosomes', 0.15, range=p.x_range),
-            top='del_total',
-            width=0.3,
-            color='#e41a1c',
-            alpha=0.6,
-            muted_alpha=0.1,
-            source=source,
-        )
-
-        # invisible glyph to drive size filter
-        size_toggle = p.line([], [], line_width=0, alpha=0, visible=True)
-        size_toggle.muted = True
-
-        size_cb = CustomJS(args=dict(src=source, tog=size_toggle), code="""
-            const d = src.data;
-            const largeOnly = !tog.muted;
-            for (let i = 0; i < d['dup_total'].length; i++) {
-                if (largeOnly) {
-                    d['dup_total'][i] = d['dup_large'][i];
-                    d['del_total'][i] = d['del_large'][i];
-                } else {
-                    d['dup_total'][i] = d['dup_medium'][i] + d['dup_large'][i];
-                    d['del_total'][i] = d['del_medium'][i] + d['del_large'][i];
-                }
-            }
-            src.change.emit();
-            // y-axis stays unchanged because it is a fixed Range1d
-        """)
-        size_toggle.js_on_change('muted', size_cb)
-
-        # --------------------------- legend -------------------------------
-        legend = Legend(
-            items=[
-                LegendItem(label='Duplications', renderers=[dup_bars]),
-                LegendItem(label='Deletions',   renderers=[del_bars]),
-                LegendItem(label='≥1.0 Mb',     renderers=[size_toggle]),
-            ],
-            click_policy='mute',
-            location='center',
-            orientation='vertical',
-            glyph_height=20,
-            glyph_width=20,
-        )
-        p.add_layout(legend, 'right')
-
-        # ----------------------- hover & styling --------------------------
-        p.add_tools(HoverTool(tooltips=[
-            ('Chromosome', '@chromosomes'),
-            ('Duplications (0.2-1 Mb)', '@dup_medium'),
-            ('Duplications (>1 Mb)',    '@dup_large'),
-            ('Deletions (0.2-1 Mb)',    '@del_medium'),
-            ('Deletions (>1 Mb)',       '@del_large'),
-        ]))
-
-        p.xgrid.grid_line_color = None
-        p.ygrid.grid_line_color = '#eeeeee'
-        p.ygrid.grid_line_alpha = 0.6
-        p.x_range.range_padding = 0.02
-
-        # ----------------------- gender banner ----------------------------
+        # Convert to strings while preserving order; ALL chromosomes keep a bar
+        all_chroms = [str(c) for c in available_chromosomes]
+        counts = cnv_size_counts(cnv_data, all_chroms)
         gender_text = {
             'F': "Gender: Female",
             'M': "Gender: Male"
         }.get(gender, "Gender: Unknown")
+        return _cnv_counts_json(_counts_source(counts, all_chroms), f'CNV Counts – {sample_id}',
+                                gender_text, is_empty_data)
 
-        banner = Div(text=f"<div style='text-align:center;margin-bottom:12px;'><strong>{gender_text}</strong></div>")
-
-        # Create layout
-        layout = column(
-            banner, 
-            p, 
-            sizing_mode='stretch_width',
-            css_classes=['responsive-plot']
-        )
+    except Exception as e:
+        return json.dumps({'error': str(e)})
 
-        # Add empty data flag to the JSON response
-        result = json_item(layout)
-        result['is_empty_data'] = is_empty_data
-        
-        return json.dumps(result)
 
+def generate_cohort_cnv_distribution_plot(cnv_by_sample, available_chromosomes, title='CNV Counts – Cohort'):
+    """CNV count plot summed over all samples of a cohort (see cohort_cnv_size_counts)."""
+    try:
+        all_chroms = [str(c) for c in available_chromosomes]
+        per_sample = cohort_cnv_size_counts(cnv_by_sample, all_chroms)
+        counts = per_sample.groupby(level='Chromosome', sort=False).sum().reindex(all_chroms)
+        is_empty_data = not counts.to_numpy().any()
+        return _cnv_counts_json(_counts_source(counts, all_chroms), title,
+                                f"Samples: {len(cnv_by_sample)}", is_empty_data)
     except Exception as e:
-        return json.dumps({'error': str(e)})
\ No newline at end of file
+        return json.dumps({'error': str(e)})
+
+
+def _cnv_counts_json(cds, title, banner_text, is_empty_data):
+    """Stacked duplication/deletion bars per chromosome with a ≥1 Mb toggle, as json_item"""
+    all_chroms = cds['chromosomes']
+    source = ColumnDataSource(cds)
+
+    # ------------------ FIXED y‑axis range (NEW) ----------------------
+    axis_max = max(max(cds['dup_total']), max(cds['del_total']))
+    y_fixed = Range1d(0, max(1, axis_max * 1.1))            # 10 % head-room
+
+    # -------------------------- figure --------------------------------
+    p = figure(
+        x_range=all_chroms,
+        height=400,  # Fixed height for better mobile experience
+        sizing_mode='stretch_width',  # Makes plot responsive
+        title=title,
+        toolbar_location='above',
+        tools='pan,box_zoom,reset,save',
+        x_axis_label='Chromosome',
+        y_axis_label='Number of CNVs',
+        y_range=y_fixed,
+        min_width=600,  # Minimum width before mobile layout kicks in
+        max_width=1200,  # Maximum width on large screens
+        margin=(0, 20, 0, 20)  # Add horizontal padding
+    )
+
+    dup_bars = p.vbar(
+        x=dodge('chromosomes', -0.15, range=p.x_range),
+        top='dup_total',
+        width=0.3,
+        color='#377eb8',
+        alpha=0.6,
+        muted_alpha=0.1,
+        source=source,
+    )
+
+    del_bars = p.vbar(
+        x=dodge('chromosomes', 0.15, range=p.x_range),
+        top='del_total',
+        width=0.3,
+        color='#e41a1c',
+        alpha=0.6,
+        muted_alpha=0.1,
+        source=source,
+    )
+
+    # invisible glyph to drive size filter
+    size_toggle = p.line([], [], line_width=0, alpha=0, visible=True)
+    size_toggle.muted = True
+
+    size_cb = CustomJS(args=dict(src=source, tog=size_toggle), code="""
+        const d = src.data;
+        const largeOnly = !tog.muted;
+        for (let i = 0; i < d['dup_total'].length; i++) {
+            if (largeOnly) {
+                d['dup_total'][i] = d['dup_large'][i];
+                d['del_total'][i] = d['del_large'][i];
+            } else {
+                d['dup_total'][i] = d['dup_medium'][i] + d['dup_large'][i];
+                d['del_total'][i] = d['del_medium'][i] + d['del_large'][i];
+            }
+        }
+        src.change.emit();
+        // y-axis stays unchanged because it is a fixed Range1d
+    """)
+    size_toggle.js_on_change('muted', size_cb)
+
+    # --------------------------- legend -------------------------------
+    legend = Legend(
+        items=[
+            LegendItem(label='Duplications', renderers=[dup_bars]),
+            LegendItem(label='Deletions',   renderers=[del_bars]),
+            LegendItem(label='≥1.0 Mb',     renderers=[size_toggle]),
+        ],
+        click_policy='mute',
+        location='center',
+        orientation='vertical',
+        glyph_height=20,
+        glyph_width=20,
+    )
+    p.add_layout(legend, 'right')
+
+    # ----------------------- hover & styling --------------------------
+    p.add_tools(HoverTool(tooltips=[
+        ('Chromosome', '@chromosomes'),
+        ('Duplications (0.2-1 Mb)', '@dup_medium'),
+        ('Duplications (>1 Mb)',    '@dup_large'),
+        ('Deletions (0.2-1 Mb)',    '@del_medium'),
+        ('Deletions (>1 Mb)',       '@del_large'),
+    ]))
+
+    p.xgrid.grid_line_color = None
+    p.ygrid.grid_line_color = '#eeeeee'
+    p.ygrid.grid_line_alpha = 0.6
+    p.x_range.range_padding = 0.02
+
+    # ----------------------- banner ----------------------------------
+    banner = Div(text=f"<div style='text-align:center;margin-bottom:12px;'><strong>{banner_text}</strong></div>")
+
+    # Create layout
+    layout = column(
+        banner, 
+        p, 
+        sizing_mode='stretch_width',
+        css_classes=['responsive-plot']
+    )
+
+    # Add empty data flag to the JSON response
+    result = json_item(layout)
+    result['is_empty_data'] = is_empty_data
+    
+    return json.dumps(result)
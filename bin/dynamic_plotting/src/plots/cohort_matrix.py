@@ -0,0 +1,190 @@
+from dataclasses import dataclass
+import json
+import os
+
+import numpy as np
+import pandas as pd
+from bokeh.embed import json_item
+from bokeh.models import (
+    ColorBar, FixedTicker, HoverTool, LinearColorMapper, Range1d, TabPanel, Tabs
+)
+from bokeh.plotting import figure
+
+from src.plots.karyotype import SCALE
+from src.plots.recurrence import DEFAULT_BIN_SIZE, genome_bins
+
+LAYERS = ('lrr', 'baf_deviation', 'cn')
+MATRIX_FILE = 'cohort_matrix.npy'
+INDEX_FILE = 'cohort_matrix.json'
+HET_BAND = (0.1, 0.9)   # BAF values counted as heterozygous for the band deviation
+CN_COLUMNS = ('CN', 'CN_post', 'CopyNumber', 'CopyNumber_post')
+
+
+@dataclass
+class CohortMatrix:
+    """Samples × genome bins summary of each sample's BAF/LRR data and CNV calls.
+
+    Every layer is a float32 (samples, bins) array, NaN where a bin has no SNPs:
+    `lrr` median LRR, `baf_deviation` mean |BAF - 0.5| of the heterozygous band
+    and `cn` the called copy number (2 outside calls). Bins restart at every
+    chromosome; the bins of `chromosomes[i]` are columns `offsets[i]:offsets[i+1]`."""
+    samples: list
+    chromosomes: list
+    bin_size: int
+    offsets: np.ndarray
+    lrr: np.ndarray
+    baf_deviation: np.ndarray
+    cn: np.ndarray
+
+    def save(self, directory):
+        """Write the stacked layers as MATRIX_FILE and the row/column index as INDEX_FILE"""
+        np.save(os.path.join(directory, MATRIX_FILE), np.stack([getattr(self, layer) for layer in LAYERS]))
+        with open(os.path.join(directory, INDEX_FILE), 'w') as f:
+            json.dump({'layers': list(LAYERS), 'samples': self.samples, 'chromosomes': self.chromosomes,
+                       'bin_size': self.bin_size, 'offsets': self.offsets.tolist()}, f)
+        return os.path.join(directory, MATRIX_FILE)
+
+    @classmethod
+    def load(cls, directory):
+        with open(os.path.join(directory, INDEX_FILE)) as f:
+            index = json.load(f)
+        stacked = np.load(os.path.join(directory, MATRIX_FILE), mmap_mode='r')
+        layers = {layer: stacked[index['layers'].index(layer)] for layer in LAYERS}
+        return cls(samples=index['samples'], chromosomes=index['chromosomes'], bin_size=index['bin_size'],
+                   offsets=np.asarray(index['offsets']), **layers)
+
+
+def group_quantiles(keys, values, n_groups, quantiles=(0.5,)):
+    """(len(quantiles), n_groups) float32 quantiles of `values` per integer key in
+    [0, n_groups) with linear interpolation (as np.quantile), NaN for empty groups.
+    One lexsort for all groups."""
+    order = np.lexsort((values, keys))
+    keys, values = keys[order], values[order]
+    counts = np.bincount(keys, minlength=n_groups)
+    starts = np.cumsum(counts) - counts
+    out = np.full((len(quantiles), n_groups), np.nan, dtype=np.float32)
+    has = counts > 0
+    for row, q in enumerate(quantiles):
+        position = q * (counts[has] - 1)
+        lo = np.floor(position).astype(np.int64)
+        hi = np.ceil(position).astype(np.int64)
+        out[row, has] = values[starts[has] + lo] + (values[starts[has] + hi] - values[starts[has] + lo]) * (position - lo)
+    return out
+
+
+def _group_mean(keys, values, n_groups):
+    counts = np.bincount(keys, minlength=n_groups)
+    sums = np.bincount(keys, weights=values, minlength=n_groups)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return (sums / counts).astype(np.float32)
+
+
+def bin_index(chromosome, start, chrom_index, offsets, bin_size):
+    """Genome-wide bin of each position; -1 for unknown chromosomes"""
+    chrom = chromosome.astype(str).str.upper().str.replace(r'^CHR', '', regex=True)
+    index = chrom.map(chrom_index).to_numpy(dtype=float)
+    position = pd.to_numeric(start, errors='coerce').to_numpy(dtype=float)
+    known = ~np.isnan(index) & ~np.isnan(position)
+    bins = np.full(len(index), -1, dtype=np.int64)
+    idx = index[known].astype(np.int64)
+    local = np.clip(position[known].astype(np.int64) // bin_size, 0, offsets[idx + 1] - offsets[idx] - 1)
+    bins[known] = offsets[idx] + local
+    return bins
+
+
+def _called_cn(calls, chrom_index, offsets, bin_size, total):
+    """Copy number per bin from CNV calls (later calls win on overlap), 2 elsewhere"""
+    cn = np.full(total, 2.0, dtype=np.float32)
+    cn_column = next((c for c in CN_COLUMNS if calls is not None and c in calls.columns), None)
+    if cn_column is None or not len(calls):
+        return cn
+    first = bin_index(calls['Chromosome'], calls['Start'], chrom_index, offsets, bin_size)
+    last = bin_index(calls['Chromosome'], pd.to_numeric(calls['End'], errors='coerce') - 1,
+                     chrom_index, offsets, bin_size)
+    values = pd.to_numeric(calls[cn_column], errors='coerce').to_numpy(dtype=np.float32)
+    keep = (first >= 0) & (last >= first) & ~np.isnan(values)
+    first, last, values = first[keep], last[keep], values[keep]
+    # every covered bin once: repeat each call over its bin span
+    spans = last - first + 1
+    covered = np.repeat(first - np.cumsum(spans) + spans, spans) + np.arange(spans.sum())
+    cn[covered] = np.repeat(values, spans)
+    return cn
+
+
+def cohort_matrix(data_by_sample, chromosomes=None, bin_size=DEFAULT_BIN_SIZE) -> CohortMatrix:
+    """Bin every sample's BAF/LRR data and CNV calls into one CohortMatrix.
+
+    `data_by_sample` maps sample id → (baf_lrr_data, cnv calls); the calls may use
+    any of the CN_COLUMNS. Cost is O(SNPs) per sample and O(samples × bins) overall."""
+    chromosomes, offsets = genome_bins(chromosomes, bin_size)
+    chrom_index = {c: i for i, c in enumerate(chromosomes)}
+    total = int(offsets[-1])
+
+    samples = [str(s) for s in data_by_sample]
+    layers = {layer: np.full((len(samples), total), np.nan, dtype=np.float32) for layer in LAYERS}
+    for row, (baf_lrr, calls) in enumerate(data_by_sample.values()):
+        layers['cn'][row] = _called_cn(calls, chrom_index, offsets, bin_size, total)
+        if baf_lrr is None or not len(baf_lrr):
+            continue
+        bins = bin_index(baf_lrr['Chromosome'], baf_lrr['Position'], chrom_index, offsets, bin_size)
+        lrr = pd.to_numeric(baf_lrr['LRR'], errors='coerce').to_numpy(dtype=np.float64)
+        baf = pd.to_numeric(baf_lrr['BAF'], errors='coerce').to_numpy(dtype=np.float64)
+
+        ok = (bins >= 0) & ~np.isnan(lrr)
+        layers['lrr'][row] = group_quantiles(bins[ok], lrr[ok], total)[0]
+        het = (bins >= 0) & (baf > HET_BAND[0]) & (baf < HET_BAND[1])
+        layers['baf_deviation'][row] = _group_mean(bins[het], np.abs(baf[het] - 0.5), total)
+
+    return CohortMatrix(samples=samples, chromosomes=chromosomes, bin_size=bin_size, offsets=offsets, **layers)
+
+
+# (title, palette, low, high) per layer
+HEATMAP_LAYERS = {
+    'lrr': ('Median LRR', ['#b2182b', '#ef8a62', '#fddbc7', '#f7f7f7', '#d1e5f0', '#67a9cf', '#2166ac'], -0.6, 0.6),
+    'baf_deviation': ('BAF band deviation |BAF − 0.5|', ['#fff7ec', '#fdd49e', '#fc8d59', '#d7301f', '#7f0000'], 0.0, 0.3),
+    'cn': ('Called copy number', ['#b2182b', '#ef8a62', '#f7f7f7', '#67a9cf', '#2166ac'], -0.5, 4.5),
+}
+
+
+def generate_cohort_heatmap(matrix: CohortMatrix) -> str:
+    """One Bokeh `image` heatmap per layer (tabs with linked ranges), as json_item"""
+    try:
+        n_samples, n_bins = len(matrix.samples), int(matrix.offsets[-1])
+        if not n_samples:
+            return json.dumps({'error': 'No samples available'})
+        x_range = Range1d(0, n_bins, bounds=(0, n_bins))
+        y_range = Range1d(0, n_samples, bounds=(0, n_samples))
+        centers = ((matrix.offsets[:-1] + matrix.offsets[1:]) / 2).tolist()
+        rows = [i + 0.5 for i in range(n_samples)]
+        height = min(1200, max(300, 24 * n_samples + 120))
+
+        panels = []
+        for layer, (title, palette, low, high) in HEATMAP_LAYERS.items():
+            p = figure(
+                height=height,
+                sizing_mode='stretch_width',
+                title=f'{title} – {matrix.bin_size / SCALE:g} Mb bins',
+                tools='xpan,xwheel_zoom,box_zoom,reset,save',
+                toolbar_location='above',
+                x_range=x_range,
+                y_range=y_range,
+                x_axis_label='Chromosome',
+            )
+            mapper = LinearColorMapper(palette=palette, low=low, high=high, nan_color='#e0e0e0')
+            image = p.image(image=[getattr(matrix, layer)], x=0, y=0, dw=n_bins, dh=n_samples,
+                            color_mapper=mapper)
+            p.add_tools(HoverTool(renderers=[image], tooltips=[(title, '@image{0.00}'), ('Bin', '$x{0}')]))
+            p.add_layout(ColorBar(color_mapper=mapper, width=12), 'right')
+
+            p.xaxis.ticker = FixedTicker(ticks=centers)
+            p.xaxis.major_label_overrides = dict(zip(centers, matrix.chromosomes))
+            p.yaxis.ticker = FixedTicker(ticks=rows)
+            p.yaxis.major_label_overrides = dict(zip(rows, matrix.samples))
+            p.grid.grid_line_color = None
+            for boundary in matrix.offsets[1:-1].tolist():
+                p.line([boundary, boundary], [0, n_samples], line_color='white', line_width=1)
+            panels.append(TabPanel(child=p, title=title.split(' |')[0]))
+
+        return json.dumps(json_item(Tabs(tabs=panels, sizing_mode='stretch_width')))
+    except Exception as e:
+        return json.dumps({'error': str(e)})
@@ -0,0 +1,149 @@
+import json
+
+import numpy as np
+import pandas as pd
+from bokeh.embed import json_item
+from bokeh.layouts import column
+from bokeh.models import ColumnDataSource, FixedTicker, HoverTool, OpenURL, Range1d, TapTool
+from bokeh.plotting import figure
+
+from src.plots.cohort_matrix import bin_index, group_quantiles
+from src.plots.karyotype import CHROM_LENGTHS, SCALE
+from src.plots.recurrence import DEFAULT_BIN_SIZE, genome_bins
+
+LOWER_BAF_BAND = (0.1, 0.5)   # heterozygous SNPs below / above 0.5, summarised separately
+UPPER_BAF_BAND = (0.5, 0.9)
+CLR_LRR = '#1f77b4'
+CLR_BAF = '#2ca02c'
+
+
+def bin_aggregates(baf_lrr_data, chromosomes=None, bin_size=DEFAULT_BIN_SIZE) -> pd.DataFrame:
+    """Per-bin summary of one sample's BAF/LRR data, one row per bin with SNPs.
+
+    Columns: Chromosome, Start, End (bp), snps, lrr_q1 / lrr_median / lrr_q3 and the
+    median BAF of the lower / upper heterozygous band (NaN without heterozygous SNPs)."""
+    chromosomes, offsets = genome_bins(chromosomes, bin_size)
+    total = int(offsets[-1])
+    chrom_index = {c: i for i, c in enumerate(chromosomes)}
+    bins = bin_index(baf_lrr_data['Chromosome'], baf_lrr_data['Position'], chrom_index, offsets, bin_size)
+    lrr = pd.to_numeric(baf_lrr_data['LRR'], errors='coerce').to_numpy(dtype=np.float64)
+    baf = pd.to_numeric(baf_lrr_data['BAF'], errors='coerce').to_numpy(dtype=np.float64)
+
+    ok = (bins >= 0) & ~np.isnan(lrr)
+    lrr_q1, lrr_median, lrr_q3 = group_quantiles(bins[ok], lrr[ok], total, (0.25, 0.5, 0.75))
+    bands = []
+    for low, high in (LOWER_BAF_BAND, UPPER_BAF_BAND):
+        band = (bins >= 0) & (baf > low) & (baf < high)
+        bands.append(group_quantiles(bins[band], baf[band], total)[0])
+
+    chrom_idx = np.repeat(np.arange(len(chromosomes)), np.diff(offsets))
+    start = (np.arange(total) - offsets[chrom_idx]) * bin_size
+    lengths = np.array([CHROM_LENGTHS[c] for c in chromosomes], dtype=np.int64)
+    summary = pd.DataFrame({
+        'Chromosome': np.asarray(chromosomes, dtype=object)[chrom_idx],
+        'Start': start,
+        'End': np.minimum(start + bin_size, lengths[chrom_idx]),
+        'snps': np.bincount(bins[bins >= 0], minlength=total),
+        'lrr_q1': lrr_q1,
+        'lrr_median': lrr_median,
+        'lrr_q3': lrr_q3,
+        'baf_lower': bands[0],
+        'baf_upper': bands[1],
+    })
+    return summary[summary['snps'] > 0].reset_index(drop=True)
+
+
+def _chromosome_source(chromosomes, chromosome_links):
+    """One clickable background band per chromosome, in genome Mb"""
+    lengths = np.array([CHROM_LENGTHS[c] for c in chromosomes], dtype=float) / SCALE
+    starts = np.cumsum(lengths) - lengths
+    return ColumnDataSource({
+        'chrom': chromosomes,
+        'left': starts,
+        'right': starts + lengths,
+        'fill': ['#f7f7f7' if i % 2 else '#e8e8e8' for i in range(len(chromosomes))],
+        'url': [chromosome_links.get(c, '') for c in chromosomes],
+    }), dict(zip(chromosomes, starts))
+
+
+def _bins_source(aggregates, genome_start):
+    """Bin columns in genome Mb, as float32 to keep the page small"""
+    x0 = aggregates['Chromosome'].map(genome_start).to_numpy() + aggregates['Start'].to_numpy() / SCALE
+    x1 = x0 + (aggregates['End'] - aggregates['Start']).to_numpy() / SCALE
+    data = {'chrom': aggregates['Chromosome'].tolist(), 'x0': x0, 'x1': x1, 'x': (x0 + x1) / 2,
+            'start_mb': aggregates['Start'].to_numpy() / SCALE, 'end_mb': aggregates['End'].to_numpy() / SCALE,
+            'snps': aggregates['snps'].to_numpy()}
+    for name in ('lrr_q1', 'lrr_median', 'lrr_q3', 'baf_lower', 'baf_upper'):
+        data[name] = aggregates[name].to_numpy()
+    return ColumnDataSource({k: v.astype(np.float32) if isinstance(v, np.ndarray) and v.dtype == np.float64 else v
+                             for k, v in data.items()})
+
+
+def _panel(title, y_label, x_range, y_range, chroms, chromosomes, centers, height):
+    p = figure(
+        title=title,
+        height=height,
+        sizing_mode='stretch_width',
+        x_range=x_range,
+        y_range=y_range,
+        y_axis_label=y_label,
+        tools='xpan,xwheel_zoom,box_zoom,reset,save',
+        toolbar_location='above',
+        output_backend='webgl',
+    )
+    bands = p.quad(left='left', right='right', bottom=y_range.start, top=y_range.end,
+                   source=chroms, fill_color='fill', line_color=None, fill_alpha=0.8,
+                   hover_fill_color='#d0e4f5', hover_fill_alpha=1.0,
+                   nonselection_fill_alpha=0.8, selection_fill_alpha=0.8)
+    p.add_tools(TapTool(renderers=[bands], callback=OpenURL(url='@url', same_tab=True)))
+    p.add_tools(HoverTool(renderers=[bands], tooltips=[('Chromosome', '@chrom (click to open)')],
+                          mode='mouse', point_policy='follow_mouse'))
+    p.xaxis.ticker = FixedTicker(ticks=centers)
+    p.xaxis.major_label_overrides = dict(zip(centers, chromosomes))
+    p.xgrid.grid_line_color = None
+    return p
+
+
+def generate_genome_overview_plot(tracks, available_chromosomes, chromosome_links,
+                                  bin_size=DEFAULT_BIN_SIZE):
+    """Genome-wide LRR (median + IQR) and BAF band panels from per-bin aggregates.
+
+    `tracks` maps a label (e.g. the sample id) to its BAF/LRR frame, one LRR and one
+    BAF panel per track with a shared x range; `chromosome_links` maps chromosome →
+    chromosome page URL, opened by clicking the chromosome's band. The embedded data
+    scales with the number of bins, not with the array density."""
+    try:
+        chromosomes, _ = genome_bins(available_chromosomes, bin_size)
+        if not chromosomes:
+            return json.dumps({'error': 'No chromosome data available'})
+        chroms, genome_start = _chromosome_source(chromosomes, chromosome_links)
+        genome_end = float(chroms.data['right'][-1])
+        x_range = Range1d(0, genome_end, bounds=(0, genome_end))
+        centers = ((chroms.data['left'] + chroms.data['right']) / 2).tolist()
+
+        panels = []
+        for label, baf_lrr in tracks.items():
+            if baf_lrr is None or baf_lrr.empty:
+                continue
+            bins = _bins_source(bin_aggregates(baf_lrr, chromosomes, bin_size), genome_start)
+            p_lrr = _panel(f'LRR – {label}', 'LRR', x_range, Range1d(-1.5, 1.0), chroms, chromosomes, centers, 220)
+            p_lrr.quad(left='x0', right='x1', bottom='lrr_q1', top='lrr_q3', source=bins,
+                       fill_color=CLR_LRR, fill_alpha=0.25, line_color=None)
+            median = p_lrr.scatter('x', 'lrr_median', source=bins, size=3, color=CLR_LRR)
+            p_lrr.add_tools(HoverTool(renderers=[median], mode='vline', tooltips=[
+                ('Region', 'chr@chrom:@start_mb{0.0}–@end_mb{0.0} Mb'),
+                ('SNPs', '@snps'),
+                ('LRR median (IQR)', '@lrr_median{0.000} (@lrr_q1{0.000} – @lrr_q3{0.000})'),
+                ('BAF bands', '@baf_lower{0.000} / @baf_upper{0.000}'),
+            ]))
+
+            p_baf = _panel(f'BAF – {label}', 'BAF', x_range, Range1d(0, 1), chroms, chromosomes, centers, 180)
+            p_baf.scatter('x', 'baf_lower', source=bins, size=3, color=CLR_BAF)
+            p_baf.scatter('x', 'baf_upper', source=bins, size=3, color=CLR_BAF)
+            panels += [p_lrr, p_baf]
+
+        if not panels:
+            return json.dumps({'error': 'No BAF/LRR data available'})
+        return json.dumps(json_item(column(*panels, sizing_mode='stretch_width')))
+    except Exception as e:
+        return json.dumps({'error': str(e)})
@@ -8,7 +8,9 @@ import numbers
 from bokeh.palettes import Category10
 from bokeh.transform import factor_cmap
 from bokeh.embed import components, json_item
+from functools import lru_cache
 import math
+import numpy as np
 import pandas as pd
 import json
 from bokeh.plotting import figure
@@ -74,11 +76,11 @@ def _detect_mode(df, requested):
 
 
 def build_chrom_polygon_capsule(x_center, total_len, centromere_pos):
-    """Returns (xs, ys) lists describing a polygon for one chromosome"""
+    """Returns (xs, ys) arrays describing a polygon for one chromosome"""
     # Convert to plot units
     totalY = total_len / SCALE
     centY = centromere_pos / SCALE
-    
+
     # The half-circle radius for top/bottom
     r = CHROM_FULL_WIDTH / 2.0
     waist_r = CHROM_WAIST_WIDTH / 2.0
@@ -86,52 +88,24 @@ def build_chrom_polygon_capsule(x_center, total_len, centromere_pos):
     cent_start = max(r, centY - waist_size/2)
     cent_end = min(totalY - r, centY + waist_size/2)
 
-    left_x, left_y = [], []
-
-    # Bottom arc
-    for i in range(ARC_STEPS+1):
-        yv = r * i / ARC_STEPS
-        xoff_sq = r**2 - (r - yv)**2
-        xoff = math.sqrt(max(xoff_sq, 0))  # Use math.sqrt instead of np.sqrt
-        left_x.append(x_center - xoff)
-        left_y.append(yv)
-
-    # Helper function to replace np.linspace
-    def linspace(start, stop, num):
-        return [start + (stop-start)*i/(num-1) for i in range(num)]
-
-    # Wide region (r..cent_start)
-    if cent_start > r:
-        for yv in linspace(r, cent_start, BODY_STEPS+1):
-            left_x.append(x_center - r)
-            left_y.append(yv)
-
-    # Narrow region (cent_start..cent_end)
-    if cent_end > cent_start:
-        for yv in linspace(cent_start, cent_end, BODY_STEPS+1):
-            left_x.append(x_center - waist_r)
-            left_y.append(yv)
-
-    # Wide region (cent_end.. totalY - r)
-    if (totalY - r) > cent_end:
-        for yv in linspace(cent_end, totalY - r, BODY_STEPS+1):
-            left_x.append(x_center - r)
-            left_y.append(yv)
-
-    # Top arc
-    for i in range(ARC_STEPS+1):
-        yv = (totalY - r) + r * i / ARC_STEPS
-        diff = yv - (totalY - r)
-        xoff_sq = r**2 - diff**2
-        xoff = math.sqrt(max(xoff_sq, 0))
-        left_x.append(x_center - xoff)
-        left_y.append(yv)
+    arc = r * np.arange(ARC_STEPS+1) / ARC_STEPS
+    # (x offset from the centre line, y) segments of the left outline, bottom to top
+    segments = [(np.sqrt(np.maximum(r**2 - (r - arc)**2, 0)), arc)]          # Bottom arc
+    for lo, hi, half_width in (
+        (r, cent_start, r),                  # Wide region (r..cent_start)
+        (cent_start, cent_end, waist_r),     # Narrow region (cent_start..cent_end)
+        (cent_end, totalY - r, r),           # Wide region (cent_end.. totalY - r)
+    ):
+        if hi > lo:
+            segments.append((np.full(BODY_STEPS+1, half_width), np.linspace(lo, hi, BODY_STEPS+1)))
+    segments.append((np.sqrt(np.maximum(r**2 - arc**2, 0)), (totalY - r) + arc))   # Top arc
+
+    left_x = x_center - np.concatenate([xoff for xoff, _ in segments])
+    left_y = np.concatenate([yv for _, yv in segments])
 
     # Create right side by mirroring left side
-    right_x = [2*x_center - x for x in left_x[::-1]]
-    right_y = left_y[::-1]
-
-    return left_x + right_x, left_y + right_y
+    return (np.concatenate([left_x, 2*x_center - left_x[::-1]]),
+            np.concatenate([left_y, left_y[::-1]]))
 
 def get_chromosome_data_from_available(available_chromosomes):
     """Get chromosome data based on available_chromosomes list"""
@@ -144,10 +118,15 @@ def get_chromosome_data_from_available(available_chromosomes):
     # Maintain the original order from available_chromosomes
     return sorted(chroms, key=lambda x: available_chromosomes.index(x["chr"]))
 
-def build_all_chromosomes(available_chromosomes):
-    """Build coordinates using available_chromosomes order"""
-    chroms_sorted = get_chromosome_data_from_available(available_chromosomes)
-    
+@lru_cache(maxsize=None)
+def _ideogram_geometry(chromosomes):
+    """Chromosome silhouettes for one (ordered) chromosome tuple, built once per process.
+
+    The polygons only depend on the reference table and the chromosome set, so every
+    karyotype plot with the same set (samples and simulated data alike) shares them.
+    The arrays are read-only because they are shared between plots."""
+    chroms_sorted = get_chromosome_data_from_available(list(chromosomes))
+
     all_xs = []
     all_ys = []
     labels = []
@@ -157,13 +136,19 @@ def build_all_chromosomes(available_chromosomes):
     for i, c in enumerate(chroms_sorted):
         x_center = i * 1.5
         xs, ys = build_chrom_polygon_capsule(x_center, c["length"], c["centromere"])
+        xs.flags.writeable = False
+        ys.flags.writeable = False
         all_xs.append(xs)
         all_ys.append(ys)
         labels.append(c["chr"])
         label_xs.append(x_center)
         label_ys.append(BOTTOM_LABEL_OFFSET)
 
-    return all_xs, all_ys, labels, label_xs, label_ys
+    return tuple(all_xs), tuple(all_ys), tuple(labels), tuple(label_xs), tuple(label_ys)
+
+def build_all_chromosomes(available_chromosomes):
+    """Build coordinates using available_chromosomes order (cached per chromosome set)"""
+    return tuple(list(part) for part in _ideogram_geometry(tuple(available_chromosomes)))
 
 def generate_karyotype_plot(
     summary_df,
@@ -312,120 +297,111 @@ def generate_karyotype_plot(
     
     
 
+# Reference length per chromosome name, for the vectorised lookups below
+CHROM_LENGTHS = {c["chr"]: c["length"] for c in ALL_CHROMOSOMES}
+
+EVENT_COLUMNS = ('x', 'y', 'size', 'start', 'end', 'label', 'type',
+                 'length_mb', 'p_value', 'p_value_num', 'alpha', 'cn_change')
+QS_CANDIDATES = ("QS", "QualityScore", "QUAL", "Quality_Score", "Quality")
+
+
+def _format_p_value(p):
+    if p != p:  # no quality score
+        return "NA"
+    return f"{p:.4f}".rstrip('0').rstrip('.') if p >= 0.0001 else f"{p:.4e}"
+
+
 def prepare_event_data(summary_df, available_chromosomes, mode="single"):
-    """Convert CNV data to plot coordinates using available chromosomes"""
-    events = []
+    """Convert CNV data to plot coordinates using available chromosomes.
+
+    Returns a dict of column arrays (EVENT_COLUMNS) ready for a ColumnDataSource;
+    rows on unknown chromosomes or with unparseable / empty coordinates are dropped."""
     print("prepare_event_data: rows in df =", len(summary_df))
     chroms = get_chromosome_data_from_available(available_chromosomes)
     chrom_positions = {c["chr"]: idx*1.5 for idx, c in enumerate(chroms)}
-    
-    for _, row in summary_df.iterrows():
-        try:
-            # Handle chromosome parsing with X/Y support
-            raw_chrom = str(row['Chromosome']).strip().upper()
-            if raw_chrom.startswith('Chromosome'):
-                raw_chrom = raw_chrom[3:]
-                
-            # Convert to string without forcing integer conversion
-            chrom = raw_chrom.replace(" ", "")
-            
-            # Validate chromosome exists in our data
-            if chrom not in chrom_positions:
-                continue
-                
-            # Get reference chromosome length
-            chrom_data = next(c for c in ALL_CHROMOSOMES if c["chr"] == chrom)
-            max_bp = chrom_data["length"]
-            max_mb = max_bp/SCALE
-            
-            # Auto-detect units and convert to bp
-            def convert_units(val):
-                # Handle Mb input (values < chromosome length in Mb)
-                if val <= max_mb: 
-                    return val * SCALE
-                # Handle bp input (values > max_mb but < max_bp)
-                return min(val, max_bp)
-            
-            start = convert_units(float(row['Start']))
-            end = convert_units(float(row['End']))
-            
-            # Clip to chromosome boundaries
-            start = max(0, min(start, max_bp))
-            end = max(0, min(end, max_bp))
-            
-            if start >= end:  # Discard invalid regions
-                continue
-                
-            # Calculate P-value from QS column
-    # ---------- P‑value from (Quality)Score ------------------------
-            qs_raw = None
-            for cand in ("QS", "QualityScore", "QUAL", "Quality_Score", "Quality"):
-                if cand in row and pd.notna(row[cand]):
-                    qs_raw = row[cand]
-                    break
-
-            if qs_raw is not None:
-                try:
-                    p_value_num = 10 ** (-float(qs_raw) / 10.0)
-                    p_value = f"{p_value_num:.4f}".rstrip('0').rstrip('.') if p_value_num >= 0.0001 else f"{p_value_num:.4e}"
-                except Exception:
-                    p_value_num, p_value = 1.0, "NA"
-            else:
-                p_value_num, p_value = 1.0, "NA"
-
-            # Add mode-specific data
-            if mode == 'differential':
-                cn_pre = float(row.get('CN_pre', 2))
-                cn_post = float(row.get('CN_post', 2))
-                cn_change = f"CN: {cn_pre:g} -> {cn_post:g}"
-                
-                event_type = 'deletion' if cn_post < cn_pre else 'duplication'
-            else:
-                cn_change = f"CN: {row.get('CN', 'NA')}"
-                event_type = row['Type'].lower()
-
-            events.append({
-                "type": event_type,
-                "chrom": chrom,
-                "start": start / SCALE,
-                "end": end / SCALE,
-                "x": chrom_positions[chrom],
-                "y": (start + end) / (2 * SCALE),
-                "size": min(25, 5 + 2*(end - start)/SCALE),  # Cap maximum size at 25
-                "label": f"{row['Type']} Chr{chrom}: {start/1e6:.2f}-{end/1e6:.2f} Mb",
-                "length_mb": (end - start) / SCALE,
-                "p_value": p_value,
-                "p_value_num": p_value_num,
-                "cn_change": cn_change
-            })
-            
-        except Exception as e:
-            print(f"Skipping invalid CNV row: {str(e)}")
-            continue
-
-    return events
+    empty = {k: [] for k in EVENT_COLUMNS}
+    if summary_df.empty or 'Type' not in summary_df.columns:
+        return empty
+
+    # Chromosome names: "chr1" / " 1 " / 1 → "1"
+    chrom = (summary_df['Chromosome'].astype(str).str.upper()
+             .str.replace(" ", "", regex=False).str.replace(r"^CHR", "", regex=True))
+    x = chrom.map(chrom_positions).to_numpy(dtype=float)
+    max_bp = chrom.map(CHROM_LENGTHS).to_numpy(dtype=float)
+    max_mb = max_bp / SCALE
+
+    # Auto-detect units per value: within the chromosome length in Mb → Mb, otherwise bp
+    def to_bp(values):
+        val = pd.to_numeric(values, errors='coerce').to_numpy(dtype=float)
+        bp = np.where(val <= max_mb, val * SCALE, np.minimum(val, max_bp))
+        return np.clip(bp, 0, max_bp)
+
+    start = to_bp(summary_df['Start'])
+    end = to_bp(summary_df['End'])
+
+    # NaN positions / coordinates compare False and are dropped with the empty regions
+    keep = ~np.isnan(x) & (start < end)
+    if mode != 'differential':
+        keep &= summary_df['Type'].map(lambda t: isinstance(t, str)).to_numpy()
+    if not keep.any():
+        return empty
+
+    df = summary_df[keep]
+    chrom, start, end = chrom[keep].tolist(), start[keep], end[keep]
+
+    # P-value from the first available (Quality)Score column, row by row
+    qs = pd.Series(np.nan, index=df.index)
+    for cand in QS_CANDIDATES:
+        if cand in df.columns:
+            qs = qs.fillna(pd.to_numeric(df[cand], errors='coerce'))
+    qs = qs.to_numpy(dtype=float)
+    p_value_num = np.where(np.isnan(qs), 1.0, 10 ** (-qs / 10.0))
+    p_value = [_format_p_value(p) for p in (10 ** (-qs / 10.0)).tolist()]
+
+    # Add mode-specific data
+    if mode == 'differential':
+        cn_pre, cn_post = (
+            pd.to_numeric(df[col], errors='coerce').to_numpy(dtype=float) if col in df.columns
+            else np.full(len(df), 2.0)
+            for col in ('CN_pre', 'CN_post')
+        )
+        cn_change = [f"CN: {a:g} -> {b:g}" for a, b in zip(cn_pre.tolist(), cn_post.tolist())]
+        event_type = np.where(cn_post < cn_pre, 'deletion', 'duplication').tolist()
+    else:
+        cn_change = [f"CN: {cn}" for cn in (df['CN'].tolist() if 'CN' in df.columns else ['NA'] * len(df))]
+        event_type = df['Type'].str.lower().tolist()
+
+    length_mb = (end - start) / SCALE
+    labels = [f"{t} Chr{c}: {s:.2f}-{e:.2f} Mb"
+              for t, c, s, e in zip(df['Type'].tolist(), chrom, (start / 1e6).tolist(), (end / 1e6).tolist())]
+
+    return {
+        'x': x[keep],
+        'y': (start + end) / (2 * SCALE),
+        'size': np.minimum(25, 5 + 2 * length_mb),  # Cap maximum size at 25
+        'start': start / SCALE,
+        'end': end / SCALE,
+        'label': labels,
+        'type': event_type,
+        'length_mb': length_mb,
+        'p_value': p_value,
+        'p_value_num': p_value_num,
+        'alpha': np.where(p_value_num <= 0.05, 1.0,
+                          np.maximum(1 / (1 + (p_value_num - 0.05) * 20) ** 4, 0.1)),
+        'cn_change': cn_change,
+    }
 
 from bokeh.models import Legend, LegendItem, BooleanFilter, CustomJS, CDSView
 
 def add_event_annotations(p, events, hover):
     """Add CNV markers with working legend + ≥ 1 Mb size filter."""
-    if not events:
+    if not len(events['x']):
         return
 
     # ------------------------------------------------------------------ #
-    # 1. ColumnDataSource  (alpha computed once here)
+    # 1. ColumnDataSource  (columns from prepare_event_data, alpha included)
     # ------------------------------------------------------------------ #
-    cds_dict = {k: [] for k in (
-        'x','y','size','start','end','label','type',
-        'length_mb','p_value','p_value_num','alpha', 'cn_change'  
-    )}
-
-    for ev in events:
-        p_val = ev['p_value_num']
-        ev['alpha'] = 1.0 if p_val <= 0.05 else max(1/(1+(p_val-0.05)*20)**4, 0.1)
-        for k in cds_dict:
-            cds_dict[k].append(ev[k])
-
+    cds_dict = {k: v.tolist() if isinstance(v, np.ndarray) else v for k, v in events.items()}
     source = ColumnDataSource(cds_dict)
 
     # ------------------------------------------------------------------ #
@@ -0,0 +1,275 @@
+from dataclasses import dataclass
+import json
+
+import numpy as np
+import pandas as pd
+from bokeh.embed import json_item
+from bokeh.layouts import column
+from bokeh.models import (
+    BoxAnnotation, ColumnDataSource, CustomJSTickFormatter, FixedTicker, HoverTool, Range1d
+)
+from bokeh.plotting import figure
+
+from src.plots.cnv_distribution import classify_cohort_cnvs
+from src.plots.karyotype import (
+    ALL_CHROMOSOMES, CHROM_FULL_WIDTH, CHROM_LENGTHS, SCALE, build_all_chromosomes
+)
+
+DEFAULT_BIN_SIZE = 1_000_000
+BAR_GAP = 0.05          # ideogram units between a chromosome and its recurrence bars
+BAR_MAX_WIDTH = 0.55    # ideogram bar width for 100 % of the samples
+GAIN_COLOR = '#377eb8'
+LOSS_COLOR = '#e41a1c'
+
+
+@dataclass
+class CohortRecurrence:
+    """Samples carrying a gain / loss per genome bin.
+
+    Bins are `bin_size` bp wide and restart at every chromosome; the bins of
+    `chromosomes[i]` are `offsets[i]:offsets[i+1]` of `gains` / `losses`."""
+    chromosomes: list
+    bin_size: int
+    n_samples: int
+    offsets: np.ndarray
+    gains: np.ndarray
+    losses: np.ndarray
+
+    def bins(self) -> pd.DataFrame:
+        """One row per bin: Chromosome, Start, End (bp), Gains, Losses"""
+        sizes = np.diff(self.offsets)
+        chrom_idx = np.repeat(np.arange(len(self.chromosomes)), sizes)
+        start = (np.arange(self.offsets[-1]) - self.offsets[chrom_idx]) * self.bin_size
+        lengths = np.array([CHROM_LENGTHS[c] for c in self.chromosomes], dtype=np.int64)
+        return pd.DataFrame({
+            'Chromosome': np.asarray(self.chromosomes, dtype=object)[chrom_idx],
+            'Start': start,
+            'End': np.minimum(start + self.bin_size, lengths[chrom_idx]),
+            'Gains': self.gains,
+            'Losses': self.losses,
+        })
+
+    def to_tsv(self, path):
+        self.bins().to_csv(path, sep='\t', index=False)
+        return path
+
+
+def genome_bins(chromosomes=None, bin_size=DEFAULT_BIN_SIZE):
+    """Known chromosomes (all reference chromosomes by default) and the first genome-wide
+    bin of each, plus the total bin count: bins restart at every chromosome"""
+    if chromosomes is None:
+        chromosomes = [c['chr'] for c in ALL_CHROMOSOMES]
+    chromosomes = [str(c) for c in chromosomes if str(c) in CHROM_LENGTHS]
+    n_bins = np.array([-(-CHROM_LENGTHS[c] // bin_size) for c in chromosomes], dtype=np.int64)
+    return chromosomes, np.concatenate([[0], np.cumsum(n_bins)])
+
+
+def cohort_chromosomes(samples):
+    """Reference-ordered chromosomes that any sample (or pair) has data for; None → all"""
+    present = {str(c) for s in samples for c in (s.available_chromosomes or [])}
+    return [c['chr'] for c in ALL_CHROMOSOMES if c['chr'] in present] or None
+
+
+def _merged_bin_runs(calls):
+    """Collapse overlapping bin ranges of the same sample and type, so that
+    every sample counts at most once per bin"""
+    calls = calls.sort_values(['Sample', 'Type', 'first'], kind='stable')
+    groups = [calls['Sample'], calls['Type']]
+    reach = calls.groupby(groups, sort=False)['last'].cummax()
+    previous_reach = reach.groupby(groups, sort=False).shift()
+    run = (~(calls['first'] <= previous_reach)).cumsum()
+    return calls.groupby(run, sort=False).agg(Type=('Type', 'first'), first=('first', 'min'), last=('last', 'max'))
+
+
+def cohort_recurrence(calls_by_sample, chromosomes=None, bin_size=DEFAULT_BIN_SIZE) -> CohortRecurrence:
+    """Bin every sample's CNV calls (cnv_detection_filtered / cn_summary_data layouts)
+    into per-bin sample counts.
+
+    Each call adds +1 at its first bin and -1 after its last bin of a difference
+    array; one cumulative sum then yields the counts, O(total calls + bins)."""
+    chromosomes, offsets = genome_bins(chromosomes, bin_size)
+    total = int(offsets[-1])
+
+    calls = classify_cohort_cnvs(calls_by_sample)
+    counts = {'Duplication': np.zeros(total, dtype=np.int32), 'Deletion': np.zeros(total, dtype=np.int32)}
+    if len(calls):
+        chrom = calls['Chromosome'].str.upper().str.replace(r'^CHR', '', regex=True)
+        index = chrom.map({c: i for i, c in enumerate(chromosomes)})
+        length = chrom.map(CHROM_LENGTHS)
+        start = pd.to_numeric(calls['Start'], errors='coerce').clip(lower=0)
+        end = pd.to_numeric(calls['End'], errors='coerce').clip(upper=length)
+        keep = index.notna() & (start < end)
+
+        calls = calls[keep]
+        offset = offsets[index[keep].astype(int).to_numpy()]
+        calls = calls.assign(
+            first=offset + start[keep].to_numpy(dtype=np.int64) // bin_size,
+            last=offset + (end[keep].to_numpy(dtype=np.int64) - 1) // bin_size,
+        )
+        runs = _merged_bin_runs(calls)
+        for cnv_type, run in runs.groupby('Type'):
+            diff = (np.bincount(run['first'], minlength=total + 1)
+                    - np.bincount(run['last'] + 1, minlength=total + 1))
+            counts[cnv_type] = np.cumsum(diff[:-1]).astype(np.int32)
+
+    return CohortRecurrence(
+        chromosomes=chromosomes,
+        bin_size=bin_size,
+        n_samples=len(calls_by_sample),
+        offsets=offsets,
+        gains=counts['Duplication'],
+        losses=counts['Deletion'],
+    )
+
+
+def _recurrence_source(recurrence):
+    """Columns of the bins with any recurrence, shared by the genome track and the ideogram
+    so that selections in one highlight the other"""
+    bins = recurrence.bins()
+    bins = bins[(bins['Gains'] > 0) | (bins['Losses'] > 0)]
+    n = max(recurrence.n_samples, 1)
+    lengths = np.array([CHROM_LENGTHS[c] for c in recurrence.chromosomes], dtype=float)
+    genome_start = dict(zip(recurrence.chromosomes, np.concatenate([[0], np.cumsum(lengths)[:-1]]) / SCALE))
+    ideogram_x = {c: i * 1.5 for i, c in enumerate(recurrence.chromosomes)}
+
+    start_mb = bins['Start'].to_numpy() / SCALE
+    end_mb = bins['End'].to_numpy() / SCALE
+    gain_frac = bins['Gains'].to_numpy() / n
+    loss_frac = bins['Losses'].to_numpy() / n
+    x_center = bins['Chromosome'].map(ideogram_x).to_numpy()
+    gain_left = x_center + CHROM_FULL_WIDTH / 2 + BAR_GAP
+    loss_right = x_center - CHROM_FULL_WIDTH / 2 - BAR_GAP
+    return ColumnDataSource({
+        'chrom': bins['Chromosome'].tolist(),
+        'x': bins['Chromosome'].map(genome_start).to_numpy() + (start_mb + end_mb) / 2,
+        'width': end_mb - start_mb,
+        'start_mb': start_mb,
+        'end_mb': end_mb,
+        'gains': bins['Gains'].to_numpy(),
+        'losses': bins['Losses'].to_numpy(),
+        'gain_pct': 100 * gain_frac,
+        'loss_pct': 100 * loss_frac,
+        'loss_bar': -100 * loss_frac,
+        'gain_left': gain_left,
+        'gain_right': gain_left + BAR_MAX_WIDTH * gain_frac,
+        'loss_left': loss_right - BAR_MAX_WIDTH * loss_frac,
+        'loss_right': loss_right,
+    }), genome_start, lengths / SCALE
+
+
+def _hover(renderers):
+    return HoverTool(renderers=renderers, tooltips=[
+        ('Region', 'chr@chrom:@start_mb{0.0}–@end_mb{0.0} Mb'),
+        ('Gains', '@gains (@gain_pct{0.0}%)'),
+        ('Losses', '@losses (@loss_pct{0.0}%)'),
+    ])
+
+
+def _genome_track(recurrence, source, genome_start, lengths_mb):
+    """Genome-wide recurrence: gains up, losses down, in % of samples"""
+    genome_end = float(genome_start[recurrence.chromosomes[-1]] + lengths_mb[-1]) if recurrence.chromosomes else 1.0
+    peak = max(float(np.max(source.data['gain_pct'], initial=0)), float(np.max(source.data['loss_pct'], initial=0)))
+    y_max = max(10.0, peak * 1.15)
+    p = figure(
+        height=280,
+        sizing_mode='stretch_width',
+        title=f'CNV Recurrence – {recurrence.n_samples} samples, {recurrence.bin_size / SCALE:g} Mb bins',
+        tools='xpan,xwheel_zoom,box_zoom,tap,reset,save',
+        toolbar_location='above',
+        x_range=Range1d(0, genome_end, bounds=(0, genome_end)),
+        y_range=Range1d(-y_max, y_max),
+        x_axis_label='Chromosome',
+        y_axis_label='Samples (%)',
+        output_backend='webgl',
+    )
+    for i, chrom in enumerate(recurrence.chromosomes):
+        if i % 2:
+            p.add_layout(BoxAnnotation(left=genome_start[chrom], right=genome_start[chrom] + lengths_mb[i],
+                                       fill_color='#f0f0f0', fill_alpha=0.8, level='underlay'))
+    gains = p.vbar(x='x', width='width', bottom=0, top='gain_pct', source=source,
+                   color=GAIN_COLOR, alpha=0.8, legend_label='Gains')
+    losses = p.vbar(x='x', width='width', bottom='loss_bar', top=0, source=source,
+                    color=LOSS_COLOR, alpha=0.8, legend_label='Losses')
+    p.add_tools(_hover([gains, losses]))
+
+    centers = [float(genome_start[c] + lengths_mb[i] / 2) for i, c in enumerate(recurrence.chromosomes)]
+    p.xaxis.ticker = FixedTicker(ticks=centers)
+    p.xaxis.major_label_overrides = dict(zip(centers, recurrence.chromosomes))
+    p.yaxis.formatter = CustomJSTickFormatter(code="return Math.abs(tick) + '%';")
+    p.xgrid.grid_line_color = None
+    p.legend.location = 'top_right'
+    p.legend.orientation = 'horizontal'
+    return p
+
+
+def _cohort_ideogram(recurrence, source):
+    """Chromosome silhouettes with gain bars to the right and loss bars to the left"""
+    all_xs, all_ys, labels, label_xs, _ = build_all_chromosomes(recurrence.chromosomes)
+    max_y = max(CHROM_LENGTHS[c] for c in recurrence.chromosomes) / SCALE if recurrence.chromosomes else 1
+    p = figure(
+        height=700,
+        sizing_mode='stretch_width',
+        title='Cohort Ideogram – bar width ∝ % of samples',
+        tools='pan,wheel_zoom,box_zoom,tap,reset,save',
+        toolbar_location='above',
+        x_range=Range1d(-1, len(recurrence.chromosomes) * 1.5 + 0.5),
+        y_range=Range1d(max_y, -5),
+        x_axis_label='Chromosome',
+        y_axis_label='Position (Mb) ▴',
+        output_backend='webgl',
+    )
+    p.patches(all_xs, all_ys, line_color='black', fill_color='#f0f0f0', line_width=2, fill_alpha=0.8)
+    gains = p.quad(left='gain_left', right='gain_right', bottom='start_mb', top='end_mb',
+                   source=source, color=GAIN_COLOR, alpha=0.8)
+    losses = p.quad(left='loss_left', right='loss_right', bottom='start_mb', top='end_mb',
+                    source=source, color=LOSS_COLOR, alpha=0.8)
+    p.add_tools(_hover([gains, losses]))
+
+    p.xaxis.ticker = list(label_xs)
+    p.xaxis.major_label_overrides = dict(zip(label_xs, labels))
+    p.xaxis.major_label_text_font_style = 'bold'
+    p.yaxis.formatter.use_scientific = False
+    p.grid.grid_line_alpha = 0.3
+    return p
+
+
+def generate_recurrence_plot(recurrence: CohortRecurrence) -> str:
+    """Genome track + cohort ideogram over one shared source, as json_item"""
+    try:
+        source, genome_start, lengths_mb = _recurrence_source(recurrence)
+        layout = column(
+            _genome_track(recurrence, source, genome_start, lengths_mb),
+            _cohort_ideogram(recurrence, source),
+            sizing_mode='stretch_width',
+        )
+        result = json_item(layout)
+        result['is_empty_data'] = not len(source.data['x'])
+        return json.dumps(result)
+    except Exception as e:
+        return json.dumps({'error': str(e)})
+
+
+def recurrence_section(recurrence: CohortRecurrence) -> str:
+    """Home page section embedding generate_recurrence_plot (needs BokehJS in the page head)"""
+    plot_json = generate_recurrence_plot(recurrence).replace('</', '<\\/')
+    return f"""
+                    <!-- Cohort CNV Recurrence -->
+                    <div class="plot-section">
+                        <h3 class="section-title">Cohort CNV Recurrence</h3>
+                        <div class="plot-container">
+                            <div id="cohort-recurrence-plot" class="responsive-plot"></div>
+                        </div>
+                    </div>
+                    <script>
+                        document.addEventListener('DOMContentLoaded', () => {{
+                            const item = {plot_json};
+                            const target = document.getElementById('cohort-recurrence-plot');
+                            if (item.error) {{
+                                target.innerHTML = `<div class="info-box_empty">${{item.error}}</div>`;
+                            }} else if (item.is_empty_data) {{
+                                target.innerHTML = '<div class="info-box_empty">No CNV calls found</div>';
+                            }} else {{
+                                Bokeh.embed.embed_item(item, 'cohort-recurrence-plot');
+                            }}
+                        }});
+                    </script>"""
@@ -3,6 +3,7 @@ import argparse
 import json
 import numpy as np
 import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
 import logging
 
@@ -94,9 +95,12 @@ ILLUMINA_GENOTYPE_PARAMS = {
 # --------------------------------------------------------
 # Helper functions to generate segments and SNP data
 # --------------------------------------------------------
-def generate_controlled_segments(chromosomes, region_counts, size_range, genome_sizes, cnv_mapping=None):
+def generate_controlled_segments(chromosomes, region_counts, size_range, genome_sizes, cnv_mapping=None,
+                                 total_events=None):
     """Generate segments with controlled CNV type placement based on chromosome mapping, avoiding centromeres.
-    For normal segments, ensure they span the entire chromosome length."""
+    For normal segments, ensure they span the entire chromosome length.
+    `total_events` sets the number of CNV events per chromosome carrying events, spread over
+    its allowed types (default: the sum of the deletion / duplication / cn_loh region_counts)."""
     segments = {chrom: [] for chrom in chromosomes}
     
     # Use default mapping if none provided
@@ -151,7 +155,10 @@ def generate_controlled_segments(chromosomes, region_counts, size_range, genome_
                 max_seg = max(max_seg, 20_000_000)  # Allow segments up to 20Mb
             else:
                 # Calculate total non-normal regions to place
-                non_normal_total = sum(region_counts.get(t, 1) for t in ["deletion", "duplication", "cn_loh"])
+                if total_events is not None:
+                    non_normal_total = total_events
+                else:
+                    non_normal_total = sum(region_counts.get(t, 1) for t in ["deletion", "duplication", "cn_loh"])
                 
                 # Distribute evenly among allowed types
                 per_type_count = max(1, non_normal_total // len(non_normal_types))
@@ -269,21 +276,19 @@ def generate_realistic_positions(chrom, total_snps):
         ~((uniform_positions >= centromere_start) & (uniform_positions <= centromere_end))
     ]
     
-    # Apply some clustering to create more realistic patterns
-    clustered_positions = []
-    for i, pos in enumerate(uniform_positions):
-        # Add some local clustering
-        if np.random.random() < 0.3:  # 30% chance of creating a small cluster
-            cluster_size = np.random.randint(2, 6)
-            cluster_spread = np.random.randint(100, 5000)
-            for j in range(cluster_size):
-                cluster_pos = pos + np.random.randint(-cluster_spread, cluster_spread)
-                # Only add if in valid range and not in centromere
-                if (1 <= cluster_pos <= chrom_length and 
-                    not (centromere_start <= cluster_pos <= centromere_end)):
-                    clustered_positions.append(cluster_pos)
-        else:
-            clustered_positions.append(pos)
+    # Apply some clustering to create more realistic patterns: 30% of positions
+    # are replaced by a cluster of 2-5 SNPs spread +/- 100-5000 bp around them
+    cluster_mask = np.random.random(len(uniform_positions)) < 0.3
+    cluster_sizes = np.random.randint(2, 6, size=cluster_mask.sum())
+    cluster_spreads = np.repeat(np.random.randint(100, 5000, size=cluster_mask.sum()), cluster_sizes)
+    cluster_positions = (np.repeat(uniform_positions[cluster_mask], cluster_sizes)
+                         + np.random.randint(-cluster_spreads, cluster_spreads))
+    # Only keep cluster members in valid range and not in centromere
+    cluster_positions = cluster_positions[
+        (cluster_positions >= 1) & (cluster_positions <= chrom_length)
+        & ~((cluster_positions >= centromere_start) & (cluster_positions <= centromere_end))
+    ]
+    clustered_positions = np.concatenate([uniform_positions[~cluster_mask], cluster_positions])
     
     # Take the requested number of SNPs
     if len(clustered_positions) >= total_snps:
@@ -500,7 +505,11 @@ def generate_continuous_snp_data(chromosomes, segments, genome_sizes, average_sn
 # --------------------------------------------------------
 # Single sample simulation
 # --------------------------------------------------------
-def simulate_single(sample_name, params, outdir=None, prefix='single', use_subdir=True):
+def simulate_single(sample_name, params, outdir=None, prefix='single', use_subdir=True, bed_tag=''):
+    """Simulate one sample and write its CSVs.
+
+    `bed_tag` is inserted into the BED file names (e.g. 'single_' gives
+    `pre_union_bed_single_<name>.csv`, the naming PreSample/PostSample expect)."""
     base_dir = outdir or params['output_dir']
     if use_subdir:
         sample_dir = os.path.join(base_dir, f"{prefix}_{sample_name}")
@@ -518,11 +527,13 @@ def simulate_single(sample_name, params, outdir=None, prefix='single', use_subdi
         params['region_counts'],
         params['segment_size_range'], 
         params['genome_sizes'],
-        params.get('cnv_mapping')
+        params.get('cnv_mapping'),
+        total_events=params.get('events_per_chromosome'),
     )
     
     # Use the new continuous SNP data generator
-    snp_df = generate_continuous_snp_data(chroms, segments, params['genome_sizes'])
+    snp_df = generate_continuous_snp_data(chroms, segments, params['genome_sizes'],
+                                          params.get('snps_per_mb', 200))
 
     # write pre/post SNP files
     baf_lrr = snp_df[['Chromosome','Position','BAF','LRR']]
@@ -565,63 +576,18 @@ def simulate_single(sample_name, params, outdir=None, prefix='single', use_subdi
                                   'CN':cn_mode,'QS':qual,'nSites':nSites,'nHets':nHETs,
                                   'Len':end-start+1,'type':rtype.capitalize(),'sample_name':sample_name})
     pd.DataFrame(summary).to_csv(os.path.join(sample_dir,f"{prefix}_cn_summary_data_{sample_name}.csv"),index=False)
-    pd.DataFrame(cn_bed).to_csv(os.path.join(sample_dir,f"{prefix}_cn_bed_{sample_name}.csv"),index=False)
-    pd.DataFrame(roh_bed).to_csv(os.path.join(sample_dir,f"{prefix}_roh_bed_{sample_name}.csv"),index=False)
-    pd.DataFrame(union_bed).to_csv(os.path.join(sample_dir,f"{prefix}_union_bed_{sample_name}.csv"),index=False)
+    pd.DataFrame(cn_bed).to_csv(os.path.join(sample_dir,f"{prefix}_cn_bed_{bed_tag}{sample_name}.csv"),index=False)
+    pd.DataFrame(roh_bed).to_csv(os.path.join(sample_dir,f"{prefix}_roh_bed_{bed_tag}{sample_name}.csv"),index=False)
+    pd.DataFrame(union_bed).to_csv(os.path.join(sample_dir,f"{prefix}_union_bed_{bed_tag}{sample_name}.csv"),index=False)
     pd.DataFrame(cnv_chrom).to_csv(os.path.join(sample_dir,f"{prefix}_cnv_chromosomes_{sample_name}.csv"),index=False)
     pd.DataFrame(det_filtered).to_csv(os.path.join(sample_dir,f"{prefix}_cnv_detection_filtered_{sample_name}.csv"),index=False)
     return segments, snp_df
 
 # --------------------------------------------------------
-# Paired sample simulation
+# Combined (pre vs post) files
 # --------------------------------------------------------
-def simulate_paired(sample_pre, sample_post, params):
-    pair_id = f"PRE_{sample_pre}_POST_{sample_post}"
-    base = os.path.join(params['output_dir'], pair_id)
-    os.makedirs(base, exist_ok=True)
-
-    # Generate individual pre/post files WITH PAIR ID
-    simulate_single(pair_id, params, outdir=base, prefix='pre', use_subdir=False)
-    simulate_single(pair_id, params, outdir=base, prefix='post', use_subdir=False)
-
-    # Generate combined files
-    chroms = params['chromosomes'] + ['X']
-    if params.get('gender','female')=='male':
-        chroms.append('Y')
-    
-    # Use controlled segment generation with CNV mapping
-    segments = generate_controlled_segments(
-        chroms, 
-        params['region_counts'],
-        params['segment_size_range'], 
-        params['genome_sizes'],
-        params.get('cnv_mapping')
-    )
-    
-    # Create pre/post DataFrames using continuous generator
-    pre_df = generate_continuous_snp_data(chroms, segments, params['genome_sizes'])
-    post_df = generate_continuous_snp_data(chroms, segments, params['genome_sizes'])
-    
-    # Save pre/post dataframes with pair ID
-    pre_df[['Chromosome','Position','BAF','LRR']].to_csv(
-        os.path.join(base, f"pre_baf_lrr_data_{pair_id}.csv"), index=False)
-    post_df[['Chromosome','Position','BAF','LRR']].to_csv(
-        os.path.join(base, f"post_baf_lrr_data_{pair_id}.csv"), index=False)
-    
-    # Handle probability columns - now there's a P(CN4) column too
-    if 'P(CN4)' in pre_df.columns:
-        pre_df[['Chromosome','Position','CN','P(CN0)','P(CN1)','P(CN2)','P(CN3)','P(CN4)']].to_csv(
-            os.path.join(base, f"pre_cn_probabilities_data_{pair_id}.csv"), index=False)
-        post_df[['Chromosome','Position','CN','P(CN0)','P(CN1)','P(CN2)','P(CN3)','P(CN4)']].to_csv(
-            os.path.join(base, f"post_cn_probabilities_data_{pair_id}.csv"), index=False)
-    else:
-        # For backward compatibility
-        pre_df[['Chromosome','Position','CN','P(CN0)','P(CN1)','P(CN2)','P(CN3)']].to_csv(
-            os.path.join(base, f"pre_cn_probabilities_data_{pair_id}.csv"), index=False)
-        post_df[['Chromosome','Position','CN','P(CN0)','P(CN1)','P(CN2)','P(CN3)']].to_csv(
-            os.path.join(base, f"post_cn_probabilities_data_{pair_id}.csv"), index=False)
-
-    # Build combined files with pair ID
+def write_combined_files(base, pair_id, sample_pre, sample_post, segments, pre_df, post_df):
+    """Write the combined_* CSVs of a pair, calling CN states of `segments` in pre_df and post_df."""
     combined_cn_bed, combined_cnv_chrom, combined_det = [], [], []
     combined_roh, combined_union = [], []
     
@@ -695,6 +661,60 @@ def simulate_paired(sample_pre, sample_post, params):
     pd.DataFrame(combined_union).to_csv(
         os.path.join(base, f"combined_union_bed_{pair_id}.csv"), index=False)
 
+# --------------------------------------------------------
+# Paired sample simulation
+# --------------------------------------------------------
+def simulate_paired(sample_pre, sample_post, params):
+    pair_id = f"PRE_{sample_pre}_POST_{sample_post}"
+    base = os.path.join(params['output_dir'], pair_id)
+    os.makedirs(base, exist_ok=True)
+
+    # Generate individual pre/post files WITH PAIR ID
+    simulate_single(pair_id, params, outdir=base, prefix='pre', use_subdir=False)
+    simulate_single(pair_id, params, outdir=base, prefix='post', use_subdir=False)
+
+    # Generate combined files
+    chroms = params['chromosomes'] + ['X']
+    if params.get('gender','female')=='male':
+        chroms.append('Y')
+    
+    # Use controlled segment generation with CNV mapping
+    segments = generate_controlled_segments(
+        chroms, 
+        params['region_counts'],
+        params['segment_size_range'], 
+        params['genome_sizes'],
+        params.get('cnv_mapping'),
+        total_events=params.get('events_per_chromosome'),
+    )
+    
+    # Create pre/post DataFrames using continuous generator
+    pre_df = generate_continuous_snp_data(chroms, segments, params['genome_sizes'],
+                                          params.get('snps_per_mb', 200))
+    post_df = generate_continuous_snp_data(chroms, segments, params['genome_sizes'],
+                                           params.get('snps_per_mb', 200))
+    
+    # Save pre/post dataframes with pair ID
+    pre_df[['Chromosome','Position','BAF','LRR']].to_csv(
+        os.path.join(base, f"pre_baf_lrr_data_{pair_id}.csv"), index=False)
+    post_df[['Chromosome','Position','BAF','LRR']].to_csv(
+        os.path.join(base, f"post_baf_lrr_data_{pair_id}.csv"), index=False)
+    
+    # Handle probability columns - now there's a P(CN4) column too
+    if 'P(CN4)' in pre_df.columns:
+        pre_df[['Chromosome','Position','CN','P(CN0)','P(CN1)','P(CN2)','P(CN3)','P(CN4)']].to_csv(
+            os.path.join(base, f"pre_cn_probabilities_data_{pair_id}.csv"), index=False)
+        post_df[['Chromosome','Position','CN','P(CN0)','P(CN1)','P(CN2)','P(CN3)','P(CN4)']].to_csv(
+            os.path.join(base, f"post_cn_probabilities_data_{pair_id}.csv"), index=False)
+    else:
+        # For backward compatibility
+        pre_df[['Chromosome','Position','CN','P(CN0)','P(CN1)','P(CN2)','P(CN3)']].to_csv(
+            os.path.join(base, f"pre_cn_probabilities_data_{pair_id}.csv"), index=False)
+        post_df[['Chromosome','Position','CN','P(CN0)','P(CN1)','P(CN2)','P(CN3)']].to_csv(
+            os.path.join(base, f"post_cn_probabilities_data_{pair_id}.csv"), index=False)
+
+    write_combined_files(base, pair_id, sample_pre, sample_post, segments, pre_df, post_df)
+
     # Update log file naming
     log_file = os.path.join(base, f'{pair_id}_preprocess_log.txt')
     with open(log_file,'w') as lg:
@@ -703,19 +723,179 @@ def simulate_paired(sample_pre, sample_post, params):
         lg.write(json.dumps(params, indent=2))
     logging.info(f"Paired data generated in {base}")
 
+# --------------------------------------------------------
+# Cohort simulation (load testing)
+# --------------------------------------------------------
+def random_cnv_mapping(chromosomes, event_rate):
+    """Draw a per-sample CNV mapping: each chromosome carries one random event type with probability `event_rate`."""
+    mapping = {}
+    for chrom in chromosomes:
+        if np.random.random() < event_rate:
+            mapping[chrom] = [str(np.random.choice(["deletion", "duplication", "cn_loh"]))]
+        else:
+            mapping[chrom] = ["normal"]
+    return mapping
+
+
+def _cohort_sample_params(params, gender):
+    """Copy of the cohort parameters with this sample's gender and a freshly drawn CNV mapping."""
+    sample_params = dict(params)
+    sample_params['gender'] = gender
+    chroms = params['chromosomes'] + ['X'] + (['Y'] if gender == 'male' else [])
+    sample_params['cnv_mapping'] = random_cnv_mapping(chroms, params.get('event_rate', 0.5))
+    return sample_params
+
+
+def _qc_metrics(snp_df):
+    """Plausible call rates plus the LRR standard deviation of the simulated data."""
+    call_rate = round(np.random.uniform(0.975, 0.999), 4)
+    return {
+        'call_rate': call_rate,
+        'call_rate_filt': round(min(0.9999, call_rate + np.random.uniform(0.0, 0.005)), 4),
+        'LRR_stdev': round(float(snp_df['LRR'].std()), 4),
+    }
+
+
+def _simulate_cohort_single(task):
+    """Worker: one single sample written to samples/<name>/single_*_<name>.csv."""
+    name, gender, seed, params = task
+    np.random.seed(seed)
+    sample_params = _cohort_sample_params(params, gender)
+    sample_dir = os.path.join(params['output_dir'], 'samples', name)
+    _, snp_df = simulate_single(name, sample_params, outdir=sample_dir, prefix='single', use_subdir=False)
+    return {'sample_id': name, 'type': 'single', 'pre_sample': name,
+            'pre_sex': 'M' if gender == 'male' else 'F', **_qc_metrics(snp_df)}
+
+
+def _simulate_cohort_pair(task):
+    """Worker: one PRE/POST pair written to samples/PRE_<pre>_POST_<post>/.
+
+    The PRE part is seeded from the PRE sample alone, so a PRE shared by several
+    pairs gets identical pre_* files in every pair directory."""
+    sample_pre, sample_post, gender, pre_seed, pair_seed, params = task
+    pair_id = f"PRE_{sample_pre}_POST_{sample_post}"
+    base = os.path.join(params['output_dir'], 'samples', pair_id)
+    os.makedirs(base, exist_ok=True)
+
+    np.random.seed(pre_seed)
+    _, pre_df = simulate_single(pair_id, _cohort_sample_params(params, gender),
+                                outdir=base, prefix='pre', use_subdir=False, bed_tag='single_')
+    pre_qc = _qc_metrics(pre_df)
+
+    np.random.seed(pair_seed)
+    post_segments, post_df = simulate_single(pair_id, _cohort_sample_params(params, gender),
+                                             outdir=base, prefix='post', use_subdir=False, bed_tag='single_')
+    post_qc = _qc_metrics(post_df)
+    write_combined_files(base, pair_id, sample_pre, sample_post, post_segments, pre_df, post_df)
+
+    sex = 'M' if gender == 'male' else 'F'
+    return {
+        'pre': {'sample_id': sample_pre, 'type': 'pre', 'pre_sample': sample_pre, 'pre_sex': sex, **pre_qc},
+        'post': {'sample_id': sample_post, 'type': 'post', 'pre_sample': sample_post, 'pre_sex': sex, **post_qc},
+        'pair': {'sample_id': sample_pre, 'type': 'paired', 'pre_sample': sample_pre, 'pre_sex': sex,
+                 'post_sample': sample_post, 'post_sex': sex,
+                 'PI_HAT': round(np.random.uniform(0.95, 1.0), 4)},
+    }
+
+
+def simulate_cohort(params, n_single, n_pairs, posts_per_pre=1, female_fraction=0.5, seed=42, workers=None):
+    """Simulate a cohort in the layout consumed by main_dynamic_plotting_single/paired.py.
+
+    Writes into params['output_dir']:
+        samples/<name>/                   single samples (--samples_dir of both drivers)
+        samples/PRE_<pre>_POST_<post>/    pairs; the first PRE gets `posts_per_pre` POSTs
+        sample_types.csv                  --sample_types of the single driver
+        sample_types_single.csv           --sample_types_single of the paired driver
+        sample_types_paired.csv           --sample_types_paired of the paired driver
+        parameters.json                   --parameters of both drivers
+
+    Every sample is seeded from `seed` via SeedSequence, so the output does not
+    depend on the number of workers or on scheduling order."""
+    out = params['output_dir']
+    os.makedirs(os.path.join(out, 'samples'), exist_ok=True)
+
+    # Pair layout: PRE_001 with `posts_per_pre` POSTs, then one POST per further PRE
+    posts_per_pre = max(1, min(posts_per_pre, n_pairs)) if n_pairs else 0
+    pair_plan = [(1, k) for k in range(1, posts_per_pre + 1)]
+    pair_plan += [(i, 1) for i in range(2, n_pairs - posts_per_pre + 2)]
+    n_pres = pair_plan[-1][0] if pair_plan else 0
+
+    seeds = np.random.SeedSequence(seed).spawn(n_single + n_pres + len(pair_plan) + 1)
+    as_int = [int(sq.generate_state(1)[0]) for sq in seeds]
+    rng = np.random.default_rng(as_int[-1])
+    genders = ['female' if rng.random() < female_fraction else 'male' for _ in range(n_single + n_pres)]
+
+    single_tasks = [(f"Sample_{i:04d}", genders[i - 1], as_int[i - 1], params)
+                    for i in range(1, n_single + 1)]
+    pair_tasks = [(f"Pre_{pre:03d}", f"Post_{pre:03d}_{post:02d}", genders[n_single + pre - 1],
+                   as_int[n_single + pre - 1], as_int[n_single + n_pres + j], params)
+                  for j, (pre, post) in enumerate(pair_plan)]
+
+    logging.info(f"Simulating cohort: {n_single} single samples, {len(pair_tasks)} pairs "
+                 f"({n_pres} PRE samples) with {workers or os.cpu_count()} workers")
+    if workers == 1:
+        single_rows = [_simulate_cohort_single(t) for t in single_tasks]
+        pair_rows = [_simulate_cohort_pair(t) for t in pair_tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            single_futures = pool.map(_simulate_cohort_single, single_tasks)
+            pair_futures = pool.map(_simulate_cohort_pair, pair_tasks)
+            single_rows, pair_rows = list(single_futures), list(pair_futures)
+
+    qc_columns = ['sample_id', 'type', 'pre_sample', 'pre_sex', 'call_rate', 'call_rate_filt', 'LRR_stdev']
+    pd.DataFrame(single_rows, columns=qc_columns).to_csv(os.path.join(out, 'sample_types.csv'), index=False)
+
+    paired_members = {}
+    for row in pair_rows:
+        paired_members.setdefault(row['pre']['sample_id'], row['pre'])
+        paired_members.setdefault(row['post']['sample_id'], row['post'])
+    pd.DataFrame(list(paired_members.values()), columns=qc_columns).to_csv(
+        os.path.join(out, 'sample_types_single.csv'), index=False)
+    pd.DataFrame([row['pair'] for row in pair_rows],
+                 columns=['sample_id', 'type', 'pre_sample', 'pre_sex', 'post_sample', 'post_sex', 'PI_HAT']
+                 ).to_csv(os.path.join(out, 'sample_types_paired.csv'), index=False)
+
+    with open(os.path.join(out, 'parameters.json'), 'w') as pf:
+        json.dump({
+            'reference_genome': {'detected': 'GRCh38'},
+            'project_info': {'project_ID': 'SIMULATED_COHORT', 'responsible_person': 'simulate_dataset.py'},
+            'simulation': {'seed': seed, 'n_single': n_single, 'n_pairs': len(pair_tasks),
+                           'posts_per_pre': posts_per_pre, 'female_fraction': female_fraction,
+                           'snps_per_mb': params.get('snps_per_mb', 200),
+                           'event_rate': params.get('event_rate', 0.5)},
+        }, pf, indent=2)
+    logging.info(f"Cohort data generated in {out}")
+
 # --------------------------------------------------------
 # Main entrypoint
 # --------------------------------------------------------
 if __name__ == '__main__':
     parser = argparse.ArgumentParser(description='Simulate CNV data')
-    parser.add_argument('--mode', choices=['single','paired'], default='single',
-                        help='Mode: single sample or paired samples')
+    parser.add_argument('--mode', choices=['single','paired','cohort'], default='single',
+                        help='Mode: single sample, paired samples or a whole cohort')
     parser.add_argument('--sample1', dest='sample1',
                         help='Name for single sample (or PRE sample if paired)')
     parser.add_argument('--sample2', dest='sample2',
                         help='Name for POST sample in paired mode')
     parser.add_argument('--params', help='JSON file of parameters')
     parser.add_argument('--outdir', help='Output directory')
+    parser.add_argument('--n_single', type=int, default=10,
+                        help='Cohort mode: number of single samples')
+    parser.add_argument('--n_pairs', type=int, default=5,
+                        help='Cohort mode: number of PRE/POST pairs')
+    parser.add_argument('--posts_per_pre', type=int, default=3,
+                        help='Cohort mode: number of POST samples sharing the first PRE sample')
+    parser.add_argument('--snps_per_mb', type=int,
+                        help='Marker density (default 200 SNPs per Mb)')
+    parser.add_argument('--events', type=int,
+                        help='Number of events on each chromosome that carries events')
+    parser.add_argument('--event_rate', type=float, default=0.5,
+                        help='Cohort mode: probability that a chromosome carries an event')
+    parser.add_argument('--female_fraction', type=float, default=0.5,
+                        help='Cohort mode: fraction of female samples (the rest get a Y chromosome)')
+    parser.add_argument('--seed', type=int, default=42, help='Random seed')
+    parser.add_argument('--workers', type=int,
+                        help='Cohort mode: worker processes (default: all CPUs, 1 runs in-process)')
     args = parser.parse_args()
 
     # Default simulation parameters
@@ -729,6 +909,7 @@ if __name__ == '__main__':
         'region_counts': {'normal': 3, 'deletion': 1, 'duplication': 1, 'cn_loh': 1},  # Added cn_loh back
         'segment_size_range': (500_000, 5_000_000),
         'snps_per_segment': 200,
+        'snps_per_mb': 200,
         'cnv_mapping': DEFAULT_CNV_MAPPING,  # Using the simplified mapping
     }
 
@@ -739,16 +920,26 @@ if __name__ == '__main__':
     # Override output directory
     if args.outdir:
         default_params['output_dir'] = args.outdir
+    if args.snps_per_mb:
+        default_params['snps_per_mb'] = args.snps_per_mb
+    if args.events:
+        default_params['events_per_chromosome'] = args.events
+    default_params['event_rate'] = args.event_rate
 
     # Set fixed random seed for reproducibility
-    np.random.seed(42)
+    np.random.seed(args.seed)
 
     # Dispatch modes
     if args.mode == 'single':
         if not args.sample1:
             parser.error('Sample name required in single mode. Use --sample1.')
         simulate_single(args.sample1, default_params)
-    else:
+    elif args.mode == 'paired':
         if not args.sample1 or not args.sample2:
             parser.error('Both --sample1 and --sample2 required in paired mode.')
         simulate_paired(args.sample1, args.sample2, default_params)
+    else:
+        simulate_cohort(default_params, args.n_single, args.n_pairs,
+                        posts_per_pre=args.posts_per_pre,
+                        female_fraction=args.female_fraction,
+                        seed=args.seed, workers=args.workers)
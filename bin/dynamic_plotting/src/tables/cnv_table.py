@@ -0,0 +1,115 @@
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+
+from src.tables.json_table import column, json_table_html
+
+
+NO_CNV_CALLS = """<div class="info-box_empty">
+                <i class="fas fa-info-circle"></i>
+                No CNV calls found
+            </div>"""
+
+SIGNIFICANCE_KEYS = ('significant', 'nonsignificant')
+
+
+def text_cell(value) -> str:
+    return 'N/A' if value is None else str(value)
+
+
+def thousands_cell(value) -> str:
+    return f"{value:,}"
+
+
+def quality_cell(value) -> str:
+    if value is None:
+        return '0.0'
+    return f"{value:.1f}" if isinstance(value, (int, float)) else str(value)
+
+
+def p_value_cell(p) -> str:
+    if p != p:  # NaN / missing
+        return 'N/A'
+    return f"{p:.2e}" if p < 0.0001 else f"{p:.4f}"
+
+
+@dataclass
+class CNVTable:
+    """One detailed CNV table: header labels and typed values stored column-major.
+
+    `columns[i]` holds the raw values of `headers[i]` (None where the input had no
+    such column) and `formats[i]` turns one value into cell text. The P value column
+    is kept separately because it also drives the cell colour."""
+    table_class: str
+    headers: List[str]
+    columns: List[list]
+    formats: List[Callable[[Any], str]]
+    p_values: np.ndarray = field(default_factory=lambda: np.empty(0))
+
+    def __len__(self) -> int:
+        return len(self.p_values)
+
+    @property
+    def rows(self) -> List[tuple]:
+        """Typed rows, P value last"""
+        return list(zip(*self.columns, self.p_values.tolist()))
+
+    def to_json_html(self) -> str:
+        """The table as an embedded JSON payload for the virtual-scrolling renderer"""
+        if not len(self):
+            return NO_CNV_CALLS
+        columns = [_JSON_COLUMNS[fmt](label) for label, fmt in zip(self.headers, self.formats)]
+        columns.append(column('P Value', 'pvalue'))
+        return json_table_html(f"detailed-cnv-table {self.table_class}", columns, self.rows, sort=1)
+
+    def to_html(self) -> str:
+        if not len(self):
+            return NO_CNV_CALLS
+
+        cells = [[fmt(v) for v in values] for values, fmt in zip(self.columns, self.formats)]
+        p_colors = np.where((self.p_values != 0) & (self.p_values < 0.05), "#2ecc71", "#e74c3c")
+        cells += [p_colors.tolist(), [p_value_cell(p) for p in self.p_values.tolist()]]
+
+        header_cells = "".join(f"<th>{h}</th>" for h in self.headers + ['P Value'])
+        row_template = "<tr>" + "<td>{}</td>" * len(self.columns) + '<td style="color: {}">{}</td></tr>'
+        rows = "\n".join(row_template.format(*row) for row in zip(*cells))
+        return f"""
+        <table class="detailed-cnv-table {self.table_class}">
+            <thead>
+                <tr>{header_cells}</tr>
+            </thead>
+            <tbody>
+{rows}
+            </tbody>
+        </table>"""
+
+
+# JSON column spec for each cell formatter
+_JSON_COLUMNS = {
+    text_cell: lambda label: column(label),
+    thousands_cell: lambda label: column(label, 'int'),
+    quality_cell: lambda label: column(label, 'fixed', digits=1, missing='0.0'),
+}
+
+
+@dataclass
+class DetailedCNVTables:
+    """Detailed CNV tables split by significance; `error` is set when they could not be built.
+
+    With `json_tables` the tables render as JSON payloads for components/js/virtual_table.js."""
+    significant: Optional[CNVTable] = None
+    nonsignificant: Optional[CNVTable] = None
+    error: Optional[str] = None
+    json_tables: bool = False
+
+    def render(self) -> Dict[str, str]:
+        """HTML per significance key, as embedded in the summary and chromosome pages"""
+        if self.error is not None:
+            return {
+                'significant': f"<div class='info-box_empty'>Error generating significant CNV details: {self.error}</div>",
+                'nonsignificant': f"<div class='info-box_empty'>Error generating non-significant CNV details: {self.error}</div>"
+            }
+        render = CNVTable.to_json_html if self.json_tables else CNVTable.to_html
+        return {key: render(table) if table is not None else NO_CNV_CALLS
+                for key, table in zip(SIGNIFICANCE_KEYS, (self.significant, self.nonsignificant))}
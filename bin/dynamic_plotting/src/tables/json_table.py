@@ -0,0 +1,44 @@
+import json
+import math
+from typing import Any, Dict, Iterable, List, Optional
+
+
+def column(label: str, format: str = 'text', **options) -> Dict[str, Any]:
+    """Column spec for components/js/virtual_table.js.
+
+    format: 'text', 'int' (thousands separators), 'fixed' (needs `digits`),
+            'pvalue' (coloured by significance) or 'link' (value is [text, href]).
+    options: `digits`, `missing` (text for null values) and
+             `rule` = {'op': '>' | '>=', 'value': x, 'then': css_class, 'else': css_class}."""
+    return {'label': label, 'format': format, **options}
+
+
+def _json_value(value):
+    if isinstance(value, float) and math.isnan(value):
+        return None
+    return value
+
+
+def _json_default(value):
+    # numpy scalars and anything else json cannot encode natively
+    if hasattr(value, 'item'):
+        return _json_value(value.item())
+    return str(value)
+
+
+def json_table_html(table_class: str, columns: List[Dict[str, Any]], rows: Iterable[Iterable],
+                    sort: Optional[int] = None) -> str:
+    """Embed table data as compact JSON, rendered client-side by a virtual-scrolling table"""
+    payload = json.dumps(
+        {'tableClass': table_class, 'sort': sort, 'columns': columns,
+         'rows': [[_json_value(v) for v in row] for row in rows]},
+        separators=(',', ':'), allow_nan=False, default=_json_default,
+    )
+    # keep "</script>" inside string values from closing the payload element
+    payload = payload.replace('</', '<\\/')
+    return f'<div class="vtable"><script type="application/json" class="vtable-data">{payload}</script></div>'
+
+
+def virtual_table_script(prefix: str = '') -> str:
+    """<script> tag loading the virtual table renderer from components/js, relative via `prefix`"""
+    return f'<script src="{prefix}components/js/virtual_table.js" defer></script>'
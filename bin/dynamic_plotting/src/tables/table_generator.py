@@ -1,15 +1,76 @@
 import logging
 from typing import List, Dict, Any
+import numpy as np
 import pandas as pd
 import os
 
+from src.tables.cnv_table import (CNVTable, DetailedCNVTables, quality_cell, text_cell,
+                                  thousands_cell)
+from src.tables.json_table import column, json_table_html, virtual_table_script
+
+
+def _first_column(df, candidates):
+    """First column of `df` among `candidates` (a list of names or a predicate), or None"""
+    if callable(candidates):
+        return next((col for col in df.columns if candidates(col)), None)
+    return next((col for col in candidates if col in df.columns), None)
+
+
+def _column_values(df, col):
+    """Raw values of a column as Python objects, or Nones if the column is missing"""
+    if col is None or col not in df.columns:
+        return [None] * len(df)
+    return df[col].tolist()
+
+
+def _single_types(cn):
+    """Deletion / Duplication / Normal per copy number, relative to CN 2"""
+    cn = pd.to_numeric(cn, errors='coerce').to_numpy(dtype=float)
+    return np.select([cn < 2, cn > 2], ['Deletion', 'Duplication'], default='Normal')
+
+
 class TableGenerator:
     """Class to handle generation of HTML tables for the application"""
     
+    def __init__(self, json_tables: bool = False):
+        """With json_tables, sample/pair and detailed CNV tables are embedded as JSON
+        and drawn client-side by components/js/virtual_table.js"""
+        self.json_tables = json_tables
+    
+    def virtual_table_script(self, prefix: str = '') -> str:
+        """<script> tag for the virtual table renderer, or nothing when tables are plain HTML"""
+        return virtual_table_script(prefix) if self.json_tables else ''
+    
     @staticmethod
-    def generate_sample_table(samples: List[Dict[str, Any]], output_manager) -> str:
+    def _summary_link(output_manager, page_dir: str, name: str) -> str:
+        """Path of a summary page relative to the report root"""
+        return os.path.relpath(
+            os.path.join(page_dir, f"summary_page_{name}.html"),
+            start=output_manager.dir_structure.base_dir
+        )
+    
+    def generate_sample_table(self, samples: List[Dict[str, Any]], output_manager) -> str:
         """Generate HTML table for sample listing"""
         try:
+            if self.json_tables:
+                return json_table_html("cnv-table", [
+                    column('Sample Name', 'link'),
+                    column('Sample Type'),
+                    column('Sex'),
+                    column('Call Rate', 'fixed', digits=4),
+                    column('Filtered Call Rate', 'fixed', digits=4),
+                    column('LRR Standard Deviation', 'fixed', digits=4,
+                           rule={'op': '>', 'value': 0.3, 'then': 'stat-value red', 'else': 'stat-value green'}),
+                    column('Total CNVs'),
+                    column('Significant CNVs (p<0.05)'),
+                ], [[
+                    [sample['pre_sample'], self._summary_link(
+                        output_manager, output_manager.dir_structure.sample_dirs[sample['pre_sample']],
+                        sample['pre_sample'])],
+                    sample['sample_type'], sample['pre_sex'], sample['call_rate'], sample['call_rate_filt'],
+                    sample['LRR_stdev'], sample.get('total_cnvs', 0), sample.get('significant_cnvs', 0),
+                ] for sample in samples], sort=0)
+            
             # Get base directory from the structure
             base_dir = output_manager.dir_structure.base_dir
             
@@ -161,10 +222,26 @@ class TableGenerator:
             logging.error(f"Error generating CNV table: {str(e)}")
             raise
     
-    @staticmethod
-    def generate_individual_qc_table(samples: List[Dict[str, Any]]) -> str:
+    def generate_individual_qc_table(self, samples: List[Dict[str, Any]]) -> str:
         """Generate HTML table for individual sample QC data"""
         try:
+            if self.json_tables:
+                return json_table_html("qc-table", [
+                    column('Sample Name'),
+                    column('Type'),
+                    column('Sex'),
+                    column('Call Rate', 'fixed', digits=4),
+                    column('Call Rate Filtered', 'fixed', digits=4),
+                    column('LRR Stdev', 'fixed', digits=4,
+                           rule={'op': '>', 'value': 0.3, 'then': 'stat-value red', 'else': 'stat-value green'}),
+                    column('Total CNVs'),
+                    column('Significant CNVs'),
+                ], [[
+                    sample['Sample Name'], sample['Type'], sample['Sex'], sample['Call Rate'],
+                    sample['Call Rate Filtered'], sample['LRR Stdev'], sample.get('total_cnvs', 0),
+                    sample.get('significant_cnvs', 0),
+                ] for sample in samples], sort=0)
+            
             table_html = """
             <table class="qc-table">
                 <thead>
@@ -211,10 +288,28 @@ class TableGenerator:
             logging.error(f"Error generating QC table: {str(e)}")
             raise
     
-    @staticmethod
-    def generate_paired_analysis_table(pairs: List[Dict[str, Any]], output_manager) -> str:
+    def generate_paired_analysis_table(self, pairs: List[Dict[str, Any]], output_manager) -> str:
         """Generate HTML table for grouped paired analysis data"""
         try:
+            if self.json_tables:
+                # One row per pair; the PRE sample is repeated instead of spanning rows
+                return json_table_html("paired-table", [
+                    column('Pre Sample'),
+                    column('Post Sample', 'link'),
+                    column('Pre Sex'),
+                    column('Post Sex'),
+                    column('PI_HAT', 'fixed', digits=4,
+                           rule={'op': '>=', 'value': 0.9, 'then': 'stat-value green', 'else': 'stat-value red'}),
+                    column('Total CNVs'),
+                    column('Significant CNVs (p<0.05)'),
+                ], [[
+                    group['Pre Sample'],
+                    [post['Post Sample'], self._summary_link(
+                        output_manager, output_manager.dir_structure.pair_dirs[post['Pair ID']], post['Pair ID'])],
+                    group['Pre Sex'], post['Post Sex'], post['PI_HAT'], post['Total CNVs'],
+                    post.get('Significant CNVs', 0),
+                ] for group in pairs for post in group['Posts']], sort=0)
+            
             # Get base directory from the structure
             base_dir = output_manager.dir_structure.base_dir
             
@@ -627,20 +722,15 @@ class TableGenerator:
             return f"<div class='info-box_empty'><i class='fas fa-info-circle'></i>Error generating {sample_type} CNV stats</div>"
 
     def generate_detailed_cnv_table(self, cnv_df):
-        """Generate detailed CNV table compatible with both single and paired data"""
+        """Generate detailed CNV table HTML compatible with both single and paired data"""
+        return self.detailed_cnv_tables(cnv_df).render()
+
+    def detailed_cnv_tables(self, cnv_df) -> DetailedCNVTables:
+        """Build the significant / non-significant CNV tables for single or paired data"""
         try:
             if cnv_df is None or cnv_df.empty:
-                return {
-                    'significant': """<div class="info-box_empty">
-                        <i class="fas fa-info-circle"></i>
-                        No CNV calls found
-                    </div>""",
-                    'nonsignificant': """<div class="info-box_empty">
-                        <i class="fas fa-info-circle"></i>
-                        No CNV calls found
-                    </div>"""
-                }
-                
+                return DetailedCNVTables(json_tables=self.json_tables)
+
             df = cnv_df.copy()
             
             # Detect paired data by checking for common paired column patterns
@@ -669,7 +759,7 @@ class TableGenerator:
                             break
                     
                     if cn_pre_col and cn_post_col:
-                        df['Type'] = df.apply(lambda x: self._get_pair_type(x[cn_pre_col], x[cn_post_col]), axis=1)
+                        df['Type'] = self._pair_types(df[cn_pre_col], df[cn_post_col])
                     else:
                         df['Type'] = 'Unknown'
                 else:
@@ -681,9 +771,7 @@ class TableGenerator:
                             break
                     
                     if cn_col:
-                        df['Type'] = df[cn_col].apply(
-                            lambda x: 'Deletion' if x < 2 else 'Duplication' if x > 2 else 'Normal'
-                        )
+                        df['Type'] = _single_types(df[cn_col])
                     else:
                         df['Type'] = 'Unknown'
 
@@ -697,9 +785,7 @@ class TableGenerator:
                         break
                         
                 if qs_column:
-                    df['P_value'] = df[qs_column].apply(
-                        lambda q: 10 ** (-q/10) if pd.notnull(q) else None
-                    )
+                    df['P_value'] = 10 ** (-df[qs_column].astype(float) / 10)
                 else:
                     df['P_value'] = None
 
@@ -715,211 +801,49 @@ class TableGenerator:
                     break
             qs_column = qs_column or 'QS'  # Default if none found
             
-            # Generate separate tables
-            significant_table = self._generate_cnv_subtable(significant_df, is_paired, qs_column, "significant-cnvs")
-            nonsignificant_table = self._generate_cnv_subtable(nonsignificant_df, is_paired, qs_column, "nonsignificant-cnvs")
-            
-            # Return both tables
-            return {
-                'significant': significant_table,
-                'nonsignificant': nonsignificant_table
-            }
+            return DetailedCNVTables(
+                json_tables=self.json_tables,
+                significant=self._generate_cnv_subtable(significant_df, is_paired, qs_column, "significant-cnvs"),
+                nonsignificant=self._generate_cnv_subtable(nonsignificant_df, is_paired, qs_column, "nonsignificant-cnvs")
+            )
             
         except Exception as e:
             logging.error(f"Error generating detailed CNV table: {str(e)}")
-            return {
-                'significant': f"<div class='info-box_empty'>Error generating significant CNV details: {str(e)}</div>",
-                'nonsignificant': f"<div class='info-box_empty'>Error generating non-significant CNV details: {str(e)}</div>"
-            }
+            return DetailedCNVTables(error=str(e))
             
-    def _generate_cnv_subtable(self, df, is_paired, qs_column, table_class):
-        """Helper method to generate a CNV subtable"""
-        if df.empty:
-            return """<div class="info-box_empty">
-                <i class="fas fa-info-circle"></i>
-                No matching CNV calls found
-            </div>"""
-        
-        # Create HTML table headers
-        table_header = f"""
-        <table class="detailed-cnv-table {table_class}">
-            <thead>
-                <tr>"""
-        
-        # Add appropriate columns based on data type
+    def _generate_cnv_subtable(self, df, is_paired, qs_column, table_class) -> CNVTable:
+        """Helper method to build a CNV subtable"""
+        # Resolve the variant column names once for the whole table
         if is_paired:
-            table_header += """
-                    <th>Chr</th>
-                    <th>Start</th>
-                    <th>End</th>
-                    <th>CN Pre</th>
-                    <th>CN Post</th>
-                    <th>Pre Sites</th>
-                    <th>Pre Hets</th>
-                    <th>Post Sites</th>
-                    <th>Post Hets</th>"""
+            headers = ['Chr', 'Start', 'End', 'CN Pre', 'CN Post', 'Pre Sites', 'Pre Hets', 'Post Sites', 'Post Hets']
+            value_columns = [
+                _first_column(df, ['CN_pre', 'PreCN']),
+                _first_column(df, ['CN_post', 'PostCN']),
+                _first_column(df, ['PreSites', 'Pre_nSites', 'Pre_Sites']),
+                _first_column(df, ['PreHets', 'Pre_nHets', 'Pre_Hets']),
+                _first_column(df, ['PostSites', 'Post_nSites', 'Post_Sites']),
+                _first_column(df, ['PostHets', 'Post_nHets', 'Post_Hets']),
+            ]
         else:
-            table_header += """
-                    <th>Chr</th>
-                    <th>Start</th>
-                    <th>End</th>
-                    <th>CN</th>
-                    <th>Sites</th>
-                    <th>Hets</th>"""
-
-        table_header += """
-                    <th>Length</th>
-                    <th>Type</th>
-                    <th>QC</th>
-                    <th>P Value</th>
-                </tr>
-            </thead>
-            <tbody>
-        """
-
-        table_html = table_header
-
-        for _, row in df.iterrows():
-            p_value = row['P_value']
-            p_color = "#2ecc71" if p_value and p_value < 0.05 else "#e74c3c"
-            
-            # Format P-value display
-            if p_value is not None:
-                p_display = f"{p_value:.2e}" if p_value < 0.0001 else f"{p_value:.4f}"
-            else:
-                p_display = 'N/A'
-                
-            # Format numbers for better display
-            start_formatted = f"{row['Start']:,}"
-            end_formatted = f"{row['End']:,}"
-            length_formatted = f"{row['Length']:,}"
-
-            # Build table row based on data type
-            table_html += "<tr>"
-            if is_paired:
-                # Handle variant column names in paired data
-                cn_pre_value = row.get('CN_pre', row.get('PreCN', 'N/A'))
-                cn_post_value = row.get('CN_post', row.get('PostCN', 'N/A'))
-                
-                # Sites columns
-                pre_sites_value = None
-                for col in ['PreSites', 'Pre_nSites', 'Pre_Sites']:
-                    if col in row:
-                        pre_sites_value = row[col]
-                        break
-                if pre_sites_value is None:
-                    pre_sites_value = 'N/A'
-                
-                post_sites_value = None
-                for col in ['PostSites', 'Post_nSites', 'Post_Sites']:
-                    if col in row:
-                        post_sites_value = row[col]
-                        break
-                if post_sites_value is None:
-                    post_sites_value = 'N/A'
-                
-                # Hets columns
-                pre_hets_value = None
-                for col in ['PreHets', 'Pre_nHets', 'Pre_Hets']:
-                    if col in row:
-                        pre_hets_value = row[col]
-                        break
-                if pre_hets_value is None:
-                    pre_hets_value = 'N/A'
-                
-                post_hets_value = None
-                for col in ['PostHets', 'Post_nHets', 'Post_Hets']:
-                    if col in row:
-                        post_hets_value = row[col]
-                        break
-                if post_hets_value is None:
-                    post_hets_value = 'N/A'
-                
-                table_html += f"""
-                    <td>{row['Chromosome']}</td>
-                    <td>{start_formatted}</td>
-                    <td>{end_formatted}</td>
-                    <td>{cn_pre_value}</td>
-                    <td>{cn_post_value}</td>
-                    <td>{pre_sites_value}</td>
-                    <td>{pre_hets_value}</td>
-                    <td>{post_sites_value}</td>
-                    <td>{post_hets_value}</td>"""
-            else:
-                # Handle variant column names in single sample data
-                cn_value = None
-                for col in row.index:
-                    if col.lower() in ('cn', 'copynumber'):
-                        cn_value = row[col]
-                        break
-                if cn_value is None:
-                    cn_value = 'N/A'
-                
-                # Sites column
-                sites_value = None
-                for col in row.index:
-                    if 'sites' in col.lower():
-                        sites_value = row[col]
-                        break
-                if sites_value is None:
-                    sites_value = 'N/A'
-                
-                # Hets column
-                hets_value = None
-                for col in row.index:
-                    if 'hets' in col.lower():
-                        hets_value = row[col]
-                        break
-                if hets_value is None:
-                    hets_value = 'N/A'
-                
-                table_html += f"""
-                    <td>{row['Chromosome']}</td>
-                    <td>{start_formatted}</td>
-                    <td>{end_formatted}</td>
-                    <td>{cn_value}</td>
-                    <td>{sites_value}</td>
-                    <td>{hets_value}</td>"""
-
-            # Get quality value with fallback options
-            qs_value = None
-            for col in [qs_column, 'QS', 'Quality', 'QualityScore']:
-                if col in row:
-                    qs_value = row[col]
-                    break
-            if qs_value is None:
-                qs_value = 0
-            
-            # Format quality score
-            qs_display = f"{qs_value:.1f}" if isinstance(qs_value, (int, float)) else qs_value
-
-            table_html += f"""
-                    <td>{length_formatted}</td>
-                    <td>{row['Type']}</td>
-                    <td>{qs_display}</td>
-                    <td style="color: {p_color}">{p_display}</td>
-                </tr>"""
-
-        table_html += """
-            </tbody>
-        </table>"""
-        return table_html
+            headers = ['Chr', 'Start', 'End', 'CN', 'Sites', 'Hets']
+            value_columns = [
+                _first_column(df, lambda c: c.lower() in ('cn', 'copynumber')),
+                _first_column(df, lambda c: 'sites' in c.lower()),
+                _first_column(df, lambda c: 'hets' in c.lower()),
+            ]
+        qs_col = _first_column(df, [qs_column, 'QS', 'Quality', 'QualityScore'])
+        return self._build_cnv_table(df, table_class, headers, value_columns, qs_col)
 
     def generate_detailed_cnv_table_single(self, cnv_df):
-        """Generate detailed CNV table for single sample data"""
+        """Generate detailed CNV table HTML for single sample data"""
+        return self.detailed_cnv_tables_single(cnv_df).render()
+
+    def detailed_cnv_tables_single(self, cnv_df) -> DetailedCNVTables:
+        """Build the significant / non-significant CNV tables for single sample data"""
         try:
             if cnv_df is None or cnv_df.empty:
-                return {
-                    'significant': """<div class="info-box_empty">
-                        <i class="fas fa-info-circle"></i>
-                        No CNV calls found
-                    </div>""",
-                    'nonsignificant': """<div class="info-box_empty">
-                        <i class="fas fa-info-circle"></i>
-                        No CNV calls found
-                    </div>"""
-                }
-                
+                return DetailedCNVTables(json_tables=self.json_tables)
+
             df = cnv_df.copy()
             
             # Calculate Length if not present
@@ -936,9 +860,7 @@ class TableGenerator:
                         break
                 
                 if cn_col:
-                    df['Type'] = df[cn_col].apply(
-                        lambda x: 'Deletion' if x < 2 else 'Duplication' if x > 2 else 'Normal'
-                    )
+                    df['Type'] = _single_types(df[cn_col])
                 else:
                     # Default if no copy number column found
                     df['Type'] = 'Unknown'
@@ -953,9 +875,7 @@ class TableGenerator:
                         break
                 
                 if q_col:
-                    df['P_value'] = df[q_col].apply(
-                        lambda q: 10 ** (-q/10) if pd.notnull(q) else None
-                    )
+                    df['P_value'] = 10 ** (-df[q_col].astype(float) / 10)
                 else:
                     # Default if no quality score column found
                     df['P_value'] = None
@@ -964,111 +884,49 @@ class TableGenerator:
             significant_df = df[df['P_value'] < 0.05].copy() if 'P_value' in df.columns else df.head(0)
             nonsignificant_df = df[(df['P_value'] >= 0.05) | (df['P_value'].isna())].copy() if 'P_value' in df.columns else df.copy()
             
-            # Generate separate tables
-            significant_table = self._generate_single_cnv_subtable(significant_df, "significant-cnvs")
-            nonsignificant_table = self._generate_single_cnv_subtable(nonsignificant_df, "nonsignificant-cnvs")
-            
-            # Return both tables
-            return {
-                'significant': significant_table,
-                'nonsignificant': nonsignificant_table
-            }
+            return DetailedCNVTables(
+                json_tables=self.json_tables,
+                significant=self._generate_single_cnv_subtable(significant_df, "significant-cnvs"),
+                nonsignificant=self._generate_single_cnv_subtable(nonsignificant_df, "nonsignificant-cnvs")
+            )
             
         except Exception as e:
             logging.error(f"Error generating detailed CNV table for single sample: {str(e)}")
-            return {
-                'significant': f"<div class='info-box_empty'>Error generating significant CNV details: {str(e)}</div>",
-                'nonsignificant': f"<div class='info-box_empty'>Error generating non-significant CNV details: {str(e)}</div>"
-            }
+            return DetailedCNVTables(error=str(e))
     
-    def _generate_single_cnv_subtable(self, df, table_class):
-        """Helper method to generate a CNV subtable for single samples"""
-        if df.empty:
-            return """<div class="info-box_empty">
-                <i class="fas fa-info-circle"></i>
-                No matching CNV calls found
-            </div>"""
-            
-        # Create HTML table headers
-        table_html = f"""
-        <table class="detailed-cnv-table {table_class}">
-            <thead>
-                <tr>
-                    <th>Chr</th>
-                    <th>Start</th>
-                    <th>End</th>
-                    <th>CN</th>
-                    <th>Sites</th>
-                    <th>Hets</th>
-                    <th>Length</th>
-                    <th>Type</th>
-                    <th>QC</th>
-                    <th>P Value</th>
-                </tr>
-            </thead>
-            <tbody>"""
+    def _generate_single_cnv_subtable(self, df, table_class) -> CNVTable:
+        """Helper method to build a CNV subtable for single samples"""
+        value_columns = [
+            _first_column(df, lambda c: c.lower() in ('cn', 'copynumber')),
+            _first_column(df, lambda c: 'sites' in c.lower()),
+            _first_column(df, lambda c: 'hets' in c.lower()),
+        ]
+        # Quality column: prefer 'Quality', else 'QS'
+        qs_col = _first_column(df, ['Quality', 'QS'])
+        return self._build_cnv_table(df, table_class, ['Chr', 'Start', 'End', 'CN', 'Sites', 'Hets'],
+                                     value_columns, qs_col)
 
-        for _, row in df.iterrows():
-            p_value = row['P_value']
-            p_color = "#2ecc71" if p_value and p_value < 0.05 else "#e74c3c"
-            
-            # Format P-value display
-            if p_value is not None:
-                p_display = f"{p_value:.2e}" if p_value < 0.0001 else f"{p_value:.4f}"
-            else:
-                p_display = 'N/A'
-                
-            # Format numbers for better display
-            start_formatted = f"{row['Start']:,}"
-            end_formatted = f"{row['End']:,}"
-            length_formatted = f"{row['Length']:,}"
-            
-            # Sites column (case-insensitive)
-            sites_value = 'N/A'
-            for col in row.index:
-                if 'sites' in col.lower():
-                    sites_value = row[col]
-                    break
-            # Hets column (case-insensitive)
-            hets_value = 'N/A'
-            for col in row.index:
-                if 'hets' in col.lower():
-                    hets_value = row[col]
-                    break
-            # CN column (case-insensitive for 'cn' or 'copynumber')
-            cn_value = 'N/A'
-            for col in row.index:
-                if col.lower() in ('cn', 'copynumber'):
-                    cn_value = row[col]
-                    break
-            # Quality column: prefer 'Quality', else 'QS'
-            quality_value = row.get('Quality', row.get('QS', 0))
-            # Format quality value
-            quality_display = f"{quality_value:.1f}" if isinstance(quality_value, (int, float)) else quality_value
-            
-            table_html += f"""
-                <tr>
-                    <td>{row['Chromosome']}</td>
-                    <td>{start_formatted}</td>
-                    <td>{end_formatted}</td>
-                    <td>{cn_value}</td>
-                    <td>{sites_value}</td>
-                    <td>{hets_value}</td>
-                    <td>{length_formatted}</td>
-                    <td>{row['Type']}</td>
-                    <td>{quality_display}</td>
-                    <td style="color: {p_color}">{p_display}</td>
-                </tr>"""
+    @staticmethod
+    def _build_cnv_table(df, table_class, headers, value_columns, qs_col) -> CNVTable:
+        """Collect the typed columns of a detailed CNV table.
 
-        table_html += """
-            </tbody>
-        </table>"""
-        return table_html
+        `headers` label the leading Chr/Start/End and the variant `value_columns`;
+        Length, Type and QC follow, with the P value kept alongside."""
+        columns = [_column_values(df, 'Chromosome'), _column_values(df, 'Start'), _column_values(df, 'End')]
+        columns += [_column_values(df, col) for col in value_columns]
+        columns += [_column_values(df, 'Length'), _column_values(df, 'Type'), _column_values(df, qs_col)]
+        formats = [text_cell, thousands_cell, thousands_cell] + [text_cell] * len(value_columns)
+        formats += [thousands_cell, text_cell, quality_cell]
+        return CNVTable(
+            table_class=table_class,
+            headers=headers + ['Length', 'Type', 'QC'],
+            columns=columns,
+            formats=formats,
+            p_values=pd.to_numeric(df['P_value'], errors='coerce').to_numpy(dtype=float),
+        )
 
-    def _get_pair_type(self, cn_pre, cn_post):
-        """Determine CNV type for paired data"""
-        if cn_post < cn_pre:
-            return "Loss"
-        elif cn_post > cn_pre:
-            return "Gain"
-        return "Neutral" 
\ No newline at end of file
+    @staticmethod
+    def _pair_types(cn_pre, cn_post):
+        """Determine CNV types for paired data (Loss / Gain / Neutral per row)"""
+        cn_pre, cn_post = np.asarray(cn_pre, dtype=float), np.asarray(cn_post, dtype=float)
+        return np.select([cn_post < cn_pre, cn_post > cn_pre], ["Loss", "Gain"], default="Neutral")
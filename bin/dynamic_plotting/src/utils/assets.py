@@ -0,0 +1,110 @@
+import os
+import shutil
+import logging
+from dataclasses import dataclass
+
+from bokeh.util.paths import bokehjsdir
+
+BOKEH_VERSION = "3.3.4"
+VENDOR_DIR = "vendor"  # under components/
+
+
+@dataclass(frozen=True)
+class Asset:
+    """A third-party script or stylesheet used by the report pages.
+
+    `local` is the path under components/vendor/. BokehJS bundles are copied from the
+    installed bokeh package (`bokeh_file`, so they always match the Python side); the
+    others come from the same-named folder of a vendor directory, copied whole so
+    that e.g. the Font Awesome webfonts next to its CSS come along."""
+    kind: str                   # 'script' or 'style'
+    cdn: str
+    local: str
+    bokeh_file: str = None
+
+
+ASSETS = {
+    'bokeh': Asset('script', f"https://cdn.bokeh.org/bokeh/release/bokeh-{BOKEH_VERSION}.min.js",
+                   "bokeh/bokeh.min.js", "bokeh.min.js"),
+    'bokeh-widgets': Asset('script', f"https://cdn.bokeh.org/bokeh/release/bokeh-widgets-{BOKEH_VERSION}.min.js",
+                           "bokeh/bokeh-widgets.min.js", "bokeh-widgets.min.js"),
+    'bokeh-tables': Asset('script', f"https://cdn.bokeh.org/bokeh/release/bokeh-tables-{BOKEH_VERSION}.min.js",
+                          "bokeh/bokeh-tables.min.js", "bokeh-tables.min.js"),
+    'html2canvas': Asset('script', "https://cdnjs.cloudflare.com/ajax/libs/html2canvas/1.4.1/html2canvas.min.js",
+                         "html2canvas/html2canvas.min.js"),
+    'font-awesome': Asset('style', "https://cdnjs.cloudflare.com/ajax/libs/font-awesome/5.15.4/css/all.min.css",
+                          "font-awesome/css/all.min.css"),
+    'inter-font': Asset('style', "https://fonts.googleapis.com/css2?family=Inter:wght@400;500;600&display=swap",
+                        "inter/inter.css"),
+}
+
+
+class AssetBundle:
+    """Script / stylesheet tags for the ASSETS, from the CDNs or, in offline mode,
+    from the copies under components/vendor/.
+
+    Offline, an asset that is not available is left out of the pages rather than
+    loaded from its CDN, so opening a report never waits on the network; BokehJS is
+    always available from the installed package. Availability does not depend on
+    `vendor` having run, so runs that skip the copy (--shard, --samples) write the
+    same tags as the run that made it."""
+
+    def __init__(self, offline: bool = False, vendor_dir: str = None):
+        self.offline = offline
+        self.vendor_dir = vendor_dir
+        self.vendored = set()
+        self.failed = set()  # copies that failed in this run
+
+    def available(self, name: str) -> bool:
+        """Whether the offline copy of an asset exists or can be made from its source"""
+        asset = ASSETS[name]
+        if name in self.failed:
+            return False
+        if asset.bokeh_file:
+            return True
+        return bool(self.vendor_dir) and os.path.isfile(os.path.join(self.vendor_dir, asset.local))
+
+    def vendor(self, components_dir: str) -> list:
+        """Copy the assets into components_dir/vendor; returns the names that were copied"""
+        target_dir = os.path.join(components_dir, VENDOR_DIR)
+        for name, asset in ASSETS.items():
+            try:
+                if asset.bokeh_file:
+                    dest = os.path.join(target_dir, asset.local)
+                    os.makedirs(os.path.dirname(dest), exist_ok=True)
+                    shutil.copy2(os.path.join(bokehjsdir(), "js", asset.bokeh_file), dest)
+                else:
+                    folder = asset.local.split("/")[0]
+                    if not self.available(name):
+                        logging.warning(f"Offline assets: {asset.local} not found in vendor directory "
+                                        f"{self.vendor_dir}, leaving {name} out of the pages")
+                        continue
+                    shutil.copytree(os.path.join(self.vendor_dir, folder), os.path.join(target_dir, folder),
+                                    dirs_exist_ok=True)
+                self.vendored.add(name)
+            except OSError as e:
+                logging.error(f"Error copying offline asset {name}: {str(e)}")
+                self.failed.add(name)
+        logging.info(f"Copied offline assets to {target_dir}: {sorted(self.vendored)}")
+        return sorted(self.vendored)
+
+    def url(self, name: str, prefix: str = '') -> str:
+        """URL of an asset relative to a page `prefix` away from the report root; None if left out"""
+        if not self.offline:
+            return ASSETS[name].cdn
+        if self.available(name):
+            return f"{prefix}components/{VENDOR_DIR}/{ASSETS[name].local}"
+        return None
+
+    def tags(self, *names: str, prefix: str = '') -> str:
+        """<script> / <link> tags of the given assets, in order"""
+        tags = []
+        for name in names:
+            url = self.url(name, prefix)
+            if url is None:
+                continue
+            if ASSETS[name].kind == 'script':
+                tags.append(f'<script src="{url}"></script>')
+            else:
+                tags.append(f'<link rel="stylesheet" href="{url}">')
+        return "\n                ".join(tags)
@@ -0,0 +1,28 @@
+def get_chromosome_page_styles():
+    """components/css/chromosome_page.css: print layout of the chromosome pages and viewer"""
+    return """
+    @media print {
+        .navbar,
+        .chromosome-selector-container,
+        #download-pdf-btn { display: none !important; }
+    }
+    @page { size: A2 portrait; margin: 10mm; }
+    """
+
+
+def get_paired_chromosome_page_styles():
+    """components/css/chromosome_page_paired.css: table wrappers and nested dropdowns of the paired pages"""
+    return """
+    /* Force each table area to scroll independently (horizontal) */
+    .table-wrapper {
+        overflow-x: auto;
+        width: 100%;
+    }
+    /* Default-hide dropdown content; show when parent has .active */
+    .summary_single-dropdown-content {
+        display: none;
+    }
+    .summary_single-dropdown-section.active > .summary_single-dropdown-content {
+        display: block;
+    }
+    """
@@ -363,4 +363,40 @@ def get_info_components_styles():
     border-left: 2px solid #eee;
     padding-left: 1rem;
 }
+
+/* Quick-look reports: progress banner (home page) and preview notice (chromosome pages) */
+.report-status,
+.preview-notice {
+    background: #fff8e6;
+    border: 1px solid #f0d28c;
+    border-radius: 8px;
+    padding: 0.75rem 1rem;
+    margin: 10px 0 1.5rem;
+    color: var(--text-dark);
+}
+
+.report-status-bar {
+    height: 6px;
+    margin-top: 0.5rem;
+    background: #f3e6c4;
+    border-radius: 3px;
+    overflow: hidden;
+}
+
+.report-status-bar span {
+    display: block;
+    height: 100%;
+    background: var(--primary-color);
+    transition: width 0.5s ease;
+}
+
+.report-status details {
+    margin-top: 0.5rem;
+    font-size: 0.9em;
+}
+
+@media print {
+    .report-status,
+    .preview-notice { display: none !important; }
+}
 """
\ No newline at end of file
@@ -648,4 +648,60 @@ details[open] summary {
 .summary_single-nested-dropdown .summary_single-dropdown-content {
   padding: 10px;
 }
+
+/* Virtual-scrolling tables rendered from embedded JSON (--json_tables) */
+.vtable-toolbar {
+  display: flex;
+  align-items: center;
+  gap: 12px;
+  margin-bottom: 8px;
+}
+
+.vtable-filter {
+  padding: 6px 10px;
+  border: 1px solid #ccc;
+  border-radius: 4px;
+  min-width: 220px;
+}
+
+.vtable-count {
+  color: #666;
+  font-size: 0.9em;
+}
+
+.vtable-viewport {
+  max-height: 480px;
+  overflow-y: auto;
+}
+
+.vtable-viewport thead th {
+  position: sticky;
+  top: 0;
+  z-index: 1;
+}
+
+.vtable-viewport td {
+  white-space: nowrap;
+}
+
+.vtable-spacer,
+.vtable-spacer:hover {
+  background: transparent !important;
+}
+
+.vtable-empty {
+  text-align: center;
+  color: #666;
+}
+
+@media print {
+  .vtable-toolbar {
+    display: none;
+  }
+
+  .vtable-viewport {
+    max-height: none;
+    overflow: visible;
+  }
+}
 """
\ No newline at end of file
@@ -0,0 +1,227 @@
+def get_chromosome_page_script():
+    """Client-side behaviour of the per-chromosome pages (single and paired).
+
+    Loaded once from components/js/chromosome_page.js instead of being inlined in
+    every page. A page calls `KaryoChromosomePage.init(options)` with the id of the
+    <script type="application/json"> element holding its Bokeh item, the plot target
+    and the paired-page options (`nestedDropdowns`, `embedOnLoad`)."""
+    return """/* Chromosome pages: plot embedding, print / PDF export, dropdowns and table sorting */
+(function () {
+    'use strict';
+
+    let options = {nestedDropdowns: false};
+
+    function embed() {
+        const data = document.getElementById(options.data);
+        const target = document.getElementById(options.target);
+        let item;
+        try {
+            item = JSON.parse(data.textContent);
+        } catch (err) {
+            item = {error: 'Failed to load chromosome plot'};
+        }
+        if (item && !item.error) {
+            Bokeh.embed.embed_item(item, options.target);
+            // tell Bokeh to re-measure once the element is visible
+            requestAnimationFrame(() => window.dispatchEvent(new Event('resize')));
+        } else {
+            target.innerHTML = `
+                <div class="info-box error">
+                    <h3>Plot Loading Error</h3>
+                    <p>${(item && item.error) || 'Failed to load chromosome plot'}</p>
+                </div>`;
+        }
+    }
+
+    // Replace the Bokeh canvases with static images so they print reliably
+    async function convertBokehPlotsToImages() {
+        const plots = document.querySelectorAll('.bk-root');
+        for (let i = 0; i < plots.length; i++) {
+            const plot = plots[i];
+            const container = plot.closest('.plot-container') || plot.parentElement;
+            try {
+                await new Promise(r => setTimeout(r, 500));
+                const canvas = await html2canvas(plot, {
+                    scale: 2,
+                    logging: false,
+                    useCORS: true,
+                    allowTaint: true,
+                    backgroundColor: 'white'
+                });
+                const img = document.createElement('img');
+                img.src = canvas.toDataURL('image/png');
+                img.className = 'bokeh-static-image';
+                img.style.width = '100%';
+                const staticBox = document.createElement('div');
+                staticBox.className = 'bokeh-static-container';
+                staticBox.appendChild(img);
+                plot.style.display = 'none';
+                container.appendChild(staticBox);
+            } catch (err) {
+                console.error('Plot conversion error:', err);
+            }
+        }
+        return true;
+    }
+
+    function setupPrintButton() {
+        const btn = document.getElementById('download-pdf-btn');
+        if (!btn) return;
+
+        async function prepare() {
+            try {
+                if (window.html2canvas) await convertBokehPlotsToImages();
+                await new Promise(r => setTimeout(r, 300));
+            } catch (e) {
+                console.warn('Preparation for print failed:', e);
+            }
+        }
+
+        function cleanup() {
+            document.querySelectorAll('.bokeh-static-container').forEach(c => c.remove());
+            document.querySelectorAll('.bk-root').forEach(p => p.style.display = 'block');
+        }
+
+        btn.addEventListener('click', async () => {
+            await prepare();
+            window.print();
+        });
+        window.addEventListener('afterprint', cleanup);
+    }
+
+    function toggleDropdown(button) {
+        // Prevent the click from bubbling up to parent dropdowns
+        if (typeof event !== 'undefined' && event && event.stopPropagation) {
+            event.stopPropagation();
+        }
+        const section = button.closest('.summary_single-dropdown-section') ||
+                        button.closest('.single_chromosome-dropdown-section') ||
+                        button.closest('.paired_chromosome-dropdown-section');
+        if (!section) return;
+
+        section.classList.toggle('active');
+        const active = section.classList.contains('active');
+
+        const arrow = button.querySelector('.dropdown-arrow');
+        if (arrow) {
+            arrow.textContent = active ? '▲' : '▼';
+        } else {
+            // legacy markup with the arrow inside the button text
+            button.innerHTML = active ? button.innerHTML.replace('▼', '▲') : button.innerHTML.replace('▲', '▼');
+        }
+
+        if (options.nestedDropdowns) {
+            const content = section.querySelector('.summary_single-dropdown-content');
+            if (content) content.style.display = active ? 'block' : 'none';
+        }
+    }
+
+    // Table sorting: numbers (with commas / units) compare numerically, empty cells last
+    const getCellValue = (tr, idx) => {
+        const cell = tr.children[idx];
+        if (!cell) return '';
+        const link = cell.querySelector('a');
+        const value = link ? link.textContent : cell.innerText || cell.textContent;
+        return (value || '').trim();
+    };
+
+    const comparer = (idx, asc) => (a, b) => {
+        const v1 = getCellValue(asc ? a : b, idx);
+        const v2 = getCellValue(asc ? b : a, idx);
+        if (!v1 && v2) return 1;
+        if (v1 && !v2) return -1;
+        if (!v1 && !v2) return 0;
+        const num1 = v1.replace(/,/g, '').replace(/[^0-9.-]/g, '');
+        const num2 = v2.replace(/,/g, '').replace(/[^0-9.-]/g, '');
+        if (!isNaN(parseFloat(num1)) && !isNaN(parseFloat(num2))) {
+            return parseFloat(num1) - parseFloat(num2);
+        }
+        return v1.toString().localeCompare(v2);
+    };
+
+    function setupTableSorting(tableSelector, defaultSortColumn = 0) {
+        const tables = typeof tableSelector === 'string'
+            ? document.querySelectorAll(tableSelector)
+            : [tableSelector];
+
+        tables.forEach(table => {
+            if (!table || table.getAttribute('data-sorting-initialized') === 'true') return;
+            table.setAttribute('data-sorting-initialized', 'true');
+
+            let sortColumnIndex = defaultSortColumn;
+            let sortAscending = true;
+
+            table.querySelectorAll('th').forEach((th, thIndex) => {
+                th.style.cursor = 'pointer';
+                th.addEventListener('click', () => {
+                    const tbody = table.querySelector('tbody');
+                    if (!tbody) return;
+                    if (sortColumnIndex === thIndex) {
+                        sortAscending = !sortAscending;
+                    } else {
+                        sortColumnIndex = thIndex;
+                        sortAscending = true;
+                    }
+                    table.querySelectorAll('th').forEach(header => {
+                        header.classList.remove('sorted-asc', 'sorted-desc');
+                    });
+                    th.classList.add(sortAscending ? 'sorted-asc' : 'sorted-desc');
+                    Array.from(tbody.querySelectorAll('tr'))
+                        .sort(comparer(thIndex, sortAscending))
+                        .forEach(tr => tbody.appendChild(tr));
+                });
+            });
+
+            if (defaultSortColumn >= 0) {
+                const defaultHeader = table.querySelector(`th:nth-child(${defaultSortColumn + 1})`);
+                if (defaultHeader) defaultHeader.click();
+            }
+        });
+    }
+
+    function setupTables() {
+        // Start position (column 1) is the default sort of the detailed CNV tables
+        setupTableSorting('.detailed-cnv-table', 1);
+        // tables inside dropdowns that were not ready yet are set up when opened
+        document.querySelectorAll('.summary_single-dropdown-toggle').forEach(button => {
+            button.addEventListener('click', () => {
+                setTimeout(() => {
+                    const content = button.nextElementSibling;
+                    if (content) {
+                        content.querySelectorAll('.detailed-cnv-table').forEach(t => setupTableSorting(t, 1));
+                    }
+                }, 100);
+            });
+        });
+    }
+
+    function init(opts) {
+        options = Object.assign(options, opts);
+        document.addEventListener('DOMContentLoaded', () => {
+            setupPrintButton();
+            if (options.nestedDropdowns) {
+                document.querySelectorAll('.summary_single-dropdown-toggle').forEach(btn => {
+                    if (btn.parentElement && btn.parentElement.classList.contains('summary_single-dropdown-section')) {
+                        btn.parentElement.classList.add('summary_single-nested-dropdown');
+                    }
+                });
+            }
+            if (!options.embedOnLoad) {
+                embed();
+                setupTables();
+            }
+        });
+        if (options.embedOnLoad) {
+            // the dashboard sizes itself from the laid-out page, so wait for images, fonts and CSS
+            window.addEventListener('load', () => {
+                embed();
+                setupTables();
+            });
+        }
+    }
+
+    window.toggleDropdown = toggleDropdown;
+    window.setupTableSorting = setupTableSorting;
+    window.KaryoChromosomePage = {init: init};
+})();
+"""
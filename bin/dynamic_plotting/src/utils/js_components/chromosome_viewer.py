@@ -0,0 +1,175 @@
+def get_chromosome_viewer_script():
+    """Client-side chromosome switcher for the single-page report (--single_page).
+
+    The shell page lists the chromosomes; selecting one injects its data script
+    (`chr<N>.js`, a plain <script src> so it also works from file://), which calls
+    `KaryoViewer.register(chromosome, html, plotItem, targetId)`. The markup replaces
+    the content area and the plot is swapped into one Bokeh document that is reused
+    for every chromosome. Loaded chromosomes stay cached, so switching back is instant."""
+    return """/* Single-page chromosome viewer: per-chromosome data scripts loaded on demand */
+(function () {
+    'use strict';
+
+    const entries = {};    // chromosome -> {html, plot, target}
+    const pending = {};    // chromosome -> Promise while its script loads
+    let options = null;
+    let doc = null;        // the one Bokeh document, reused for every chromosome
+    let plotHost = null;   // element the Bokeh views are rendered into
+    let errorBox = null;
+    let shown = null;
+
+    function register(chromosome, html, plot, target) {
+        entries[chromosome] = {html: html, plot: plot, target: target};
+    }
+
+    function load(chromosome) {
+        if (entries[chromosome]) return Promise.resolve(entries[chromosome]);
+        if (!pending[chromosome]) {
+            const src = options.scripts[chromosome];
+            pending[chromosome] = new Promise((resolve, reject) => {
+                const script = document.createElement('script');
+                script.src = src;
+                script.onload = () => entries[chromosome]
+                    ? resolve(entries[chromosome])
+                    : reject(new Error(`${src} did not register chromosome ${chromosome}`));
+                script.onerror = () => {
+                    delete pending[chromosome];
+                    script.remove();
+                    reject(new Error(`Could not load ${src}`));
+                };
+                document.head.appendChild(script);
+            });
+        }
+        return pending[chromosome];
+    }
+
+    async function embed(plot) {
+        if (!plot || plot.error) {
+            if (doc) doc.clear();
+            errorBox.innerHTML = `<div class="info-box error"><h3>Plot Loading Error</h3>` +
+                `<p>${(plot && plot.error) || 'Failed to load chromosome plot'}</p></div>`;
+            errorBox.hidden = false;
+            return;
+        }
+        errorBox.hidden = true;
+        if (doc) {
+            // RootRemoved / RootAdded events re-render the views in place
+            doc.replace_with_json(plot.doc);
+        } else {
+            const views = await Bokeh.embed.embed_item(plot, plotHost);
+            doc = views.roots[0].model.document;
+        }
+        requestAnimationFrame(() => window.dispatchEvent(new Event('resize')));
+    }
+
+    function decorate(root) {
+        if (window.initVirtualTables) window.initVirtualTables(root);
+        if (options.nestedDropdowns) {
+            root.querySelectorAll('.summary_single-dropdown-toggle').forEach(btn => {
+                if (btn.parentElement && btn.parentElement.classList.contains('summary_single-dropdown-section')) {
+                    btn.parentElement.classList.add('summary_single-nested-dropdown');
+                }
+            });
+        }
+        root.querySelectorAll('.detailed-cnv-table').forEach(table => sortable(table, 1));
+    }
+
+    async function show(chromosome) {
+        if (!(chromosome in options.scripts)) chromosome = options.chromosomes[0];
+        if (chromosome === shown) return;
+        shown = chromosome;
+        document.querySelectorAll('.chromosome-button').forEach(btn =>
+            btn.classList.toggle('active', btn.dataset.chromosome === chromosome));
+
+        const content = document.getElementById(options.content);
+        let entry;
+        try {
+            entry = await load(chromosome);
+        } catch (err) {
+            content.innerHTML = `<div class="info-box error"><p>${err.message}</p></div>`;
+            return;
+        }
+        if (shown !== chromosome) return;  // a newer selection won the race
+
+        document.title = `${options.title} - Chromosome ${chromosome}`;
+        plotHost.remove();
+        errorBox.remove();
+        content.innerHTML = entry.html;
+        const placeholder = document.getElementById(entry.target);
+        if (placeholder) {
+            plotHost.className = placeholder.className;
+            placeholder.replaceWith(plotHost);
+            plotHost.after(errorBox);
+        }
+        decorate(content);
+        await embed(entry.plot);
+    }
+
+    // Click-to-sort for the server-rendered CNV tables (numbers compare numerically)
+    function sortable(table, defaultColumn) {
+        if (table.dataset.sortingInitialized) return;
+        table.dataset.sortingInitialized = 'true';
+        const cellValue = (tr, idx) => {
+            const cell = tr.children[idx];
+            const link = cell && cell.querySelector('a');
+            return ((link ? link.textContent : cell ? cell.textContent : '') || '').trim();
+        };
+        let column = -1;
+        let ascending = true;
+        table.querySelectorAll('th').forEach((th, idx) => {
+            th.style.cursor = 'pointer';
+            th.addEventListener('click', () => {
+                const tbody = table.querySelector('tbody');
+                if (!tbody) return;
+                ascending = column === idx ? !ascending : true;
+                column = idx;
+                table.querySelectorAll('th').forEach(h => h.classList.remove('sorted-asc', 'sorted-desc'));
+                th.classList.add(ascending ? 'sorted-asc' : 'sorted-desc');
+                Array.from(tbody.querySelectorAll('tr'))
+                    .sort((a, b) => {
+                        const v1 = cellValue(ascending ? a : b, idx);
+                        const v2 = cellValue(ascending ? b : a, idx);
+                        const n1 = parseFloat(v1.replace(/,/g, ''));
+                        const n2 = parseFloat(v2.replace(/,/g, ''));
+                        return !isNaN(n1) && !isNaN(n2) ? n1 - n2 : v1.localeCompare(v2);
+                    })
+                    .forEach(tr => tbody.appendChild(tr));
+            });
+        });
+        const header = table.querySelector(`th:nth-child(${defaultColumn + 1})`);
+        if (header) header.click();
+    }
+
+    function toggleDropdown(button) {
+        const section = button.closest('.summary_single-dropdown-section');
+        if (!section) return;
+        section.classList.toggle('active');
+        const arrow = button.querySelector('.dropdown-arrow');
+        if (arrow) arrow.textContent = section.classList.contains('active') ? '▲' : '▼';
+        const content = section.querySelector('.summary_single-dropdown-content');
+        if (content) content.style.display = section.classList.contains('active') ? 'block' : 'none';
+    }
+
+    function chromosomeFromHash() {
+        return decodeURIComponent(window.location.hash.replace(/^#/, ''));
+    }
+
+    function init(opts) {
+        options = opts;
+        plotHost = document.createElement('div');
+        errorBox = document.createElement('div');
+        errorBox.hidden = true;
+        document.querySelectorAll('.chromosome-button').forEach(btn => {
+            btn.addEventListener('click', () => {
+                // the hash keeps chromosomes bookmarkable and the back button working
+                window.location.hash = encodeURIComponent(btn.dataset.chromosome);
+            });
+        });
+        window.addEventListener('hashchange', () => show(chromosomeFromHash()));
+        show(chromosomeFromHash());
+    }
+
+    window.toggleDropdown = window.toggleDropdown || toggleDropdown;
+    window.KaryoViewer = {register: register, init: init, show: show};
+})();
+"""
@@ -0,0 +1,125 @@
+def get_region_fetch_script():
+    """Zoom-dependent point reloading for reports served by serve_report.py (--region_store).
+
+    The chromosome plots embed a min/max overview of their BAF / LRR points; their point
+    sources carry a "region=" tag naming the sample, track and chromosome. When the page
+    comes from the report server (/api/ping answers), every pan / zoom refetches the
+    visible range at the plot's pixel width from /api/region. Opened from file:// or a
+    plain static server the pages keep the overview."""
+    return """/* Report server: refetch chromosome points on pan / zoom */
+(function () {
+    'use strict';
+
+    const TAG = 'region=';
+    const SCAN_MS = 1000;       // look for newly embedded Bokeh documents (viewer chromosome switches)
+    const DEBOUNCE_MS = 250;
+    const sizes = new WeakMap();  // document -> number of models at the last scan
+    const seen = new WeakSet();   // tagged sources already connected
+    const ranges = new Map();     // x_range -> {plot, sources: [{source, region}], timer, controller}
+
+    function regionOf(model) {
+        const tags = model.tags || [];
+        for (const tag of tags) {
+            if (typeof tag === 'string' && tag.startsWith(TAG)) {
+                try { return JSON.parse(tag.slice(TAG.length)); } catch (e) { return null; }
+            }
+        }
+        return null;
+    }
+
+    function legendItems(models, source) {
+        return models.filter(m => m.label !== undefined && Array.isArray(m.renderers) &&
+                                  m.renderers.some(r => r.data_source === source));
+    }
+
+    function apply(entry, item, data) {
+        const columns = Object.keys(item.source.data);
+        const update = {};
+        for (const column of columns) {
+            const values = data[column] || [];
+            update[column] = values.map(v => v === null ? NaN : v);
+        }
+        item.source.data = update;
+        if (columns.includes('baf')) {
+            for (const legend of item.legends) {
+                try {
+                    legend.label = {value: data.downsampled
+                        ? `BAF (${data.returned.toLocaleString()} of ${data.total.toLocaleString()} points)`
+                        : 'BAF'};
+                } catch (e) { /* legend labels are cosmetic */ }
+            }
+        }
+    }
+
+    function refetch(entry) {
+        const range = entry.range;
+        const start = Math.floor(range.start);
+        const end = Math.ceil(range.end);
+        const width = Math.round(entry.plot.inner_width || 0) || 1000;
+        if (entry.controller) entry.controller.abort();
+        entry.controller = new AbortController();
+        const signal = entry.controller.signal;
+        for (const item of entry.sources) {
+            const params = new URLSearchParams({
+                sample: item.region.sample, track: item.region.track, chrom: item.region.chrom,
+                start: start, end: end, width: width,
+            });
+            fetch(`/api/region?${params}`, {signal: signal})
+                .then(response => response.ok ? response.json() : Promise.reject(response.status))
+                .then(data => apply(entry, item, data))
+                .catch(error => {
+                    if (signal.aborted) return;
+                    console.warn('Region query failed', item.region, error);
+                });
+        }
+    }
+
+    function schedule(entry) {
+        clearTimeout(entry.timer);
+        entry.timer = setTimeout(() => refetch(entry), DEBOUNCE_MS);
+    }
+
+    function connect(doc) {
+        const models = Array.from(doc.all_models);
+        const plots = models.filter(m => m.x_range !== undefined && Array.isArray(m.renderers));
+        for (const source of models) {
+            if (seen.has(source) || source.data === undefined) continue;
+            const region = regionOf(source);
+            if (region === null) continue;
+            seen.add(source);
+            for (const plot of plots) {
+                if (!plot.renderers.some(r => r.data_source === source)) continue;
+                let entry = ranges.get(plot.x_range);
+                if (entry === undefined) {
+                    entry = {range: plot.x_range, plot: plot, sources: [], timer: null, controller: null};
+                    ranges.set(plot.x_range, entry);
+                    plot.x_range.properties.start.change.connect(() => schedule(entry));
+                    plot.x_range.properties.end.change.connect(() => schedule(entry));
+                }
+                if (!entry.sources.some(item => item.source === source)) {
+                    entry.sources.push({source: source, region: region, legends: legendItems(models, source)});
+                }
+            }
+        }
+    }
+
+    function scan() {
+        if (!window.Bokeh || !Bokeh.documents) return;
+        for (const doc of Bokeh.documents) {
+            const size = doc.all_models.size;
+            if (sizes.get(doc) === size) continue;
+            sizes.set(doc, size);
+            connect(doc);
+        }
+    }
+
+    if (!/^https?:$/.test(window.location.protocol)) return;
+    fetch('/api/ping')
+        .then(response => {
+            if (!response.ok) return;
+            scan();
+            setInterval(scan, SCAN_MS);
+        })
+        .catch(() => { /* static hosting: keep the embedded overview */ });
+})();
+"""
@@ -0,0 +1,74 @@
+def get_report_status_script():
+    """Home page banner of a two-phase (--quick_look) report.
+
+    `KaryoReportStatus.watch(src)` loads report_status.js (the status JSON wrapped in an
+    `update(...)` call, so it also loads from file://) and reloads it every few seconds
+    until the run is complete."""
+    return """/* Quick-look report: progress banner fed by report_status.js */
+(function () {
+    'use strict';
+
+    const POLL_MS = 5000;
+    let source = null;
+    let timer = null;
+
+    function percent(done, total) {
+        return total ? Math.floor(100 * done / total) : 100;
+    }
+
+    function render(status) {
+        const box = document.getElementById('report-status');
+        if (!box) return;
+        const pages = status.pages || {total: 0, preview: 0, full: 0};
+        if (status.phase === 'complete') {
+            box.hidden = true;
+            return;
+        }
+        let text;
+        let done;
+        if (status.phase === 'quick_look') {
+            done = pages.preview;
+            text = `Quick-look report: ${pages.preview} of ${pages.total} preview chromosome pages written ` +
+                   `(every ${status.preview_stride}th SNP). Full-resolution pages follow.`;
+        } else {
+            done = pages.full;
+            text = `Rendering full-resolution chromosome pages: ${pages.full} of ${pages.total} done. ` +
+                   'Pages opened earlier show the preview until reloaded.';
+        }
+        const pending = Object.entries(status.samples || {})
+            .filter(([, c]) => c.full < c.total)
+            .map(([sample, c]) => `${sample} (${c.full}/${c.total})`);
+        box.innerHTML = `
+            <div class="report-status-text"><i class="fas fa-hourglass-half"></i> ${text}</div>
+            <div class="report-status-bar"><span style="width: ${percent(done, pages.total)}%"></span></div>
+            ${pending.length ? `<details><summary>${pending.length} samples still rendering</summary>` +
+                               `<p>${pending.join(', ')}</p></details>` : ''}`;
+        box.hidden = false;
+    }
+
+    function load() {
+        const previous = document.getElementById('report-status-data');
+        if (previous) previous.remove();
+        const script = document.createElement('script');
+        script.id = 'report-status-data';
+        script.src = `${source}?t=${Date.now()}`;
+        document.head.appendChild(script);
+    }
+
+    function update(status) {
+        render(status);
+        if (status.phase === 'complete' && timer !== null) {
+            clearInterval(timer);
+            timer = null;
+        }
+    }
+
+    function watch(src) {
+        source = src;
+        load();
+        timer = setInterval(load, POLL_MS);
+    }
+
+    window.KaryoReportStatus = {watch: watch, update: update};
+})();
+"""
@@ -0,0 +1,224 @@
+def get_virtual_table_script():
+    """Client-side renderer for tables embedded as JSON (TableGenerator(json_tables=True)).
+
+    Every `.vtable` element holds a `<script type="application/json" class="vtable-data">`
+    payload ({tableClass, columns, rows, sort}); only the rows inside the scroll
+    viewport are drawn, plus a small overscan. Headers sort, the toolbar filters."""
+    return """/* Virtual-scrolling tables for JSON-embedded table data */
+(function () {
+    'use strict';
+
+    const VIEWPORT_HEIGHT = 480;   // px, fallback while the viewport is hidden (matches .vtable-viewport)
+    const DEFAULT_ROW_HEIGHT = 33;
+    const OVERSCAN = 12;
+    const tables = [];
+
+    const escapeHtml = value => String(value).replace(/[&<>"]/g, c => (
+        {'&': '&amp;', '<': '&lt;', '>': '&gt;', '"': '&quot;'}[c]
+    ));
+
+    function formatCell(column, value) {
+        if (value === null || value === undefined) {
+            return column.missing !== undefined ? column.missing : 'N/A';
+        }
+        switch (column.format) {
+            case 'int':
+                return typeof value === 'number' ? value.toLocaleString('en-US') : String(value);
+            case 'fixed':
+                return typeof value === 'number' ? value.toFixed(column.digits) : String(value);
+            case 'pvalue':
+                return value < 0.0001
+                    ? value.toExponential(2).replace(/e([+-])(\\d)$/, 'e$10$2')
+                    : value.toFixed(4);
+            case 'link':
+                return String(value[0]);
+            default:
+                return String(value);
+        }
+    }
+
+    function cellAttributes(column, value) {
+        if (column.format === 'pvalue') {
+            const significant = value !== null && value !== 0 && value < 0.05;
+            return ` style="color: ${significant ? '#2ecc71' : '#e74c3c'}"`;
+        }
+        if (column.rule && typeof value === 'number') {
+            const hit = column.rule.op === '>=' ? value >= column.rule.value : value > column.rule.value;
+            return ` class="${hit ? column.rule.then : column.rule.else}"`;
+        }
+        return '';
+    }
+
+    function cellHtml(column, value) {
+        const text = escapeHtml(formatCell(column, value));
+        const inner = column.format === 'link' && value
+            ? `<a href="${escapeHtml(value[1])}" class="sample-link">${text}</a>`
+            : text;
+        return `<td${cellAttributes(column, value)}>${inner}</td>`;
+    }
+
+    function sortKey(column, value) {
+        if (value === null || value === undefined) return null;
+        return column.format === 'link' ? value[0] : value;
+    }
+
+    class VirtualTable {
+        constructor(host) {
+            const spec = JSON.parse(host.querySelector('script.vtable-data').textContent);
+            this.columns = spec.columns;
+            this.rows = spec.rows;
+            this.order = this.rows.map((_, i) => i);
+            this.visible = this.order;
+            this.query = '';
+            this.texts = null;
+            this.sortColumn = null;
+            this.sortAscending = true;
+            this.rowHeight = DEFAULT_ROW_HEIGHT;
+            this.printing = false;
+            this.pending = false;
+
+            const headers = this.columns.map(c => `<th>${escapeHtml(c.label)}</th>`).join('');
+            host.innerHTML = `
+                <div class="vtable-toolbar">
+                    <input type="search" class="vtable-filter" placeholder="Filter rows..." aria-label="Filter rows">
+                    <span class="vtable-count"></span>
+                </div>
+                <div class="vtable-viewport">
+                    <table class="${escapeHtml(spec.tableClass)}">
+                        <thead><tr>${headers}</tr></thead>
+                        <tbody></tbody>
+                    </table>
+                </div>`;
+            this.viewport = host.querySelector('.vtable-viewport');
+            this.table = host.querySelector('table');
+            this.tbody = host.querySelector('tbody');
+            this.count = host.querySelector('.vtable-count');
+
+            // Capture-phase handler: the pages' DOM-row sorters never see clicks on virtual headers
+            this.table.addEventListener('click', event => {
+                const th = event.target.closest('th');
+                if (!th) return;
+                event.stopPropagation();
+                if (!event.isTrusted) return;   // their initial synthetic clicks
+                const index = Array.from(th.parentNode.children).indexOf(th);
+                this.sort(index, this.sortColumn === index ? !this.sortAscending : true);
+            }, true);
+            this.viewport.addEventListener('scroll', () => this.schedule());
+            host.querySelector('.vtable-filter').addEventListener('input', event => this.filter(event.target.value));
+
+            if (spec.sort !== null && spec.sort !== undefined) {
+                this.sort(spec.sort, true);
+            } else {
+                this.render();
+            }
+        }
+
+        sort(index, ascending) {
+            const column = this.columns[index];
+            const direction = ascending ? 1 : -1;
+            this.order = this.order.slice().sort((a, b) => {
+                const x = sortKey(column, this.rows[a][index]);
+                const y = sortKey(column, this.rows[b][index]);
+                if (x === y) return a - b;
+                if (x === null) return 1;    // missing values last in both directions
+                if (y === null) return -1;
+                if (typeof x === 'number' && typeof y === 'number') return (x - y) * direction;
+                return String(x).localeCompare(String(y), undefined, {numeric: true}) * direction;
+            });
+            this.sortColumn = index;
+            this.sortAscending = ascending;
+            this.table.querySelectorAll('th').forEach((th, i) => {
+                th.classList.remove('sorted-asc', 'sorted-desc');
+                if (i === index) th.classList.add(ascending ? 'sorted-asc' : 'sorted-desc');
+            });
+            this.applyFilter();
+        }
+
+        filter(query) {
+            this.query = query.trim().toLowerCase();
+            this.applyFilter();
+        }
+
+        applyFilter() {
+            if (!this.query) {
+                this.visible = this.order;
+            } else {
+                if (!this.texts) {
+                    this.texts = this.rows.map(row =>
+                        row.map((value, i) => formatCell(this.columns[i], value)).join('\\u0001').toLowerCase());
+                }
+                this.visible = this.order.filter(i => this.texts[i].includes(this.query));
+            }
+            this.viewport.scrollTop = 0;
+            this.render();
+        }
+
+        schedule() {
+            if (this.pending) return;
+            this.pending = true;
+            requestAnimationFrame(() => {
+                this.pending = false;
+                this.render();
+            });
+        }
+
+        render() {
+            const total = this.visible.length;
+            let start = 0;
+            let end = total;
+            if (!this.printing) {
+                const height = this.viewport.clientHeight || VIEWPORT_HEIGHT;
+                start = Math.max(0, Math.floor(this.viewport.scrollTop / this.rowHeight) - OVERSCAN);
+                // the top spacer row shifts nth-of-type striping by one; keep it stable while scrolling
+                if (start > 0 && start % 2 === 0) start -= 1;
+                end = Math.min(total, start + Math.ceil(height / this.rowHeight) + 2 * OVERSCAN);
+            }
+
+            const parts = [];
+            if (start > 0) {
+                parts.push(`<tr class="vtable-spacer" style="height: ${start * this.rowHeight}px"></tr>`);
+            }
+            for (let i = start; i < end; i++) {
+                const row = this.rows[this.visible[i]];
+                parts.push('<tr>' + row.map((value, c) => cellHtml(this.columns[c], value)).join('') + '</tr>');
+            }
+            if (end < total) {
+                parts.push(`<tr class="vtable-spacer" style="height: ${(total - end) * this.rowHeight}px"></tr>`);
+            }
+            if (!total) {
+                parts.push(`<tr><td colspan="${this.columns.length}" class="vtable-empty">No matching rows</td></tr>`);
+            }
+            this.tbody.innerHTML = parts.join('');
+            this.count.textContent = total === this.rows.length
+                ? `${total.toLocaleString('en-US')} rows`
+                : `${total.toLocaleString('en-US')} of ${this.rows.length.toLocaleString('en-US')} rows`;
+
+            const measured = this.tbody.querySelector('tr:not(.vtable-spacer)');
+            if (measured && measured.offsetHeight && measured.offsetHeight !== this.rowHeight && !this.printing) {
+                this.rowHeight = measured.offsetHeight;
+                this.schedule();
+            }
+        }
+    }
+
+    function initVirtualTables(root) {
+        (root || document).querySelectorAll('.vtable').forEach(host => {
+            if (!host.vtable) {
+                host.vtable = new VirtualTable(host);
+                tables.push(host.vtable);
+            }
+        });
+    }
+
+    // Printing / PDF export shows every row
+    window.addEventListener('beforeprint', () => tables.forEach(t => { t.printing = true; t.render(); }));
+    window.addEventListener('afterprint', () => tables.forEach(t => { t.printing = false; t.render(); }));
+
+    window.initVirtualTables = initVirtualTables;
+    if (document.readyState === 'loading') {
+        document.addEventListener('DOMContentLoaded', () => initVirtualTables());
+    } else {
+        initVirtualTables();
+    }
+})();
+"""
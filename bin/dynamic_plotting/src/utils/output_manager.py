@@ -1,15 +1,36 @@
 import os
 import logging
 from .directory_structure import DirectoryStructure
+from .assets import AssetBundle
+from .page_writer import PageWriter
+from .precompress import Precompressor, write_server_snippets
+from .region_store import REGION_STORE_DIR
+from .report_status import QUICK_LOOK_STRIDE, ReportStatus
 
 class OutputManager:
     """Class to manage output directory creation and structure"""
     
-    def __init__(self, base_dir: str, app_name: str = "index"):
+    def __init__(self, base_dir: str, app_name: str = "index", json_tables: bool = False,
+                 baf_thin_stride: int = 0, single_page: bool = False,
+                 offline_assets: bool = False, vendor_dir: str = None,
+                 compress: bool = False, compress_brotli: bool = False,
+                 quick_look: bool = False, quick_look_stride: int = QUICK_LOOK_STRIDE,
+                 region_store: bool = False):
         """Initialize the output manager with a base directory and app name"""
         # Convert to absolute path
         self.base_dir = os.path.abspath(base_dir)
         self.app_name = app_name  # Store application name for HTML file naming
+        self.json_tables = json_tables  # Embed large tables as JSON for the virtual table renderer
+        self.baf_thin_stride = baf_thin_stride  # Keep every n-th homozygous BAF point on chromosome pages (0: all)
+        self.single_page = single_page  # One chromosome viewer per sample with chr<N>.js data scripts
+        self.assets = AssetBundle(offline=offline_assets, vendor_dir=vendor_dir)  # CDN or components/vendor tags
+        # .gz / .br siblings of the written files for static serving (None: off)
+        self.precompressor = Precompressor(use_brotli=compress_brotli) if compress or compress_brotli else None
+        self.page_writer = PageWriter()  # background thread streaming chromosome pages to disk
+        # Two-phase report: preview chromosome pages first, progress in report_status.json (None: off)
+        self.report_status = ReportStatus(self.base_dir, quick_look_stride) if quick_look else None
+        # Per-chromosome point arrays for the report server's region queries (None: off)
+        self.region_store = os.path.join(self.base_dir, REGION_STORE_DIR) if region_store else None
         logging.info(f"Initializing OutputManager with base directory: {self.base_dir}")
         logging.info(f"Application name set to: {app_name}.html")
         self.dir_structure = DirectoryStructure(self.base_dir)
@@ -84,6 +105,53 @@ class OutputManager:
             raise ValueError(f"Logo directory does not exist: {self.dir_structure.logo_files_dir}")
         return self.dir_structure.logo_files_dir
     
+    def written(self, path: str) -> str:
+        """Hand a finished output file to the precompressor (--compress); returns the path"""
+        if self.precompressor is not None:
+            self.precompressor.submit(path)
+        return path
+
+    @property
+    def quick_look(self) -> bool:
+        return self.report_status is not None
+
+    def write_page(self, path: str, parts, sample: str = None, preview: bool = False) -> int:
+        """Stream a page given as parts (markup strings and plot items) to `path` on the
+        background writer; returns the page size in bytes. Call flush_pages() before
+        reading the file.
+
+        Chromosome pages name their `sample` so that --quick_look can count them;
+        `preview` pages are replaced later and therefore not precompressed."""
+        def done(written_path):
+            if not preview:
+                self.written(written_path)
+            if self.report_status is not None and sample is not None:
+                self.report_status.page_done(sample, preview)
+        return self.page_writer.write(path, parts, on_done=done)
+
+    def flush_pages(self):
+        """Wait until all pages queued with write_page() are written"""
+        failed = self.page_writer.flush()
+        if failed:
+            logging.error(f"Failed to write {len(failed)} pages: {failed}")
+
+    def finish_compression(self) -> dict:
+        """Compress the files not handed over yet, wait for all of them and write the
+        nginx / Apache snippets; returns file and byte totals (empty when --compress is off)"""
+        if self.precompressor is None:
+            return {}
+        try:
+            self.flush_pages()
+            self.precompressor.sweep(self.base_dir)
+            stats = self.precompressor.close()
+            write_server_snippets(self.base_dir, use_brotli=self.precompressor.use_brotli)
+            logging.info(f"Precompressed {stats['files']} files: {stats['bytes']} bytes -> "
+                         f"{stats['gzip_bytes']} gzip / {stats['brotli_bytes']} brotli")
+            return stats
+        except Exception as e:
+            logging.error(f"Error precompressing output: {str(e)}")
+            raise
+
     def __str__(self) -> str:
         """String representation of the directory structure"""
         return str(self.dir_structure)
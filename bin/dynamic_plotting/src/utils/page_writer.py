@@ -0,0 +1,143 @@
+import json
+import logging
+import os
+import queue
+import threading
+
+CHUNK_SIZE = 1 << 20       # bytes handed to the writer thread at a time
+MAX_PENDING_CHUNKS = 32    # bounds the memory of queued, not yet written chunks
+PART_SUFFIX = '.part'      # pages are written under <path>.part and renamed when complete
+_encoder = json.JSONEncoder()
+_START = object()           # queued first for every page: a new write of a path that failed earlier
+_ABORT = object()           # queued instead of the close sentinel when a page fails to serialize
+
+
+def iter_page(parts):
+    """Text chunks of a page given as parts: str parts are markup, anything else
+    (e.g. a Bokeh json_item dict) is JSON-serialized piece by piece, with "</"
+    escaped so it can sit inside a <script> element"""
+    for part in parts:
+        if isinstance(part, str):
+            yield part
+        else:
+            # iterencode yields each JSON string whole, so "</" never spans two chunks
+            for chunk in _encoder.iterencode(part):
+                yield chunk.replace('</', '<\\/')
+
+
+def write_text_atomic(path: str, text: str):
+    """Write a whole page via <path>.part and a rename, so a reader never sees it half-written"""
+    with open(path + PART_SUFFIX, 'w') as f:
+        f.write(text)
+    os.replace(path + PART_SUFFIX, path)
+
+
+def render_page(parts) -> str:
+    """The whole page as one string (same text the PageWriter writes)"""
+    return "".join(part if isinstance(part, str) else json.dumps(part).replace('</', '<\\/')
+                   for part in parts)
+
+
+class PageWriter:
+    """Background thread writing report files from page parts.
+
+    `write` serializes the parts into ~1 MB chunks in the calling thread and queues
+    them; the writer thread does the disk I/O, so the next page renders meanwhile and
+    neither the page nor its plot JSON is ever held as one string. The bounded queue
+    makes a fast producer wait for the disk instead of buffering whole pages.
+
+    Each page goes to <path>.part first and is renamed over <path> once complete, so
+    a page replaced while the report is open (--quick_look) is never seen half-written."""
+
+    def __init__(self):
+        self.queue = queue.Queue(maxsize=MAX_PENDING_CHUNKS)
+        self.failed = []       # failures since the last flush()
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def _fail(self, path: str):
+        with self._lock:
+            self.failed.append(path)
+
+    def _run(self):
+        handles = {}
+        skipping = set()  # paths whose current write failed: drop their remaining chunks
+        while True:
+            path, data, on_done = self.queue.get()
+            try:
+                if data is _START:
+                    # a new write of the path supersedes its earlier failure
+                    skipping.discard(path)
+                    with self._lock:
+                        if path in self.failed:
+                            self.failed.remove(path)
+                    continue
+                if path in skipping:
+                    continue
+                if data is _ABORT:
+                    # serialization failed in write(): drop the partial file, keep the old page
+                    skipping.add(path)
+                    self._fail(path)
+                    handle = handles.pop(path, None)
+                    if handle is not None:
+                        handle.close()
+                    if os.path.exists(path + PART_SUFFIX):
+                        os.remove(path + PART_SUFFIX)
+                    continue
+                if path not in handles:
+                    handles[path] = open(path + PART_SUFFIX, 'wb')
+                if data is not None:
+                    handles[path].write(data)
+                else:
+                    handles.pop(path).close()
+                    os.replace(path + PART_SUFFIX, path)
+                    if on_done is not None:
+                        on_done(path)
+            except Exception as e:
+                logging.error(f"Error writing {path}: {str(e)}")
+                skipping.add(path)
+                self._fail(path)
+                handle = handles.pop(path, None)
+                if handle is not None:
+                    handle.close()
+                if os.path.exists(path + PART_SUFFIX):
+                    os.remove(path + PART_SUFFIX)
+            finally:
+                self.queue.task_done()
+
+    def write(self, path: str, parts, on_done=None) -> int:
+        """Queue a page for writing; returns its size in bytes.
+
+        `on_done(path)` runs in the writer thread once the file is complete. If the parts
+        fail to serialize, the exception propagates, the partial file is discarded and the
+        path is reported by `flush`."""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name='page-writer', daemon=True)
+            self._thread.start()
+        self.queue.put((path, _START, None))
+        size = 0
+        buffer = []
+        buffered = 0
+        try:
+            for chunk in iter_page(parts):
+                data = chunk.encode('utf-8')
+                buffer.append(data)
+                buffered += len(data)
+                if buffered >= CHUNK_SIZE:
+                    self.queue.put((path, b"".join(buffer), None))
+                    size += buffered
+                    buffer, buffered = [], 0
+            self.queue.put((path, b"".join(buffer), None))
+        except BaseException:
+            # never rename a half-serialized page over the existing one
+            self.queue.put((path, _ABORT, None))
+            raise
+        self.queue.put((path, None, on_done))
+        return size + buffered
+
+    def flush(self) -> list:
+        """Wait until every queued page is on disk; returns the paths that failed since the last flush"""
+        self.queue.join()
+        with self._lock:
+            failed, self.failed = self.failed, []
+        return failed
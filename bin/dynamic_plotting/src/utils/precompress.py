@@ -0,0 +1,160 @@
+import gzip
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    import brotli
+except ImportError:  # optional: .br siblings are skipped without it
+    brotli = None
+
+COMPRESSIBLE = ('.html', '.js', '.css', '.json', '.tsv', '.txt', '.svg')
+MIN_SIZE = 1024  # smaller files gain nothing worth a second request path
+NGINX_SNIPPET = "precompressed.nginx.conf"
+APACHE_SNIPPET = "precompressed.apache.conf"
+
+
+def _write_sibling(path, suffix, data):
+    """Write <path><suffix> via a temporary file, with the original's mtime"""
+    target = path + suffix
+    tmp = f"{target}.tmp{threading.get_ident()}"
+    with open(tmp, 'wb') as f:
+        f.write(data)
+    os.replace(tmp, target)
+    stat = os.stat(path)
+    os.utime(target, (stat.st_atime, stat.st_mtime))
+    return len(data)
+
+
+def _remove_sibling(path, suffix):
+    """Delete a <path><suffix> left by an earlier run, so a static server cannot serve a stale copy"""
+    try:
+        os.remove(path + suffix)
+    except FileNotFoundError:
+        pass
+
+
+class Precompressor:
+    """Writes .gz (and optionally .br) siblings of report files for static serving.
+
+    Pages are handed over with `submit` as soon as they are written and compressed on
+    a thread pool while the next page renders (zlib / brotli release the GIL); `sweep`
+    picks up whatever was written without being submitted, e.g. components/ and the
+    cohort tables. A sibling is only kept when it is smaller than the original; otherwise
+    one left from an earlier run is deleted."""
+
+    def __init__(self, use_brotli: bool = False, workers: int = None):
+        if use_brotli and brotli is None:
+            logging.warning("Brotli compression requested but the 'brotli' module is not installed; "
+                            "writing .gz files only")
+        self.use_brotli = use_brotli and brotli is not None
+        self.pool = ThreadPoolExecutor(max_workers=workers or min(4, os.cpu_count() or 1),
+                                       thread_name_prefix='precompress')
+        self.submitted = set()
+        self.futures = []
+        self.stats = {'files': 0, 'bytes': 0, 'gzip_bytes': 0, 'brotli_bytes': 0}
+        self._lock = threading.Lock()
+
+    def submit(self, path: str):
+        """Queue one written file for compression; returns the path unchanged"""
+        path = os.path.abspath(path)
+        if path.endswith(COMPRESSIBLE) and path not in self.submitted:
+            self.submitted.add(path)
+            self.futures.append(self.pool.submit(self._compress, path))
+        return path
+
+    def _compress(self, path):
+        try:
+            with open(path, 'rb') as f:
+                data = f.read()
+            if len(data) < MIN_SIZE:
+                _remove_sibling(path, '.gz')
+                _remove_sibling(path, '.br')
+                return
+            sizes = {'gzip_bytes': 0, 'brotli_bytes': 0}
+            packed = gzip.compress(data, compresslevel=9, mtime=0)
+            if len(packed) < len(data):
+                sizes['gzip_bytes'] = _write_sibling(path, '.gz', packed)
+            else:
+                _remove_sibling(path, '.gz')
+            packed = brotli.compress(data, quality=11 if len(data) < 1 << 20 else 9) if self.use_brotli else None
+            if packed is not None and len(packed) < len(data):
+                sizes['brotli_bytes'] = _write_sibling(path, '.br', packed)
+            else:
+                _remove_sibling(path, '.br')  # also a .br of an earlier --compress_brotli run
+            with self._lock:
+                self.stats['files'] += 1
+                self.stats['bytes'] += len(data)
+                for key, value in sizes.items():
+                    self.stats[key] += value
+        except OSError as e:
+            logging.error(f"Error precompressing {path}: {str(e)}")
+
+    def sweep(self, root: str):
+        """Queue every compressible file under root that was not submitted yet"""
+        for dirpath, _, filenames in os.walk(root):
+            for name in filenames:
+                self.submit(os.path.join(dirpath, name))
+
+    def close(self) -> dict:
+        """Wait for all queued files; returns file and byte totals"""
+        for future in self.futures:
+            future.result()
+        self.pool.shutdown()
+        return dict(self.stats)
+
+
+def write_server_snippets(directory: str, use_brotli: bool = False) -> list:
+    """Example nginx / Apache configuration serving the precompressed siblings"""
+    types = "text/html application/javascript text/css application/json text/tab-separated-values"
+    nginx = [
+        "# Serve the .gz / .br files written next to the report pages (--compress).",
+        "# Include inside the server or location block that serves the report directory.",
+        "gzip_static on;      # ngx_http_gzip_static_module",
+        "gunzip on;           # decompress for the rare client without gzip support",
+    ]
+    if use_brotli:
+        nginx.append("brotli_static on;    # needs the ngx_brotli module")
+    apache = [
+        "# Serve the .gz / .br files written next to the report pages (--compress).",
+        "# Needs mod_rewrite and mod_headers; place in the <Directory> of the report or in .htaccess.",
+        "RewriteEngine On",
+    ]
+    for suffix, encoding, enabled in (('br', 'br', use_brotli), ('gz', 'gzip', True)):
+        if not enabled:
+            continue
+        apache += [
+            f"RewriteCond %{{HTTP:Accept-Encoding}} {encoding}",
+            f"RewriteCond %{{REQUEST_FILENAME}}.{suffix} -s",
+            f"RewriteRule ^(.+)$ $1.{suffix} [L]",
+        ]
+    apache += [""]
+    for suffix, encoding, enabled in (('br', 'br', use_brotli), ('gz', 'gzip', True)):
+        if not enabled:
+            continue
+        apache += [
+            f'<FilesMatch "\\.(html|js|css|json|tsv|txt|svg)\\.{suffix}$">',
+            f"    Header set Content-Encoding {encoding}",
+            "    Header append Vary Accept-Encoding",
+            "</FilesMatch>",
+        ]
+    apache += [
+        "# Keep the original content types for the compressed files",
+        'RewriteRule "\\.html\\.(gz|br)$" "-" [T=text/html,E=no-gzip:1,E=no-brotli:1]',
+        'RewriteRule "\\.js\\.(gz|br)$" "-" [T=application/javascript,E=no-gzip:1,E=no-brotli:1]',
+        'RewriteRule "\\.css\\.(gz|br)$" "-" [T=text/css,E=no-gzip:1,E=no-brotli:1]',
+        'RewriteRule "\\.json\\.(gz|br)$" "-" [T=application/json,E=no-gzip:1,E=no-brotli:1]',
+        'RewriteRule "\\.tsv\\.(gz|br)$" "-" [T=text/tab-separated-values,E=no-gzip:1,E=no-brotli:1]',
+        'RewriteRule "\\.txt\\.(gz|br)$" "-" [T=text/plain,E=no-gzip:1,E=no-brotli:1]',
+        'RewriteRule "\\.svg\\.(gz|br)$" "-" [T=image/svg+xml,E=no-gzip:1,E=no-brotli:1]',
+    ]
+    nginx += ["", "# Compress on the fly whatever has no sibling (small files)", "gzip on;", f"gzip_types {types};"]
+
+    paths = []
+    for name, lines in ((NGINX_SNIPPET, nginx), (APACHE_SNIPPET, apache)):
+        path = os.path.join(directory, name)
+        with open(path, 'w') as f:
+            f.write("\n".join(lines) + "\n")
+        paths.append(path)
+    return paths
@@ -0,0 +1,185 @@
+import cProfile
+import functools
+import logging
+import os
+import re
+import signal
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from contextlib import contextmanager
+
+from src.utils.stage_metrics import rss_sampling_paused
+
+
+def _safe(part) -> str:
+    return re.sub(r'[^A-Za-z0-9._-]+', '_', str(part))
+
+
+class _StackSampler:
+    """Counts collapsed call stacks of the main thread from SIGPROF (CPU time) timer interrupts"""
+
+    def __init__(self, interval):
+        self.interval = interval
+        self.stacks = Counter()
+        self.available = hasattr(signal, 'setitimer') and threading.current_thread() is threading.main_thread()
+        self._previous = None
+
+    def _on_signal(self, signum, frame):
+        frames = []
+        while frame is not None:
+            code = frame.f_code
+            frames.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+            frame = frame.f_back
+        if frames:
+            self.stacks[';'.join(reversed(frames))] += 1
+
+    def start(self):
+        if self.available:
+            self._previous = signal.signal(signal.SIGPROF, self._on_signal)
+            signal.setitimer(signal.ITIMER_PROF, self.interval, self.interval)
+
+    def stop(self):
+        if self.available:
+            signal.setitimer(signal.ITIMER_PROF, 0, 0)
+            signal.signal(signal.SIGPROF, self._previous)
+
+
+class Profiler:
+    """cProfile + tracemalloc + stack-sampling hooks around selected calls.
+
+    For every profiled call three files are written to `profile_dir`:
+        <stage>__<sample>[__chr<chrom>].pstats         cProfile stats (python -m pstats / snakeviz)
+        <stage>__<sample>[__chr<chrom>].collapsed.txt  CPU-sampled collapsed stacks (flamegraph.pl / speedscope)
+        <stage>__<sample>[__chr<chrom>].alloc.txt      top allocation sites and traced peak
+
+    `samples` / `chromosomes` restrict profiling to matching calls (None = all);
+    with a chromosome filter only chromosome pages are profiled.
+    Hooks are installed on classes with `instrument`, so the page generators
+    themselves need no changes.
+    """
+
+    def __init__(self, profile_dir, samples=None, chromosomes=None, sample_interval=0.005, top_allocations=25):
+        self.profile_dir = profile_dir
+        self.samples = set(samples) if samples else None
+        self.chromosomes = {str(c) for c in chromosomes} if chromosomes else None
+        self.sample_interval = sample_interval
+        self.top_allocations = top_allocations
+        self._busy = False
+        os.makedirs(profile_dir, exist_ok=True)
+
+    def wants(self, identifiers=(), chromosome=None) -> bool:
+        """Whether a call for these sample identifiers / chromosome passes the filters"""
+        if self.samples is not None and not self.samples.intersection(identifiers):
+            return False
+        # a chromosome filter limits profiling to chromosome pages
+        if self.chromosomes is not None and (chromosome is None or str(chromosome) not in self.chromosomes):
+            return False
+        return True
+
+    @contextmanager
+    def profile(self, stage, sample, chromosome=None):
+        """Profile the enclosed block unconditionally (nested calls run unprofiled)"""
+        if self._busy:
+            yield
+            return
+        self._busy = True
+
+        name = f"{_safe(stage)}__{_safe(sample)}" + (f"__chr{_safe(chromosome)}" if chromosome is not None else "")
+        base = os.path.join(self.profile_dir, name)
+        started_tracing = not tracemalloc.is_tracing()
+        if started_tracing:
+            tracemalloc.start()
+        tracemalloc.reset_peak()
+        sampler = _StackSampler(self.sample_interval)
+        profiler = cProfile.Profile()
+        # cProfile sees every thread since Python 3.12; keep the RSS samplers quiet meanwhile
+        with rss_sampling_paused():
+            t0 = time.perf_counter()
+            sampler.start()
+            profiler.enable()
+            try:
+                yield
+            finally:
+                profiler.disable()
+                sampler.stop()
+                wall = time.perf_counter() - t0
+                snapshot = tracemalloc.take_snapshot()
+                _, peak = tracemalloc.get_traced_memory()
+                if started_tracing:
+                    tracemalloc.stop()
+                self._busy = False
+
+        profiler.dump_stats(base + ".pstats")
+        with open(base + ".collapsed.txt", 'w') as f:
+            for stack_line, count in sampler.stacks.most_common():
+                f.write(f"{stack_line} {count}\n")
+        self._write_allocations(base + ".alloc.txt", snapshot, peak, wall)
+        logging.info(f"Profiled {name}: {wall:.2f} s, traced peak {peak / 2**20:.1f} MB → {base}.*")
+
+    def _write_allocations(self, path, snapshot, peak, wall):
+        snapshot = snapshot.filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, __file__),
+        ))
+        stats = snapshot.statistics('lineno')
+        with open(path, 'w') as f:
+            f.write(f"Wall time          : {wall:.3f} s\n")
+            f.write(f"Traced peak memory : {peak / 2**20:.2f} MB\n")
+            f.write(f"Live at end        : {sum(s.size for s in stats) / 2**20:.2f} MB\n\n")
+            f.write(f"Top {self.top_allocations} allocation sites (live at end of call)\n")
+            for stat in stats[:self.top_allocations]:
+                frame = stat.traceback[0]
+                f.write(f"{stat.size / 1024:12.1f} KB  {stat.count:9d} blocks  {frame.filename}:{frame.lineno}\n")
+
+    def instrument(self, cls, method_name, stage, labels):
+        """Wrap `cls.method_name` so matching calls are profiled.
+
+        `labels(self, *args, **kwargs)` returns (display_name, identifiers, chromosome)."""
+        original = getattr(cls, method_name)
+        profiler = self
+
+        @functools.wraps(original)
+        def wrapper(obj, *args, **kwargs):
+            display, identifiers, chromosome = labels(obj, *args, **kwargs)
+            if not profiler.wants(identifiers, chromosome):
+                return original(obj, *args, **kwargs)
+            with profiler.profile(stage, display, chromosome):
+                return original(obj, *args, **kwargs)
+
+        setattr(cls, method_name, wrapper)
+        return original
+
+
+def _sample_labels(sample, *_args, **_kwargs):
+    return sample.sample_id, {sample.sample_id, sample.pre_sample}, None
+
+
+def _pair_labels(pair, *_args, **_kwargs):
+    return pair.pair_id, {pair.pair_id, pair.pre.sample_id, pair.post.sample_id}, None
+
+
+def install_profiling_hooks(profiler, sample_classes=(), pair_classes=(), summary_generators=(), chromosome_generators=()):
+    """Hook load_data, summary page generate() and generate_chromosome_page() / _script() of the given classes.
+
+    Generators are passed as (class, owner attribute) tuples, e.g.
+    (ChromosomePageGeneratorSingle, 'sample_obj') or (SampleSummaryGenerator, 'pair_obj')."""
+    for cls in sample_classes:
+        profiler.instrument(cls, 'load_data', 'load_data', _sample_labels)
+    for cls in pair_classes:
+        profiler.instrument(cls, 'load_data', 'load_data', _pair_labels)
+
+    def owner_labels(attr):
+        def labels(gen, *args, **kwargs):
+            owner = getattr(gen, attr)
+            base = _pair_labels(owner) if hasattr(owner, 'pair_id') else _sample_labels(owner)
+            chromosome = args[0] if args else kwargs.get('chromosome')
+            return base[0], base[1], chromosome
+        return labels
+
+    for cls, attr in summary_generators:
+        profiler.instrument(cls, 'generate', 'summary_page', owner_labels(attr))
+    for cls, attr in chromosome_generators:
+        profiler.instrument(cls, 'generate_chromosome_page', 'chromosome_page', owner_labels(attr))
+        profiler.instrument(cls, 'generate_chromosome_script', 'chromosome_page', owner_labels(attr))
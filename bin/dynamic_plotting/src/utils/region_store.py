@@ -0,0 +1,109 @@
+import json
+import logging
+import os
+import threading
+
+import numpy as np
+
+REGION_STORE_DIR = "region_store"
+REGION_COLUMNS = ('pos', 'baf', 'lrr')   # per chromosome: chr<N>.<column>.npy, sorted by position
+OVERVIEW_WIDTH = 1000                    # pixels of the whole-chromosome overview embedded in the pages
+MAX_WIDTH = 8000                         # largest pixel width a region request may ask for
+
+
+def region_tag(owner_id: str, track: str, chromosome: str) -> str:
+    """Bokeh `tags` entry marking a point source as refetchable from the report server
+    (a string: dict tags would arrive in BokehJS as Maps)"""
+    return "region=" + json.dumps({'sample': owner_id, 'track': track, 'chrom': str(chromosome)})
+
+
+def minmax_indices(pos: np.ndarray, columns, start: float, end: float, width: int) -> np.ndarray:
+    """Indices of the points to draw for [start, end] at `width` pixels: per pixel column the
+    lowest and highest value of every series in `columns` (NaNs ignored), in position order.
+
+    This keeps every outlier and the full vertical extent of each pixel, so the plot looks
+    the same as with all points; regions with at most 4 points per pixel are returned whole."""
+    n = len(pos)
+    if n <= 4 * width or end <= start:
+        return np.arange(n)
+    bins = np.clip(((pos - start) * (width / (end - start))).astype(np.int64), 0, width - 1)
+    keep = []
+    for values in columns:
+        valid = np.flatnonzero(~np.isnan(values))
+        if not len(valid):
+            continue
+        # Sorted by (bin, value): the first / last point of each bin are its min / max
+        order = valid[np.lexsort((values[valid], bins[valid]))]
+        first = np.flatnonzero(np.diff(bins[order], prepend=-1))
+        last = np.append(first[1:] - 1, len(order) - 1)
+        keep += [order[first], order[last]]
+    return np.unique(np.concatenate(keep)) if keep else np.arange(0)
+
+
+def write_region_store(store_dir: str, owner_id: str, track: str, baf_lrr_data) -> int:
+    """Write the BAF / LRR points of one sample (track: 'sample', or 'pre' / 'post' of a pair)
+    as position-sorted arrays per chromosome; returns the bytes written"""
+    track_dir = os.path.join(store_dir, owner_id, track)
+    os.makedirs(track_dir, exist_ok=True)
+    written = 0
+    for chromosome, points in baf_lrr_data.groupby('Chromosome', sort=False):
+        points = points.sort_values('Position', kind='stable')
+        arrays = {'pos': points['Position'].to_numpy(dtype=np.int64),
+                  'baf': points['BAF'].to_numpy(dtype=np.float32),
+                  'lrr': points['LRR'].to_numpy(dtype=np.float32)}
+        for column, values in arrays.items():
+            path = os.path.join(track_dir, f"chr{chromosome}.{column}.npy")
+            np.save(path + '.part.npy', values)
+            os.replace(path + '.part.npy', path)
+            written += os.path.getsize(path)
+    logging.info(f"Wrote region store of {owner_id} ({track}) to {track_dir}")
+    return written
+
+
+class RegionStore:
+    """Read side of the region store, used by the report server.
+
+    Arrays are memory-mapped on first use and kept open, so a region query reads only the
+    pages of its own slice (found by binary search on the sorted positions)."""
+
+    def __init__(self, store_dir: str):
+        self.store_dir = store_dir
+        self._arrays = {}
+        self._lock = threading.Lock()
+
+    def _load(self, owner_id: str, track: str, chromosome: str) -> dict:
+        key = (owner_id, track, chromosome)
+        with self._lock:
+            if key not in self._arrays:
+                track_dir = os.path.join(self.store_dir, owner_id, track)
+                self._arrays[key] = {
+                    column: np.load(os.path.join(track_dir, f"chr{chromosome}.{column}.npy"), mmap_mode='r')
+                    for column in REGION_COLUMNS
+                }
+            return self._arrays[key]
+
+    def query(self, owner_id: str, track: str, chromosome: str, start: float, end: float, width: int) -> dict:
+        """Points of [start, end], min/max-downsampled to `width` pixels"""
+        for part in (owner_id, track, chromosome):
+            if not part or os.sep in part or part.startswith('.'):
+                raise KeyError(f"Invalid region request: {part!r}")
+        try:
+            arrays = self._load(owner_id, track, chromosome)
+        except FileNotFoundError:
+            raise KeyError(f"No region data for {owner_id} ({track}) chr {chromosome}")
+        width = max(1, min(int(width), MAX_WIDTH))
+        lo = int(np.searchsorted(arrays['pos'], start, side='left'))
+        hi = int(np.searchsorted(arrays['pos'], end, side='right'))
+        pos = np.asarray(arrays['pos'][lo:hi])
+        baf = np.asarray(arrays['baf'][lo:hi], dtype=np.float64)
+        lrr = np.asarray(arrays['lrr'][lo:hi], dtype=np.float64)
+        kept = minmax_indices(pos, (baf, lrr), start, end, width)
+        return {
+            'sample': owner_id, 'track': track, 'chrom': chromosome,
+            'start': start, 'end': end, 'width': width,
+            'total': hi - lo, 'returned': len(kept), 'downsampled': len(kept) < hi - lo,
+            'pos': pos[kept].tolist(),
+            # NaN is not valid JSON
+            'baf': [None if np.isnan(v) else v for v in baf[kept].tolist()],
+            'lrr': [None if np.isnan(v) else v for v in lrr[kept].tolist()],
+        }
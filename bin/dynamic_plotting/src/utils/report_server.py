@@ -0,0 +1,73 @@
+import json
+import logging
+import math
+import os
+from functools import partial
+from http import HTTPStatus
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+from .region_store import OVERVIEW_WIDTH, RegionStore
+
+
+class ReportRequestHandler(SimpleHTTPRequestHandler):
+    """Static files of the report directory plus the region API used by region_fetch.js:
+
+        GET /api/ping                                                   -> {"region_store": true}
+        GET /api/region?sample=&track=&chrom=&start=&end=&width=        -> points of the range,
+                                                                            min/max-downsampled"""
+
+    def __init__(self, *args, store: RegionStore, **kwargs):
+        self.store = store
+        super().__init__(*args, **kwargs)
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        if url.path == '/api/ping':
+            self.send_json({'region_store': True})
+        elif url.path == '/api/region':
+            self.region(parse_qs(url.query))
+        else:
+            super().do_GET()
+
+    def region(self, query: dict):
+        try:
+            params = {key: query[key][0] for key in ('sample', 'track', 'chrom', 'start', 'end')}
+            start, end = float(params['start']), float(params['end'])
+            width = int(query.get('width', [OVERVIEW_WIDTH])[0])
+            if not (math.isfinite(start) and math.isfinite(end)):
+                raise ValueError("start and end must be finite")
+            if end <= start:
+                raise ValueError("end must be greater than start")
+        except (KeyError, ValueError) as e:
+            self.send_json({'error': f"Bad region request: {str(e)}"}, HTTPStatus.BAD_REQUEST)
+            return
+        try:
+            self.send_json(self.store.query(params['sample'], params['track'], params['chrom'].removeprefix('chr'),
+                                            start, end, width))
+        except KeyError as e:
+            self.send_json({'error': str(e.args[0])}, HTTPStatus.NOT_FOUND)
+
+    def send_json(self, payload: dict, status: HTTPStatus = HTTPStatus.OK):
+        body = json.dumps(payload, separators=(',', ':')).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('Cache-Control', 'no-store')
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        logging.debug("%s - %s", self.address_string(), format % args)
+
+
+def serve_report(report_dir: str, store_dir: str, host: str = '127.0.0.1', port: int = 8000):
+    """Serve `report_dir` with region queries against `store_dir` until interrupted"""
+    handler = partial(ReportRequestHandler, directory=report_dir, store=RegionStore(store_dir))
+    with ThreadingHTTPServer((host, port), handler) as server:
+        logging.info(f"Serving {report_dir} at http://{host}:{server.server_address[1]}/ "
+                     f"(region store: {store_dir if os.path.isdir(store_dir) else 'missing'})")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            logging.info("Report server stopped")
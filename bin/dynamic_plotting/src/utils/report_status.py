@@ -0,0 +1,89 @@
+import json
+import logging
+import os
+import threading
+import time
+from datetime import datetime
+
+STATUS_JSON = "report_status.json"
+STATUS_SCRIPT = "report_status.js"   # same status for the home page, loadable from file://
+QUICK_LOOK_STRIDE = 20               # quick-look chromosome pages draw every n-th SNP
+PHASES = ('quick_look', 'full', 'complete')
+
+
+def report_status_section() -> str:
+    """Home page banner showing the progress of a --quick_look run (components/js/report_status.js)"""
+    return (f'<div id="report-status" class="report-status" hidden></div>\n'
+            f'<script src="components/js/report_status.js"></script>\n'
+            f'<script>KaryoReportStatus.watch({json.dumps(STATUS_SCRIPT)});</script>')
+
+
+class ReportStatus:
+    """Progress of a two-phase (--quick_look) report in report_status.json.
+
+    Phase 'quick_look' writes the home page, the summary pages and preview chromosome
+    pages; phase 'full' replaces the previews in place; 'complete' ends the run. Pages
+    are counted per sample / pair as the page writer finishes them, so `page_done`
+    runs in the writer thread. The file is rewritten at most every `interval` seconds
+    (and at every phase change), always via a temporary file and a rename, so a reader
+    never sees a partial status."""
+
+    def __init__(self, base_dir: str, preview_stride: int = QUICK_LOOK_STRIDE, interval: float = 2.0):
+        self.base_dir = base_dir
+        self.preview_stride = preview_stride
+        self.interval = interval
+        self.phase = PHASES[0]
+        self.started = datetime.now().isoformat(timespec='seconds')
+        self.samples = {}
+        self._written = 0.0
+        self._lock = threading.Lock()
+
+    def begin(self, pages: dict):
+        """Start the quick-look phase; `pages` maps each sample / pair to its chromosome page count"""
+        with self._lock:
+            self.samples = {str(sample): {'total': int(total), 'preview': 0, 'full': 0}
+                            for sample, total in pages.items()}
+        self.set_phase('quick_look')
+
+    def set_phase(self, phase: str):
+        if phase not in PHASES:
+            raise ValueError(f"Unknown report phase: {phase}")
+        with self._lock:
+            self.phase = phase
+        logging.info(f"Report phase: {phase}")
+        self.write()
+
+    def page_done(self, sample: str, preview: bool):
+        """Count one chromosome page of `sample` as written (preview or full resolution)"""
+        with self._lock:
+            counts = self.samples.setdefault(str(sample), {'total': 0, 'preview': 0, 'full': 0})
+            counts['preview' if preview else 'full'] += 1
+            due = time.monotonic() - self._written >= self.interval
+        if due:
+            self.write()
+
+    def to_dict(self) -> dict:
+        with self._lock:
+            samples = {sample: dict(counts) for sample, counts in self.samples.items()}
+            phase = self.phase
+        pages = {key: sum(c[key] for c in samples.values()) for key in ('total', 'preview', 'full')}
+        return {'phase': phase, 'started': self.started,
+                'updated': datetime.now().isoformat(timespec='seconds'),
+                'preview_stride': self.preview_stride, 'pages': pages, 'samples': samples}
+
+    def write(self):
+        """Write report_status.json and report_status.js (atomically, each via a rename)"""
+        status = self.to_dict()
+        text = json.dumps(status, indent=2)
+        try:
+            for name, content in ((STATUS_JSON, text + "\n"),
+                                  (STATUS_SCRIPT, f"window.KaryoReportStatus && KaryoReportStatus.update({text});\n")):
+                path = os.path.join(self.base_dir, name)
+                tmp = f"{path}.tmp{threading.get_ident()}"
+                with open(tmp, 'w') as f:
+                    f.write(content)
+                os.replace(tmp, path)
+            with self._lock:
+                self._written = time.monotonic()
+        except OSError as e:
+            logging.error(f"Error writing report status: {str(e)}")
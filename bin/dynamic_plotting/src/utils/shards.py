@@ -0,0 +1,120 @@
+import json
+import logging
+import os
+
+import numpy as np
+import pandas as pd
+
+from src.plots.cohort_matrix import LAYERS, CohortMatrix, cohort_matrix
+from src.plots.recurrence import genome_bins
+
+SHARD_DIR = "shards"
+SHARD_SUFFIX = ".shard.json"    # per sample / pair: home page numbers, CNV calls, page metrics
+MATRIX_SUFFIX = ".shard.npy"    # per sample / pair: its cohort matrix row over all reference chromosomes
+
+
+def _json_default(value):
+    """numpy scalars / arrays as plain JSON values"""
+    if hasattr(value, 'tolist'):
+        return value.tolist()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def select_shard(objects, shard_ids, keys):
+    """The objects of one shard, in sample-sheet order; `keys(obj)` gives the IDs an
+    object may be selected by. Unknown IDs raise ValueError."""
+    wanted = set(shard_ids)
+    selected = [obj for obj in objects if wanted.intersection(keys(obj))]
+    unknown = wanted.difference(key for obj in selected for key in keys(obj))
+    if unknown:
+        raise ValueError(f"IDs not found in the sample sheet: {sorted(unknown)}")
+    return selected
+
+
+def object_state(obj, attributes=(), frames=()) -> dict:
+    """The given attributes and DataFrame attributes of a loaded sample / pair, as JSON-ready dict"""
+    state = {'attributes': {name: getattr(obj, name, None) for name in attributes}, 'frames': {}}
+    for name in frames:
+        frame = getattr(obj, name, None)
+        state['frames'][name] = None if frame is None else json.loads(frame.to_json(orient='split', index=False))
+    return state
+
+
+def restore_state(obj, state: dict):
+    """Set the attributes saved by object_state on an object that was not loaded"""
+    for name, value in state['attributes'].items():
+        setattr(obj, name, value)
+    for name, frame in state['frames'].items():
+        setattr(obj, name, None if frame is None else pd.DataFrame(frame['data'], columns=frame['columns']))
+    return obj
+
+
+def matrix_row(baf_lrr, calls, bin_size) -> np.ndarray:
+    """(layers, bins) cohort matrix row of one sample over all reference chromosomes"""
+    row = cohort_matrix({'shard': (baf_lrr, calls)}, chromosomes=None, bin_size=bin_size)
+    return np.stack([getattr(row, layer)[0] for layer in LAYERS])
+
+
+def write_shard(shard_dir: str, shard_id: str, record: dict, row: np.ndarray) -> int:
+    """Write one sample's / pair's shard metadata and matrix row; returns the bytes written"""
+    os.makedirs(shard_dir, exist_ok=True)
+    json_path = os.path.join(shard_dir, shard_id + SHARD_SUFFIX)
+    npy_path = os.path.join(shard_dir, shard_id + MATRIX_SUFFIX)
+    with open(json_path, 'w') as f:
+        json.dump({'id': shard_id, **record}, f, default=_json_default)
+    np.save(npy_path, row)
+    logging.info(f"Wrote shard metadata for {shard_id} to {shard_dir}")
+    return os.path.getsize(json_path) + os.path.getsize(npy_path)
+
+
+def rendered_shards(shard_dir: str) -> set:
+    """IDs of the samples / pairs that already have shard metadata in `shard_dir`"""
+    if not os.path.isdir(shard_dir):
+        return set()
+    return {name[:-len(SHARD_SUFFIX)] for name in os.listdir(shard_dir) if name.endswith(SHARD_SUFFIX)}
+
+
+def read_shards(shard_dir: str, shard_ids) -> dict:
+    """Shard metadata of every ID; a missing shard raises FileNotFoundError"""
+    missing = [i for i in shard_ids if not os.path.isfile(os.path.join(shard_dir, i + SHARD_SUFFIX))]
+    if missing:
+        raise FileNotFoundError(f"No shard metadata in {shard_dir} for: {missing}")
+    shards = {}
+    for shard_id in shard_ids:
+        with open(os.path.join(shard_dir, shard_id + SHARD_SUFFIX)) as f:
+            shards[shard_id] = json.load(f)
+    return shards
+
+
+def merge_cohort_matrix(shard_dir: str, shard_ids, chromosomes=None, bin_size=None) -> CohortMatrix:
+    """Stack the shards' matrix rows into the CohortMatrix of the given chromosomes.
+
+    Bins restart at every chromosome, so the columns of a chromosome subset are
+    slices of the all-chromosome rows and the result equals cohort_matrix()."""
+    all_chromosomes, all_offsets = genome_bins(None, bin_size)
+    chromosomes, offsets = genome_bins(chromosomes, bin_size)
+    columns = np.concatenate([np.arange(all_offsets[i], all_offsets[i + 1])
+                              for i in (all_chromosomes.index(c) for c in chromosomes)]
+                             or [np.zeros(0, dtype=np.int64)])
+    rows = []
+    for shard_id in shard_ids:
+        row = np.load(os.path.join(shard_dir, shard_id + MATRIX_SUFFIX))
+        if row.shape != (len(LAYERS), int(all_offsets[-1])):
+            raise ValueError(f"Shard {shard_id} was binned differently (shape {row.shape}); "
+                             f"re-render it with the same --recurrence_bin_size")
+        rows.append(row[:, columns])
+    stacked = np.stack(rows, axis=1) if rows else np.zeros((len(LAYERS), 0, len(columns)), dtype=np.float32)
+    return CohortMatrix(samples=[str(i) for i in shard_ids], chromosomes=chromosomes, bin_size=bin_size,
+                        offsets=offsets, **{layer: stacked[i] for i, layer in enumerate(LAYERS)})
+
+
+def shard_page_metrics(metrics, labels) -> list:
+    """Metric records of one sample / pair, carried to the merge run's processing summary"""
+    return [rec for rec in metrics.records if rec.get('sample') in labels]
+
+
+def kept_page_metrics(shard_dir: str, shard_id: str, chromosomes) -> list:
+    """Saved chromosome page metrics of one sample / pair for the chromosomes other than
+    `chromosomes`, which a --chromosomes run does not re-render"""
+    records = read_shards(shard_dir, [shard_id])[shard_id]['metrics']
+    return [rec for rec in records if rec.get('chromosome') is not None and rec['chromosome'] not in chromosomes]
@@ -0,0 +1,170 @@
+import json
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from datetime import datetime
+
+
+# Cleared while a profiler is running so that RSS sampling threads stay out of its statistics
+_sampling_allowed = threading.Event()
+_sampling_allowed.set()
+
+
+@contextmanager
+def rss_sampling_paused():
+    """Suspend the background RSS samplers; stage peaks fall back to start/end readings"""
+    _sampling_allowed.clear()
+    try:
+        yield
+    finally:
+        _sampling_allowed.set()
+
+
+def current_rss_bytes():
+    """Resident set size of this process in bytes"""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        # No procfs: fall back to the process peak (KB on Linux, bytes on macOS)
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == 'darwin' else peak * 1024
+
+
+def path_bytes(path):
+    """Size of a file, or of all files below a directory, in bytes"""
+    if os.path.isfile(path):
+        return os.path.getsize(path)
+    total = 0
+    for root, _, files in os.walk(path):
+        for name in files:
+            try:
+                total += os.path.getsize(os.path.join(root, name))
+            except OSError:
+                pass
+    return total
+
+
+class StageMetrics:
+    """Collects wall time, CPU time, peak RSS and output bytes for named processing stages.
+
+    Usage:
+        metrics = StageMetrics()
+        with metrics.stage('chromosome_page', sample=sample_id, chromosome=chrom) as rec:
+            ...
+            rec['output_bytes'] += path_bytes(written_file)
+        metrics.write_json('metrics.json')
+
+    Stages may be nested; a background thread samples RSS every `sample_interval`
+    seconds and updates the peak of every stage that is currently open.
+    """
+
+    def __init__(self, sample_interval=0.02):
+        self.records = []
+        self.started = datetime.now().isoformat(timespec='seconds')
+        self._active = []
+        self._lock = threading.Lock()
+        self._interval = sample_interval
+        self._sampler = None
+
+    def _sample_rss(self):
+        while True:
+            _sampling_allowed.wait()
+            rss = current_rss_bytes()
+            with self._lock:
+                for rec in self._active:
+                    rec['_peak'] = max(rec['_peak'], rss)
+            time.sleep(self._interval)
+
+    @contextmanager
+    def stage(self, name, item=None, sample=None, chromosome=None):
+        """Measure the enclosed block as one record of stage `name`"""
+        if self._sampler is None:
+            self._sampler = threading.Thread(target=self._sample_rss, name='rss-sampler', daemon=True)
+            self._sampler.start()
+
+        rss_start = current_rss_bytes()
+        rec = {'stage': name, 'item': item, 'sample': sample, 'chromosome': chromosome,
+               'output_bytes': 0, '_peak': rss_start}
+        with self._lock:
+            self._active.append(rec)
+        t0, c0 = time.perf_counter(), time.process_time()
+        try:
+            yield rec
+        finally:
+            wall, cpu = time.perf_counter() - t0, time.process_time() - c0
+            with self._lock:
+                self._active.remove(rec)
+            peak = max(rec.pop('_peak'), current_rss_bytes())
+            rec['wall_s'] = round(wall, 4)
+            rec['cpu_s'] = round(cpu, 4)
+            rec['peak_rss_mb'] = round(peak / 2**20, 1)
+            rec['rss_delta_mb'] = round((peak - rss_start) / 2**20, 1)
+            self.records.append(rec)
+
+    @staticmethod
+    def _aggregate(records):
+        stages = {}
+        for rec in records:
+            agg = stages.setdefault(rec['stage'], {'count': 0, 'wall_s': 0.0, 'cpu_s': 0.0, 'peak_rss_mb': 0.0,
+                                                   'rss_delta_mb': 0.0, 'output_bytes': 0})
+            agg['count'] += 1
+            agg['wall_s'] = round(agg['wall_s'] + rec['wall_s'], 4)
+            agg['cpu_s'] = round(agg['cpu_s'] + rec.get('cpu_s', 0.0), 4)
+            agg['peak_rss_mb'] = max(agg['peak_rss_mb'], rec['peak_rss_mb'])
+            agg['rss_delta_mb'] = max(agg['rss_delta_mb'], rec.get('rss_delta_mb', 0.0))
+            agg['output_bytes'] += rec['output_bytes']
+        return stages
+
+    def summary(self):
+        """Per-stage totals: record count, summed wall/CPU time and output bytes, max peak RSS and RSS delta"""
+        return self._aggregate(self.records)
+
+    def breakdown(self, key):
+        """Per-stage totals grouped by a record label, e.g. 'sample' or 'chromosome'"""
+        groups = {}
+        for rec in self.records:
+            if rec.get(key) is not None:
+                groups.setdefault(str(rec[key]), []).append(rec)
+        return {label: self._aggregate(recs) for label, recs in groups.items()}
+
+    def slowest(self, n=10, stage=None):
+        """The `n` slowest records, optionally restricted to one stage (or a tuple of stages)"""
+        stages = (stage,) if isinstance(stage, str) else stage
+        recs = [r for r in self.records if stages is None or r['stage'] in stages]
+        return sorted(recs, key=lambda r: r['wall_s'], reverse=True)[:n]
+
+    def to_dict(self, **extra):
+        return {'started': self.started, **extra, 'stages': self.summary(),
+                'by_sample': self.breakdown('sample'), 'by_chromosome': self.breakdown('chromosome'),
+                'records': self.records}
+
+    def write_json(self, path, **extra):
+        with open(path, 'w') as f:
+            json.dump(self.to_dict(**extra), f, indent=2)
+
+    def append_slowest_section(self, summary_path, stages, n=10, title='Slowest pages'):
+        """Append a top-N table of the slowest records of `stages` to a processing summary file"""
+        with open(summary_path, 'a') as f:
+            header = f"{title} (top {n})"
+            f.write(f"\n{header}\n{'-' * len(header)}\n")
+            for rec in self.slowest(n, stages):
+                label = rec['item'] or ' '.join(str(v) for v in (rec['sample'], rec['chromosome']) if v is not None)
+                f.write(f"{rec['wall_s']:9.2f} s  cpu {rec['cpu_s']:8.2f} s  "
+                        f"+{rec['rss_delta_mb']:7.1f} MB  {rec['output_bytes'] / 1024:9.1f} KB  "
+                        f"{rec['stage']:<16} {label}\n")
+            totals = self.summary()
+            f.write("\nStage totals\n------------\n")
+            for stage, agg in totals.items():
+                f.write(f"{stage:<18} n={agg['count']:<6} {agg['wall_s']:9.2f} s  cpu {agg['cpu_s']:9.2f} s  "
+                        f"peak {agg['peak_rss_mb']:8.1f} MB  {agg['output_bytes'] / 2**20:9.2f} MB written\n")
+
+
+def measure(metrics, name, **labels):
+    """`metrics.stage(name, **labels)`, or a no-op context yielding a scratch record when metrics is None"""
+    if metrics is None:
+        return nullcontext({'output_bytes': 0})
+    return metrics.stage(name, **labels)
@@ -9,8 +9,10 @@ from .css_styles import (
     info_components,
     responsive_styles,
     plot_styles,
-    info_page_styles
+    info_page_styles,
+    chromosome_page_styles
 )
+from .js_components import chromosome_page, chromosome_viewer, region_fetch, report_status, virtual_table
 
 class StylingManager:
     """Class to manage styling components and their creation"""
@@ -21,6 +23,7 @@ class StylingManager:
         self.components_dir = output_manager.get_components_dir()
         self.css_dir = os.path.join(self.components_dir, "css")
         self.logo_dir = os.path.join(self.components_dir, "logo")
+        self.js_dir = os.path.join(self.components_dir, "js")
         
         # Store contact information and app name
         self.app_name = app_name
@@ -36,6 +39,7 @@ class StylingManager:
         try:
             os.makedirs(self.css_dir, exist_ok=True)
             os.makedirs(self.logo_dir, exist_ok=True)
+            os.makedirs(self.js_dir, exist_ok=True)
             logging.info(f"Created styling directories under {self.components_dir}")
         except Exception as e:
             logging.error(f"Error creating styling directories: {str(e)}")
@@ -55,6 +59,10 @@ class StylingManager:
         
         css_content = "\n\n".join(css_components)
         self._create_css_file('styles.css', css_content)
+        # chromosome page styles, shared by all chromosome pages instead of inlined in each
+        self._create_css_file('chromosome_page.css', chromosome_page_styles.get_chromosome_page_styles())
+        self._create_css_file('chromosome_page_paired.css',
+                              chromosome_page_styles.get_paired_chromosome_page_styles())
     
     def _create_css_file(self, filename, content):
         """Helper method to create CSS files"""
@@ -67,6 +75,35 @@ class StylingManager:
             logging.error(f"Error creating {filename} file: {str(e)}")
             raise
     
+    def create_js_files(self):
+        """Create the shared client-side scripts under components/js"""
+        scripts = {
+            "virtual_table.js": virtual_table.get_virtual_table_script(),
+            "chromosome_viewer.js": chromosome_viewer.get_chromosome_viewer_script(),
+            "chromosome_page.js": chromosome_page.get_chromosome_page_script(),
+            "report_status.js": report_status.get_report_status_script(),
+            "region_fetch.js": region_fetch.get_region_fetch_script(),
+        }
+        for filename, content in scripts.items():
+            js_file = os.path.join(self.js_dir, filename)
+            try:
+                with open(js_file, 'w') as f:
+                    f.write(content)
+                logging.info(f"Created {filename} file at {js_file}")
+            except Exception as e:
+                logging.error(f"Error creating {filename} file: {str(e)}")
+                raise
+    
+    def create_vendor_assets(self):
+        """Copy BokehJS and the other front-end assets under components/vendor (offline mode only)"""
+        if not self.output_manager.assets.offline:
+            return
+        try:
+            self.output_manager.assets.vendor(self.components_dir)
+        except Exception as e:
+            logging.error(f"Error creating offline assets: {str(e)}")
+            raise
+
     def create_header_file(self):
         """Create the header.html file"""
         # Get dynamic home page name from output_manager
@@ -140,6 +177,8 @@ class StylingManager:
         """Create all styling components"""
         try:
             self.create_css_file()
+            self.create_js_files()
+            self.create_vendor_assets()
             self.create_header_file()
             self.create_footer_file()
             
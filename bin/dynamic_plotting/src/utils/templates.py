@@ -0,0 +1,42 @@
+import os
+from functools import lru_cache
+
+from jinja2 import Environment, FileSystemLoader, StrictUndefined, select_autoescape
+
+TEMPLATE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'templates')
+PLOT_ITEM_MARKER = "@@KARYO_PLOT_ITEM@@"  # replaced by the streamed Bokeh item
+
+
+@lru_cache(maxsize=None)
+def template_environment() -> Environment:
+    """Jinja2 environment shared by all pages of the process.
+
+    All templates (src/templates/*.html) are compiled when the environment is first
+    requested and kept for the rest of the run; `auto_reload` is off, so renders never
+    touch the disk again."""
+    env = Environment(
+        loader=FileSystemLoader(TEMPLATE_DIR),
+        autoescape=select_autoescape(['html']),
+        undefined=StrictUndefined,
+        auto_reload=False,
+        cache_size=-1,
+        trim_blocks=True,
+        lstrip_blocks=True,
+    )
+    for name in env.list_templates(extensions=['html']):
+        env.get_template(name)
+    return env
+
+
+def render_template(name: str, **context) -> str:
+    """Render one of the page templates"""
+    return template_environment().get_template(name).render(**context)
+
+
+def render_page_parts(name: str, plot_item, **context) -> list:
+    """Render a template around a Bokeh item, as parts for OutputManager.write_page.
+
+    The template places `{{ plot_item }}` where the item goes; the item itself is
+    not rendered here but serialized while the page is written."""
+    head, tail = render_template(name, plot_item=PLOT_ITEM_MARKER, **context).split(PLOT_ITEM_MARKER)
+    return [head, plot_item, tail]
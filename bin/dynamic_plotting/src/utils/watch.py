@@ -0,0 +1,64 @@
+import logging
+import os
+import time
+
+try:
+    from inotify_simple import INotify, flags
+except ImportError:  # optional: without it the watcher polls
+    INotify = None
+
+DONE_MARKER = ".done"        # written into a sample / pair folder once its preprocessing outputs are complete
+WATCH_INTERVAL = 30.0        # seconds between checks (polling), or the longest wait for an inotify event
+
+
+class SampleWatcher:
+    """Waits for sample / pair folders in `samples_dir` to become complete (--watch).
+
+    A folder is complete once it contains the done marker, so half-copied CSVs are
+    never loaded. `wait()` returns on the next inotify event in `samples_dir` or one of
+    its folders (Linux, needs the optional inotify_simple module) and at the latest
+    after `interval` seconds, so the sample sheets are re-read even when they live
+    elsewhere; without inotify it just sleeps for `interval`."""
+
+    def __init__(self, samples_dir: str, marker: str = DONE_MARKER, interval: float = WATCH_INTERVAL):
+        self.samples_dir = samples_dir
+        self.marker = marker
+        self.interval = interval
+        self.inotify = None
+        self._watched = set()
+        if INotify is not None:
+            try:
+                self.inotify = INotify()
+                self._mask = flags.CREATE | flags.MOVED_TO | flags.CLOSE_WRITE
+                self._watch(samples_dir)
+            except OSError as e:  # e.g. inotify watch limit reached
+                logging.warning(f"inotify unavailable ({str(e)}), polling {samples_dir} every {interval:g} s")
+                self.inotify = None
+        logging.info(f"Watching {samples_dir} for '{marker}' markers "
+                     f"({'inotify' if self.inotify is not None else 'polling'})")
+
+    def _watch(self, path: str):
+        """Add inotify watches on `path` and its direct sub-folders not watched yet"""
+        for folder in [path] + [entry.path for entry in os.scandir(path) if entry.is_dir()]:
+            if folder not in self._watched:
+                self.inotify.add_watch(folder, self._mask)
+                self._watched.add(folder)
+
+    def is_complete(self, folder_name: str) -> bool:
+        return os.path.isfile(os.path.join(self.samples_dir, folder_name, self.marker))
+
+    def wait(self):
+        """Block until something changed in samples_dir or `interval` seconds passed"""
+        if self.inotify is None:
+            time.sleep(self.interval)
+            return
+        events = self.inotify.read(timeout=int(self.interval * 1000), read_delay=500)
+        if events:
+            try:
+                self._watch(self.samples_dir)  # new sample folders
+            except OSError as e:
+                logging.warning(f"Could not watch new folders in {self.samples_dir}: {str(e)}")
+
+    def close(self):
+        if self.inotify is not None:
+            self.inotify.close()
@@ -26,7 +26,7 @@ process DYNAMIC_PLOT_SINGLE {
     publishDir "${params.outdir}/0.0_information/0.1_pipeline_logs/5.1_${params.app_name}_single_logs", 
         mode: 'copy',
         overwrite: true,
-        pattern: "{all_single_input_files.txt,dynamic_plotting_single.log,processing_summary.txt}"
+        pattern: "{all_single_input_files.txt,dynamic_plotting_single.log,processing_summary.txt,dynamic_plotting_single_metrics.json}"
 
     conda "${baseDir}/env/bokeh.yaml"
 
@@ -39,6 +39,7 @@ process DYNAMIC_PLOT_SINGLE {
         path 'all_single_input_files.txt'
         path 'dynamic_plotting_single.log'
         path 'processing_summary.txt', optional: true
+        path 'dynamic_plotting_single_metrics.json', optional: true
         path 'dynamic_plots_single/**'
 
     when:
@@ -82,7 +83,18 @@ process DYNAMIC_PLOT_SINGLE {
             --email_helmholtz "${params.email_helmholtz}" \\
             --support_helmholtz "${params.support_helmholtz}" \\
             --email_analyst "${params.email_analyst}" \\
-            --name_analyst "${params.name_analyst}"
+            --name_analyst "${params.name_analyst}" \\
+            --metrics_json dynamic_plotting_single_metrics.json \\
+            --recurrence_bin_size ${params.recurrence_bin_size} \\
+            --baf_thin_stride ${params.baf_thin_stride} \\
+            ${params.json_tables ? '--json_tables' : ''} \\
+            ${params.single_page ? '--single_page' : ''} \\
+            ${params.offline_assets ? '--offline_assets' : ''} \\
+            ${params.vendor_dir ? "--vendor_dir ${params.vendor_dir}" : ''} \\
+            ${params.compress ? '--compress' : ''} \\
+            ${params.compress_brotli ? '--compress_brotli' : ''} \\
+            ${params.region_store ? '--region_store' : ''} \\
+            ${params.quick_look ? '--quick_look' : ''}
         
         # Copy processing summary to work directory for log publishing
         if [ -f "dynamic_plots_single/processing_summary.txt" ]; then
@@ -109,7 +121,7 @@ process DYNAMIC_PLOT_PAIRED {
     publishDir "${params.outdir}/0.0_information/0.1_pipeline_logs/5.2_${params.app_name}_paired_logs", 
         mode: 'copy',
         overwrite: true,
-        pattern: "{all_paired_input_files.txt,dynamic_plotting_paired.log,processing_summary_paired.txt}"
+        pattern: "{all_paired_input_files.txt,dynamic_plotting_paired.log,processing_summary_paired.txt,dynamic_plotting_paired_metrics.json}"
 
     conda "${baseDir}/env/bokeh.yaml"
 
@@ -122,6 +134,7 @@ process DYNAMIC_PLOT_PAIRED {
         path 'all_paired_input_files.txt'
         path 'dynamic_plotting_paired.log'
         path 'processing_summary_paired.txt', optional: true
+        path 'dynamic_plotting_paired_metrics.json', optional: true
         path 'dynamic_plots_paired/**'
 
     when:
@@ -169,7 +182,342 @@ process DYNAMIC_PLOT_PAIRED {
             --email_helmholtz "${params.email_helmholtz}" \\
             --support_helmholtz "${params.support_helmholtz}" \\
             --email_analyst "${params.email_analyst}" \\
-            --name_analyst "${params.name_analyst}"
+            --name_analyst "${params.name_analyst}" \\
+            --metrics_json dynamic_plotting_paired_metrics.json \\
+            --recurrence_bin_size ${params.recurrence_bin_size} \\
+            --baf_thin_stride ${params.baf_thin_stride} \\
+            ${params.json_tables ? '--json_tables' : ''} \\
+            ${params.single_page ? '--single_page' : ''} \\
+            ${params.offline_assets ? '--offline_assets' : ''} \\
+            ${params.vendor_dir ? "--vendor_dir ${params.vendor_dir}" : ''} \\
+            ${params.compress ? '--compress' : ''} \\
+            ${params.compress_brotli ? '--compress_brotli' : ''} \\
+            ${params.region_store ? '--region_store' : ''} \\
+            ${params.quick_look ? '--quick_look' : ''}
+        
+        # Copy processing summary to work directory for log publishing
+        if [ -f "dynamic_plots_paired/processing_summary_paired.txt" ]; then
+            cp dynamic_plots_paired/processing_summary_paired.txt ./processing_summary_paired.txt
+        fi
+        """
+}
+
+/*
+----------------------------------------------------------------------------------------
+    Sharded rendering (params.shard_rendering): one task per sample / pair renders its
+    summary and chromosome pages and writes small shard metadata; the merge task builds
+    the home page, info page, cohort pages and processing summary from that metadata.
+----------------------------------------------------------------------------------------
+*/
+
+process DYNAMIC_PLOT_SINGLE_SHARD {
+    tag "${sample}"
+    label 'process_low'
+
+    publishDir "${params.outdir}/5.1_${params.app_name}_single", 
+        mode: 'copy',
+        overwrite: true,
+        saveAs: { filename ->
+            filename.startsWith('dynamic_plots_single/') ? filename.replaceFirst('dynamic_plots_single/', '') : null
+        }
+    
+    publishDir "${params.outdir}/0.0_information/0.1_pipeline_logs/5.1_${params.app_name}_single_logs/shards", 
+        mode: 'copy',
+        overwrite: true,
+        pattern: "dynamic_plotting_single_${sample}*"
+
+    conda "${baseDir}/env/bokeh.yaml"
+
+    input:
+        tuple val(sample), path(sample_types_csv), path(csv_files)
+        path parameters
+
+    output:
+        path 'shards/*', emit: shards
+        path "dynamic_plotting_single_${sample}.log"
+        path "dynamic_plotting_single_${sample}_metrics.json", optional: true
+        path 'dynamic_plots_single/**'
+
+    script:
+        """
+        #!/usr/bin/env bash
+        set -euo pipefail
+        shopt -s nullglob
+
+        mkdir -p samples dynamic_plots_single shards
+        # The info page is built by the merge task; the shard only needs the folder to exist
+        mkdir -p simulated_data
+
+        for f in ${csv_files}; do
+          base=\$(basename "\${f}" .csv)
+          name=\$(printf '%s' "\${base}" | sed -E 's/^[^A-Z]+//')
+          mkdir -p "samples/\${name}"
+          cp -- "\${f}" "samples/\${name}/"
+        done
+
+        python ${baseDir}/bin/dynamic_plotting/main_dynamic_plotting_single.py \\
+            --samples_dir samples/ \\
+            --sample_types ${sample_types_csv} \\
+            --log_file dynamic_plotting_single_${sample}.log \\
+            --logo ${baseDir}/assets/logo \\
+            --simulated_data_dir ./simulated_data \\
+            --output_dir dynamic_plots_single \\
+            --parameters ${parameters} \\
+            --app_name "${params.app_name}" \\
+            --metrics_json dynamic_plotting_single_${sample}_metrics.json \\
+            --recurrence_bin_size ${params.recurrence_bin_size} \\
+            --baf_thin_stride ${params.baf_thin_stride} \\
+            ${params.json_tables ? '--json_tables' : ''} \\
+            ${params.single_page ? '--single_page' : ''} \\
+            ${params.offline_assets ? '--offline_assets' : ''} \\
+            ${params.vendor_dir ? "--vendor_dir ${params.vendor_dir}" : ''} \\
+            ${params.compress ? '--compress' : ''} \\
+            ${params.compress_brotli ? '--compress_brotli' : ''} \\
+            ${params.region_store ? '--region_store' : ''} \\
+            --shard ${sample} \\
+            --shard_dir shards
+        """
+}
+
+process DYNAMIC_PLOT_SINGLE_MERGE {
+    tag 'all_single'
+    label 'process_low'
+
+    publishDir "${params.outdir}/5.1_${params.app_name}_single", 
+        mode: 'copy',
+        overwrite: true,
+        saveAs: { filename ->
+            if (filename.startsWith('dynamic_plots_single/') && filename != 'dynamic_plots_single/processing_summary.txt') {
+                filename.replaceFirst('dynamic_plots_single/', '')
+            } else {
+                null
+            }
+        }
+    
+    publishDir "${params.outdir}/0.0_information/0.1_pipeline_logs/5.1_${params.app_name}_single_logs", 
+        mode: 'copy',
+        overwrite: true,
+        pattern: "{all_single_input_files.txt,dynamic_plotting_single.log,processing_summary.txt,dynamic_plotting_single_metrics.json}"
+
+    conda "${baseDir}/env/bokeh.yaml"
+
+    input:
+        path sample_types_csv
+        path shard_files, stageAs: 'shards/*'
+        path parameters
+
+    output:
+        path 'all_single_input_files.txt'
+        path 'dynamic_plotting_single.log'
+        path 'processing_summary.txt', optional: true
+        path 'dynamic_plotting_single_metrics.json', optional: true
+        path 'dynamic_plots_single/**'
+
+    when:
+        sample_types_csv && shard_files
+
+    script:
+        """
+        #!/usr/bin/env bash
+        set -euo pipefail
+
+        manifest="all_single_input_files.txt"
+        echo "All single shard files:" > "\${manifest}"
+        ls shards/ >> "\${manifest}"
+
+        # No sample data is read when merging
+        mkdir -p samples dynamic_plots_single simulated_data
+
+        # Keep the shard metadata in the report, as an unsharded run does (--samples / --watch need it)
+        mkdir -p dynamic_plots_single/shards
+        cp -L shards/* dynamic_plots_single/shards/
+
+        python ${baseDir}/bin/dynamic_plotting/src/simulate_data/simulate_dataset.py \\
+            --mode single --sample1 Sample_1 --outdir ./simulated_data
+
+        python ${baseDir}/bin/dynamic_plotting/main_dynamic_plotting_single.py \\
+            --samples_dir samples/ \\
+            --sample_types ${sample_types_csv} \\
+            --log_file dynamic_plotting_single.log \\
+            --logo ${baseDir}/assets/logo \\
+            --simulated_data_dir ./simulated_data \\
+            --output_dir dynamic_plots_single \\
+            --parameters ${parameters} \\
+            --app_name "${params.app_name}" \\
+            --email_helmholtz "${params.email_helmholtz}" \\
+            --support_helmholtz "${params.support_helmholtz}" \\
+            --email_analyst "${params.email_analyst}" \\
+            --name_analyst "${params.name_analyst}" \\
+            --metrics_json dynamic_plotting_single_metrics.json \\
+            --recurrence_bin_size ${params.recurrence_bin_size} \\
+            ${params.json_tables ? '--json_tables' : ''} \\
+            ${params.offline_assets ? '--offline_assets' : ''} \\
+            ${params.vendor_dir ? "--vendor_dir ${params.vendor_dir}" : ''} \\
+            ${params.compress ? '--compress' : ''} \\
+            ${params.compress_brotli ? '--compress_brotli' : ''} \\
+            --merge \\
+            --shard_dir dynamic_plots_single/shards
+        
+        # Copy processing summary to work directory for log publishing
+        if [ -f "dynamic_plots_single/processing_summary.txt" ]; then
+            cp dynamic_plots_single/processing_summary.txt ./processing_summary.txt
+        fi
+        """
+}
+
+process DYNAMIC_PLOT_PAIRED_SHARD {
+    tag "PRE_${pre}_POST_${post}"
+    label 'process_low'
+
+    publishDir "${params.outdir}/5.2_${params.app_name}_paired", 
+        mode: 'copy',
+        overwrite: true,
+        saveAs: { filename ->
+            filename.startsWith('dynamic_plots_paired/') ? filename.replaceFirst('dynamic_plots_paired/', '') : null
+        }
+    
+    publishDir "${params.outdir}/0.0_information/0.1_pipeline_logs/5.2_${params.app_name}_paired_logs/shards", 
+        mode: 'copy',
+        overwrite: true,
+        pattern: "dynamic_plotting_paired_PRE_*"
+
+    conda "${baseDir}/env/bokeh.yaml"
+
+    input:
+        tuple val(pre), val(post), path(sample_types_single), path(sample_types_paired), path(csv_files)
+        path parameters
+
+    output:
+        path 'shards/*', emit: shards
+        path "dynamic_plotting_paired_PRE_${pre}_POST_${post}.log"
+        path "dynamic_plotting_paired_PRE_${pre}_POST_${post}_metrics.json", optional: true
+        path 'dynamic_plots_paired/**'
+
+    script:
+        def pair_id = "PRE_${pre}_POST_${post}"
+        """
+        #!/usr/bin/env bash
+        set -euo pipefail
+        shopt -s nullglob
+
+        mkdir -p samples dynamic_plots_paired shards
+        # The info page is built by the merge task; the shard only needs the folder to exist
+        mkdir -p simulated_data
+
+        for f in ${csv_files}; do
+          base=\$(basename "\${f}" .csv)
+          name=\$(printf '%s' "\${base}" | sed -E 's/^[^A-Z]+//')
+          mkdir -p "samples/\${name}"
+          cp -- "\${f}" "samples/\${name}/"
+        done
+
+        python ${baseDir}/bin/dynamic_plotting/main_dynamic_plotting_paired.py \\
+            --samples_dir samples/ \\
+            --sample_types_single ${sample_types_single} \\
+            --sample_types_paired ${sample_types_paired} \\
+            --log_file dynamic_plotting_paired_${pair_id}.log \\
+            --logo ${baseDir}/assets/logo \\
+            --simulated_data_dir ./simulated_data \\
+            --output_dir dynamic_plots_paired \\
+            --parameters ${parameters} \\
+            --app_name "${params.app_name}" \\
+            --metrics_json dynamic_plotting_paired_${pair_id}_metrics.json \\
+            --recurrence_bin_size ${params.recurrence_bin_size} \\
+            --baf_thin_stride ${params.baf_thin_stride} \\
+            ${params.json_tables ? '--json_tables' : ''} \\
+            ${params.single_page ? '--single_page' : ''} \\
+            ${params.offline_assets ? '--offline_assets' : ''} \\
+            ${params.vendor_dir ? "--vendor_dir ${params.vendor_dir}" : ''} \\
+            ${params.compress ? '--compress' : ''} \\
+            ${params.compress_brotli ? '--compress_brotli' : ''} \\
+            ${params.region_store ? '--region_store' : ''} \\
+            --shard ${pair_id} \\
+            --shard_dir shards
+        """
+}
+
+process DYNAMIC_PLOT_PAIRED_MERGE {
+    tag 'all_paired'
+    label 'process_low'
+
+    publishDir "${params.outdir}/5.2_${params.app_name}_paired", 
+        mode: 'copy',
+        overwrite: true,
+        saveAs: { filename ->
+            if (filename.startsWith('dynamic_plots_paired/') && filename != 'dynamic_plots_paired/processing_summary_paired.txt') {
+                filename.replaceFirst('dynamic_plots_paired/', '')
+            } else {
+                null
+            }
+        }
+    
+    publishDir "${params.outdir}/0.0_information/0.1_pipeline_logs/5.2_${params.app_name}_paired_logs", 
+        mode: 'copy',
+        overwrite: true,
+        pattern: "{all_paired_input_files.txt,dynamic_plotting_paired.log,processing_summary_paired.txt,dynamic_plotting_paired_metrics.json}"
+
+    conda "${baseDir}/env/bokeh.yaml"
+
+    input:
+        tuple path(sample_types_single), path(sample_types_paired)
+        path shard_files, stageAs: 'shards/*'
+        path parameters
+
+    output:
+        path 'all_paired_input_files.txt'
+        path 'dynamic_plotting_paired.log'
+        path 'processing_summary_paired.txt', optional: true
+        path 'dynamic_plotting_paired_metrics.json', optional: true
+        path 'dynamic_plots_paired/**'
+
+    when:
+        sample_types_single && sample_types_paired && shard_files
+
+    script:
+        """
+        #!/usr/bin/env bash
+        set -euo pipefail
+
+        manifest="all_paired_input_files.txt"
+        echo "All paired shard files:" > "\${manifest}"
+        ls shards/ >> "\${manifest}"
+
+        # No sample data is read when merging
+        mkdir -p samples dynamic_plots_paired simulated_data
+
+        # Keep the shard metadata in the report, as an unsharded run does (--samples / --watch need it)
+        mkdir -p dynamic_plots_paired/shards
+        cp -L shards/* dynamic_plots_paired/shards/
+
+        python ${baseDir}/bin/dynamic_plotting/src/simulate_data/simulate_dataset.py \\
+            --mode single --sample1 Sample_1 --outdir ./simulated_data
+
+        python ${baseDir}/bin/dynamic_plotting/src/simulate_data/simulate_dataset.py \\
+            --mode paired --sample1 Sample_1 --sample2 Sample_2 --outdir ./simulated_data
+
+        python ${baseDir}/bin/dynamic_plotting/main_dynamic_plotting_paired.py \\
+            --samples_dir samples/ \\
+            --sample_types_single ${sample_types_single} \\
+            --sample_types_paired ${sample_types_paired} \\
+            --log_file dynamic_plotting_paired.log \\
+            --logo ${baseDir}/assets/logo \\
+            --simulated_data_dir ./simulated_data \\
+            --output_dir dynamic_plots_paired \\
+            --parameters ${parameters} \\
+            --app_name "${params.app_name}" \\
+            --email_helmholtz "${params.email_helmholtz}" \\
+            --support_helmholtz "${params.support_helmholtz}" \\
+            --email_analyst "${params.email_analyst}" \\
+            --name_analyst "${params.name_analyst}" \\
+            --metrics_json dynamic_plotting_paired_metrics.json \\
+            --recurrence_bin_size ${params.recurrence_bin_size} \\
+            ${params.json_tables ? '--json_tables' : ''} \\
+            ${params.offline_assets ? '--offline_assets' : ''} \\
+            ${params.vendor_dir ? "--vendor_dir ${params.vendor_dir}" : ''} \\
+            ${params.compress ? '--compress' : ''} \\
+            ${params.compress_brotli ? '--compress_brotli' : ''} \\
+            --merge \\
+            --shard_dir dynamic_plots_paired/shards
         
         # Copy processing summary to work directory for log publishing
         if [ -f "dynamic_plots_paired/processing_summary_paired.txt" ]; then
@@ -23,6 +23,7 @@ include { ROH_ANALYSIS_SINGLE; ROH_ANALYSIS_PAIRED } from '../modules/local/anal
 include { CNV_PLOT_PAIRED; CNV_PLOT_SINGLE; LRR_BAF_PLOT_PAIRED; LRR_BAF_PLOT_SINGLE } from '../modules/local/plotting/cnv_plots'
 include { DYNAMIC_PLOT_DATA_PREP_SINGLE; DYNAMIC_PLOT_DATA_PREP_PAIRED } from '../modules/local/dynamic_plotting/dynamic_plotting_data_preprocessing'
 include { DYNAMIC_PLOT_SINGLE; DYNAMIC_PLOT_PAIRED } from '../modules/local/dynamic_plotting/dynamic_plotting'
+include { DYNAMIC_PLOT_SINGLE_SHARD; DYNAMIC_PLOT_SINGLE_MERGE; DYNAMIC_PLOT_PAIRED_SHARD; DYNAMIC_PLOT_PAIRED_MERGE } from '../modules/local/dynamic_plotting/dynamic_plotting'
 include { PARAMETER_REPORT; HTML_OUTPUT_DESCRIPTION } from '../modules/local/reporting/reports'
 
 workflow DK {
@@ -328,11 +329,24 @@ workflow DK {
         VCF_ANNOTATE_BAF_LRR.out.vcftools_version
     )
 
-    DYNAMIC_PLOT_SINGLE(
-        ch_sample_types_single,
-        ch_processed_csvs_single,
-        ch_parameters_single
-    )
+    if (params.shard_rendering) {
+        // One rendering task per sample, then the cohort pages from the shard metadata
+        DYNAMIC_PLOT_SINGLE_SHARD(
+            DYNAMIC_PLOT_DATA_PREP_SINGLE.out.all_processed_files,
+            ch_parameters_single.first()
+        )
+        DYNAMIC_PLOT_SINGLE_MERGE(
+            ch_sample_types_single,
+            DYNAMIC_PLOT_SINGLE_SHARD.out.shards.flatten().collect(),
+            ch_parameters_single
+        )
+    } else {
+        DYNAMIC_PLOT_SINGLE(
+            ch_sample_types_single,
+            ch_processed_csvs_single,
+            ch_parameters_single
+        )
+    }
 
     // ================================
     // IBD ANALYSIS (Legacy Compatible)
@@ -483,5 +497,18 @@ workflow DK {
 
     ch_parameters_paired = PARAMETER_REPORT.out.parameters
 
-    DYNAMIC_PLOT_PAIRED(ch_sample_types_paired, ch_processed_csvs_paired, ch_parameters_paired)
+    if (params.shard_rendering) {
+        // One rendering task per pair, then the cohort pages from the shard metadata
+        DYNAMIC_PLOT_PAIRED_SHARD(
+            DYNAMIC_PLOT_DATA_PREP_PAIRED.out.all_processed_files,
+            ch_parameters_paired.first()
+        )
+        DYNAMIC_PLOT_PAIRED_MERGE(
+            ch_sample_types_paired,
+            DYNAMIC_PLOT_PAIRED_SHARD.out.shards.flatten().collect(),
+            ch_parameters_paired
+        )
+    } else {
+        DYNAMIC_PLOT_PAIRED(ch_sample_types_paired, ch_processed_csvs_paired, ch_parameters_paired)
+    }
 }